@@ -4,6 +4,11 @@ import streamlit as st
 # Sayfa modüllerini import et
 import fuel_analysis_page
 import new_combinations_page
+import fleet_analysis_page
+from cache_warmup import start_background_warmup
+from compute_service import start_compute_service
+import telemetry
+from config import TELEMETRY_ENABLED
 
 # --- Streamlit Sayfa Ayarları ---
 st.set_page_config(
@@ -13,6 +18,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"     # Sidebar başlangıç durumu: "auto", "expanded", "collapsed"
 )
 
+# Varsayılan ve sık kullanılan senaryoların sonuçlarını arka planda önbelleğe al (süreç başına bir kez)
+start_background_warmup()
+# Ayarlarda açıksa yerel HTTP/JSON hesap servisini aynı süreçte başlat (diğer araçlar aynı sonuçları alır)
+start_compute_service()
+
 # --- Ana Sayfa Navigasyonu ---
 # Streamlit'in yerel çoklu sayfa (multipage app) desteği için `pages/` klasörü ve
 # oradaki Python dosyaları kullanılabilir. Bu, sidebar'da otomatik navigasyon oluşturur.
@@ -20,7 +30,8 @@ st.set_page_config(
 
 page_options = {
     "Dizel Elektrik vs Geleneksel Sistem": fuel_analysis_page,
-    "Dizel Elektrik Sistemi (Küçük Jeneratör ile)": new_combinations_page
+    "Dizel Elektrik Sistemi (Küçük Jeneratör ile)": new_combinations_page,
+    "Filo Analizi (Çoklu Gemi)": fleet_analysis_page
 }
 
 st.sidebar.title("Dizel Elektrik Tahrik Sistemi")
@@ -29,11 +40,15 @@ selected_page_name = st.sidebar.radio(
     list(page_options.keys()),
     key="main_page_selector_radio" # Benzersiz bir anahtar
 )
+st.sidebar.checkbox("Gecikme Paneli (Geliştirici)", value=TELEMETRY_ENABLED, key=telemetry.TELEMETRY_TOGGLE_KEY,
+                    help="Sayfa aşamalarının sürelerini, önbellek hit/miss durumunu ve sonuç tablosu boyutlarını ölçer.")
 
 # Seçilen sayfayı render et
 if selected_page_name in page_options:
     page_module = page_options[selected_page_name]
-    page_module.render_page() # Her sayfa modülünde render_page() fonksiyonu olmalı
+    with telemetry.run(selected_page_name): # Panel kapalıyken ölçüm yapılmaz
+        page_module.render_page() # Her sayfa modülünde render_page() fonksiyonu olmalı
+    telemetry.render_telemetry_panel()
 else:
     st.error("Geçersiz sayfa seçimi!")
 
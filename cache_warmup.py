@@ -0,0 +1,91 @@
+# cache_warmup.py
+import logging
+import threading
+import time
+
+import streamlit as st
+
+from config import (
+    CONVENTIONAL_SHAFT_EFFICIENCY,
+    FUEL_ANALYSIS_DEFAULTS,
+    NEW_COMBINATION_DEFAULTS,
+    WARMUP_ENABLED,
+    WARMUP_SCENARIOS
+)
+from core_calculations import total_electrical_efficiency
+from dispatch_map import get_dispatch_map
+import fuel_analysis_page
+import new_combinations_page
+from sfoc_library import current_sfoc_curves
+
+_LOGGER = logging.getLogger(__name__)
+
+# Önbellek anahtarı argüman değerleri ve tipleriyle oluşur; ısıtma çağrıları sayfadaki widget'ların
+# döndürdüğü tiplerle (aralıklar int demet, süreler float, MCR/adetler int) birebir aynı yapılmalıdır.
+def _power_range(value):
+    return (int(value[0]), int(value[1]))
+
+def fuel_analysis_results(scenario):
+    # Varsayılanlarla birleştirilmiş girdilerle sayfanın önbellekli hesabı; (özet, detay, kullanım) tabloları.
+    inputs = {**FUEL_ANALYSIS_DEFAULTS, **scenario}
+    return fuel_analysis_page.calculate_all_results_for_fuel_analysis(
+        _power_range(inputs["gen_power_range"]), _power_range(inputs["sea_power_range"]), _power_range(inputs["maneuver_power_range"]),
+        float(inputs["sea_duration"]), float(inputs["maneuver_duration"]), int(inputs["main_engine_mcr"]),
+        int(inputs["aux_power_kw"]),
+        int(inputs["conv_aux_dg_mcr"]),
+        current_sfoc_curves().subset(fuel_analysis_page.FUEL_ANALYSIS_SFOC_KEYS),
+        _power_range(inputs["gen_qty_range"]),
+        bool(inputs["load_dependent_eff"])
+    )
+
+def new_combination_results(scenario):
+    inputs = {**NEW_COMBINATION_DEFAULTS, **scenario}
+    fleet = (int(inputs["main_gen_mcr"]), int(inputs["main_gen_qty"]), int(inputs["port_gen_mcr"]), int(inputs["port_gen_qty"]))
+    sfoc_curves = current_sfoc_curves()
+    get_dispatch_map(*fleet, sfoc_curves)
+    return new_combinations_page.calculate_all_results_for_new_combinations(
+        *fleet,
+        _power_range(inputs["sea_power_range"]), _power_range(inputs["maneuver_power_range"]),
+        float(inputs["sea_duration"]), float(inputs["maneuver_duration"]),
+        int(inputs["main_engine_mcr_ref"]),
+        total_electrical_efficiency(float(inputs["motor_eff"]), float(inputs["converter_eff"]), float(inputs["switchboard_eff"]), float(inputs["generator_elec_eff"])),
+        CONVENTIONAL_SHAFT_EFFICIENCY,
+        int(inputs["aux_power_kw"]),
+        int(inputs["conv_aux_dg_mcr"]),
+        sfoc_curves.subset(new_combinations_page.NEW_COMBINATION_SFOC_KEYS),
+        None,
+        str(inputs["load_sharing"]),
+        bool(inputs["load_dependent_eff"])
+    )
+
+_WARMUP_FUNCTIONS = {"fuel_analysis": fuel_analysis_results, "new_combinations": new_combination_results}
+
+def warm_up_caches(scenarios=WARMUP_SCENARIOS):
+    """
+    Senaryoların sonuçlarını (ve yeni kombinasyon senaryoları için dispatch haritalarını) hesaplayıp
+    paylaşılan st.cache_data önbelleğine yerleştirir. Hatalı bir senaryo diğerlerini durdurmaz.
+    Döndürür: ısıtılan senaryo sayısı.
+    """
+    warmed = 0
+    for scenario in scenarios:
+        scenario = dict(scenario)
+        page = scenario.pop("page", None)
+        if page not in _WARMUP_FUNCTIONS:
+            _LOGGER.warning("Önbellek ısıtma: bilinmeyen sayfa '%s' atlandı.", page)
+            continue
+        started = time.perf_counter()
+        try:
+            _WARMUP_FUNCTIONS[page](scenario)
+            warmed += 1
+            _LOGGER.info("Önbellek ısıtma: %s %s (%.2f s)", page, scenario, time.perf_counter() - started)
+        except Exception: # Isıtma sadece hızlandırma amaçlı; uygulamayı düşürmemeli.
+            _LOGGER.exception("Önbellek ısıtma başarısız: %s %s", page, scenario)
+    return warmed
+
+@st.cache_resource
+def start_background_warmup():
+    # Sunucu süreci başına bir kez arka planda ısıtma başlatır (ilk oturumun sayfa çizimini bekletmez).
+    if not WARMUP_ENABLED: return None
+    thread = threading.Thread(target=warm_up_caches, name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
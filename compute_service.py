@@ -0,0 +1,325 @@
+# compute_service.py
+import argparse
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import streamlit as st
+
+from config import (
+    COMPUTE_SERVICE_ENABLED,
+    COMPUTE_SERVICE_HOST,
+    COMPUTE_SERVICE_PORT,
+    COMPUTE_SERVICE_BATCH_WINDOW_S,
+    COMPUTE_SERVICE_MAX_BATCH,
+    COMPUTE_SERVICE_LATENCY_WINDOW,
+    FUEL_ANALYSIS_DEFAULTS,
+    NEW_COMBINATION_DEFAULTS
+)
+from core_calculations import calculate_power_flow
+from dispatch_map import get_dispatch_map
+from economic_dispatch import LOAD_SHARING_LABELS
+from generator_sizing import mcr_value
+from cache_warmup import fuel_analysis_results, new_combination_results
+from sfoc_library import current_sfoc_curves
+
+_LOGGER = logging.getLogger(__name__)
+
+class RequestBatcher:
+    """
+    Aynı gruba (örn. aynı filo) düşen eşzamanlı tekil istekleri tek bir vektörel değerlendirmede toplar.
+    Grubun ilk isteği lider olur: `window_s` kadar (veya grup `max_batch`'e ulaşana kadar) bekler, biriken
+    tüm istekleri `evaluate_batch(grup, öğeler)` ile bir kerede hesaplar ve sonuçları bekleyenlere dağıtır.
+    Ayrı bir iş parçacığı gerekmez; bekleme liderin kendi istek iş parçacığında yapılır.
+    """
+    def __init__(self, evaluate_batch, window_s=COMPUTE_SERVICE_BATCH_WINDOW_S, max_batch=COMPUTE_SERVICE_MAX_BATCH):
+        self.evaluate_batch = evaluate_batch
+        self.window_s, self.max_batch = window_s, max_batch
+        self._pending = {} # grup -> {"slots": [...], "full": Event}
+        self._lock = threading.Lock()
+        self.batches, self.items = 0, 0
+
+    def submit(self, group, item):
+        slot = {"item": item, "done": threading.Event(), "result": None, "error": None}
+        with self._lock:
+            batch = self._pending.get(group)
+            leader = batch is None
+            if leader: batch = self._pending[group] = {"slots": [], "full": threading.Event()}
+            batch["slots"].append(slot)
+            if len(batch["slots"]) >= self.max_batch:
+                batch["full"].set()
+                self._pending.pop(group, None) # Sonraki istekler yeni bir toplu işe başlar
+        if not leader:
+            slot["done"].wait()
+        else:
+            batch["full"].wait(self.window_s)
+            with self._lock:
+                if self._pending.get(group) is batch: del self._pending[group]
+                self.batches += 1; self.items += len(batch["slots"])
+            try:
+                results = self.evaluate_batch(group, [s["item"] for s in batch["slots"]])
+                for s, result in zip(batch["slots"], results): s["result"] = result
+            except Exception as e: # Hata toplu işteki tüm isteklere iletilir
+                for s in batch["slots"]: s["error"] = e
+            for s in batch["slots"]: s["done"].set()
+        if slot["error"] is not None: raise slot["error"]
+        return slot["result"]
+
+    def stats(self):
+        with self._lock:
+            return {"batches": self.batches, "items": self.items, "mean_batch_size": self.items / self.batches if self.batches else 0.0}
+
+class LatencyRecorder:
+    # Uç nokta başına son `window` isteğin süresi (ms); yüzdelikler bu kayan pencere üzerinden hesaplanır.
+    def __init__(self, window=COMPUTE_SERVICE_LATENCY_WINDOW):
+        self.window = window
+        self._latencies, self._counts = {}, {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, latency_ms):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(latency_ms)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def percentiles(self):
+        with self._lock:
+            snapshot = {endpoint: np.array(values) for endpoint, values in self._latencies.items()}
+            counts = dict(self._counts)
+        return {
+            endpoint: {"count": counts[endpoint], **{f"p{q}_ms": float(np.percentile(values, q)) for q in (50, 90, 99)}, "max_ms": float(values.max())}
+            for endpoint, values in snapshot.items()
+        }
+
+# --- Toplu değerlendirme fonksiyonları ---
+def _best_combination_batch(fleet, items):
+    # Aynı filodaki noktalar: yakıt tek vektörel dispatch haritası sorgusuyla, etiket/yükler haritanın segmentinden.
+    dispatch_map = get_dispatch_map(*fleet, current_sfoc_curves())
+    powers = np.array([power for power, _ in items], dtype=float)
+    durations = np.array([duration for _, duration in items], dtype=float)
+    fuels = dispatch_map.fuel(powers, durations)
+    results = []
+    for power, fuel in zip(powers, fuels):
+        label, loads = dispatch_map.combination_at(float(power))
+        results.append({
+            "required_power_kw": float(power), "label": label, "strategy": str(dispatch_map.strategy_at(float(power))),
+            "fuel_ton": float(fuel), "loads": [{"mcr_kw": mcr, "load_percent": float(load), "kind": kind} for mcr, load, kind in loads]
+        })
+    return results
+
+def _power_flow_batch(efficiencies, items):
+    power_values, loss_values = calculate_power_flow(np.array(items, dtype=float), *efficiencies)
+    return [
+        {"power_kw": {key: _json_number(values[i]) for key, values in power_values.items()},
+         "loss_kw": {key: _json_number(values[i]) for key, values in loss_values.items()}}
+        for i in range(len(items))
+    ]
+
+def _json_number(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+def _json_safe(value):
+    # Yanıttaki sonlu olmayan sayılar null olur (NaN / Infinity geçerli JSON değildir)
+    if isinstance(value, dict): return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)): return [_json_safe(item) for item in value]
+    if isinstance(value, float): return _json_number(value)
+    return value
+
+def _reject_constant(name):
+    raise ValueError(f"sonlu olmayan sayı kabul edilmez: {name}")
+
+def _finite_float(text):
+    value = float(text)
+    if not np.isfinite(value): raise ValueError(f"sonlu olmayan sayı kabul edilmez: {text}")
+    return value
+
+def _input_number(body, key, default=None, upper=None):
+    # Uç nokta girdisi: sonlu, negatif olmayan (ve verilirse `upper`'ı aşmayan) sayı; aksi halde ValueError (400)
+    value = body.get(key, default) if default is not None else body[key]
+    if isinstance(value, bool) or not isinstance(value, (int, float)): raise ValueError(f"'{key}' sayı olmalı.")
+    value = float(value)
+    if not np.isfinite(value) or value < 0 or (upper is not None and value > upper):
+        raise ValueError(f"'{key}' sonlu, negatif olmayan bir sayı olmalı" + (f" (en fazla {upper:g})." if upper is not None else "."))
+    return value
+
+def _input_count(body, key, default=None, minimum=0):
+    # Adet girdisi: `minimum`'dan küçük olmayan tam sayı (2.5 gibi kesirli adetler kırpılmaz, reddedilir)
+    value = _input_number(body, key, default)
+    if not value.is_integer() or value < minimum: raise ValueError(f"'{key}' en az {minimum} olan bir tam sayı olmalı.")
+    return int(value)
+
+def _input_range(body, key, default, minimum=0):
+    # [alt, üst] aralığı: `minimum`'dan küçük olmayan iki tam sayı ve alt <= üst (sayfa kaydırıcılarıyla aynı)
+    value = body.get(key, default)
+    if not isinstance(value, (list, tuple)) or len(value) != 2: raise ValueError(f"'{key}' [alt, üst] biçiminde olmalı.")
+    low, high = (_input_count({key: item}, key, minimum=minimum) for item in value)
+    if low > high: raise ValueError(f"'{key}' alt sınırı üst sınırından büyük olamaz ({low} > {high}).")
+    return (low, high)
+
+# Sayfa uç noktalarının sayısal girdileri: anahtar -> (tür, alt sınır); "range" [alt, üst], "count" tam sayı, "number" sonlu sayı
+_FUEL_ANALYSIS_FIELDS = {
+    "gen_power_range": ("range", 1), "sea_power_range": ("range", 0), "maneuver_power_range": ("range", 0), "gen_qty_range": ("range", 1),
+    "sea_duration": ("number", 0), "maneuver_duration": ("number", 0),
+    "main_engine_mcr": ("count", 1), "conv_aux_dg_mcr": ("count", 1), "aux_power_kw": ("count", 0)
+}
+_NEW_COMBINATION_FIELDS = {
+    "main_gen_mcr": ("count", 1), "main_gen_qty": ("count", 1), "port_gen_mcr": ("count", 0), "port_gen_qty": ("count", 0),
+    "sea_power_range": ("range", 0), "maneuver_power_range": ("range", 0),
+    "sea_duration": ("number", 0), "maneuver_duration": ("number", 0),
+    "main_engine_mcr_ref": ("count", 1), "conv_aux_dg_mcr": ("count", 1), "aux_power_kw": ("count", 0)
+}
+
+def _page_inputs(body, defaults, fields):
+    # Sayfa girdilerini varsayılanlarla doldurup denetler; hatalı aralık / adet / sayı ValueError (400) olur
+    inputs = {**defaults, **body}
+    for key, (kind, minimum) in fields.items():
+        if kind == "range": inputs[key] = _input_range(inputs, key, defaults[key], minimum)
+        elif kind == "count": inputs[key] = _input_count(inputs, key, minimum=minimum)
+        else: inputs[key] = _input_number(inputs, key)
+    if not isinstance(inputs["load_dependent_eff"], bool): raise ValueError("'load_dependent_eff' true / false olmalı.")
+    return inputs
+
+def _frame_records(df):
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+def _json_default(value):
+    if isinstance(value, np.integer): return int(value)
+    if isinstance(value, np.floating): return _json_number(value)
+    if isinstance(value, np.bool_): return bool(value)
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(value).__name__}")
+
+class _ServiceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256 # Eşzamanlı çok sayıda istemcide bağlantılar reddedilmesin (varsayılan 5)
+
+class ComputeService:
+    """
+    Sayfaların ürettiği yakıt sonuçlarını yerel HTTP/JSON üzerinden sunan servis (sadece localhost).
+
+    POST /best_combination  {"required_power_kw", "main_gen_mcr", "main_gen_qty", "port_gen_mcr", "port_gen_qty", "duration_h"}
+    POST /power_flow        {"shaft_power_kw", "motor_eff", "converter_eff", "switchboard_eff", "generator_eff"} (verimler 0-1)
+    POST /fuel_analysis     Yakıt Analizi sayfası girdileri (FUEL_ANALYSIS_DEFAULTS anahtarları; eksikler varsayılan)
+    POST /new_combinations  Yeni Kombinasyon sayfası girdileri (NEW_COMBINATION_DEFAULTS anahtarları)
+    GET  /stats             Uç nokta gecikme yüzdelikleri ve toplu iş istatistikleri
+    GET  /health
+    Tekil nokta istekleri RequestBatcher ile toplanır; dispatch haritaları ve sayfa sonuçları uygulamanın
+    önbelleklerinden (get_dispatch_map, st.cache_data) gelir.
+    """
+    def __init__(self, host=COMPUTE_SERVICE_HOST, port=COMPUTE_SERVICE_PORT):
+        self.latency = LatencyRecorder()
+        self.batchers = {"best_combination": RequestBatcher(_best_combination_batch), "power_flow": RequestBatcher(_power_flow_batch)}
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self): service._dispatch(self, "GET")
+            def do_POST(self): service._dispatch(self, "POST")
+            def log_message(self, format, *args): _LOGGER.debug(format, *args)
+
+        self.server = _ServiceHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="compute-service", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # --- Uç noktalar ---
+    def best_combination(self, body):
+        main_gen_mcr = _input_number(body, "main_gen_mcr")
+        if main_gen_mcr <= 0: raise ValueError("'main_gen_mcr' pozitif olmalı.")
+        # MCR'lar kırpılmadan geçer (kesirli katalog MCR'ları); tam değerler int kalır, önbellek anahtarları sayfalarla aynı olur
+        fleet = (mcr_value(main_gen_mcr), _input_count(body, "main_gen_qty", minimum=1),
+                 mcr_value(_input_number(body, "port_gen_mcr", 0)), _input_count(body, "port_gen_qty", 0))
+        return self.batchers["best_combination"].submit(fleet, (_input_number(body, "required_power_kw"), _input_number(body, "duration_h", 1.0)))
+
+    def power_flow(self, body):
+        efficiencies = tuple(_input_number(body, key, upper=1.0) for key in ("motor_eff", "converter_eff", "switchboard_eff", "generator_eff"))
+        return self.batchers["power_flow"].submit(efficiencies, _input_number(body, "shaft_power_kw"))
+
+    def fuel_analysis(self, body):
+        summary, detailed, usage = fuel_analysis_results(_page_inputs(body, FUEL_ANALYSIS_DEFAULTS, _FUEL_ANALYSIS_FIELDS))
+        return {"summary": _frame_records(summary), "detailed": _frame_records(detailed), "usage": _frame_records(usage)}
+
+    def new_combinations(self, body):
+        inputs = _page_inputs(body, NEW_COMBINATION_DEFAULTS, _NEW_COMBINATION_FIELDS)
+        for key in ("motor_eff", "converter_eff", "switchboard_eff", "generator_elec_eff"): # Yüzde verimler (0, 100]
+            inputs[key] = _input_number(inputs, key, upper=100.0)
+            if inputs[key] == 0: raise ValueError(f"'{key}' sıfır olamaz.")
+        if inputs["load_sharing"] not in LOAD_SHARING_LABELS: raise ValueError(f"'load_sharing' şunlardan biri olmalı: {', '.join(LOAD_SHARING_LABELS)}.")
+        summary, detailed, usage = new_combination_results(inputs)
+        return {"summary": _frame_records(summary), "detailed": _frame_records(detailed), "usage": _frame_records(usage)}
+
+    def stats(self, body=None):
+        return {"latency": self.latency.percentiles(), "batching": {name: b.stats() for name, b in self.batchers.items()}}
+
+    def _dispatch(self, handler, method):
+        started = time.perf_counter()
+        routes = {
+            ("POST", "/best_combination"): self.best_combination, ("POST", "/power_flow"): self.power_flow,
+            ("POST", "/fuel_analysis"): self.fuel_analysis, ("POST", "/new_combinations"): self.new_combinations,
+            ("GET", "/stats"): self.stats, ("GET", "/health"): lambda body: {"status": "ok"}
+        }
+        path = handler.path.split("?", 1)[0]
+        route = routes.get((method, path))
+        try:
+            if route is None:
+                status, payload = 404, {"error": f"Bilinmeyen uç nokta: {method} {path}"}
+            else:
+                body = None
+                if method == "POST":
+                    length = int(handler.headers.get("Content-Length") or 0)
+                    body = json.loads(handler.rfile.read(length) or b"{}", parse_constant=_reject_constant, parse_float=_finite_float)
+                    if not isinstance(body, dict): raise ValueError("İstek gövdesi bir JSON nesnesi olmalı.")
+                status, payload = 200, route(body)
+        except (KeyError, ValueError, TypeError) as e:
+            status, payload = 400, {"error": f"Geçersiz istek: {e}"}
+        except Exception as e:
+            _LOGGER.exception("Hesap servisi hatası: %s %s", method, path)
+            status, payload = 500, {"error": str(e)}
+        data = json.dumps(_json_safe(payload), default=_json_default, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+        if route is not None and path != "/stats": self.latency.record(path, (time.perf_counter() - started) * 1000)
+
+@st.cache_resource
+def start_compute_service():
+    # Streamlit sunucusuyla aynı süreçte (aynı önbellekleri paylaşarak) bir kez başlatılır; kapalıysa None.
+    if not COMPUTE_SERVICE_ENABLED: return None
+    try:
+        return ComputeService().start()
+    except OSError: # Port kullanımdaysa (örn. başka bir sunucu süreci) uygulama servissiz devam eder
+        _LOGGER.exception("Hesap servisi başlatılamadı (%s:%s).", COMPUTE_SERVICE_HOST, COMPUTE_SERVICE_PORT)
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel yakıt hesap servisi (HTTP/JSON).")
+    parser.add_argument("--host", default=COMPUTE_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=COMPUTE_SERVICE_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    service = ComputeService(args.host, args.port)
+    _LOGGER.info("Hesap servisi: http://%s:%s", *service.address[:2])
+    try:
+        service.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server.server_close()
+
+if __name__ == "__main__":
+    main()
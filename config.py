@@ -1,4 +1,5 @@
 # config.py
+import os
 
 # SFoC verileri (load-% : g/kWh) - Sabit veri
 sfoc_data_global = {
@@ -50,9 +51,136 @@ SFOC_DATA_AUX_DG = {
 }
 
 # Tüm SFOC eğrilerini bir arada tutan bir sözlük (get_best_combination'a geçmek için faydalı olabilir)
+# Uygulama eğrileri SFOC_LIBRARY_DIR'deki dosyalardan okur (sfoc_library.py); buradakiler dosyası olmayan eğrilerin varsayılanıdır.
 ALL_SFOC_CURVES = {
     "main_engine": SFOC_DATA_MAIN_ENGINE,
     "main_de_gen": SFOC_DATA_MAIN_DE_GEN,
     "port_gen": SFOC_DATA_PORT_GEN,
     "aux_dg": SFOC_DATA_AUX_DG
-}
\ No newline at end of file
+}
+
+# Uyarlamalı güç taraması (get_best_combination'ın seçiminin değiştiği noktalar etrafında inceltme)
+ADAPTIVE_SWEEP_COARSE_STEP_KW = 400     # İlk kaba tarama adımı
+ADAPTIVE_SWEEP_MIN_STEP_KW = 10         # İnceltmenin ineceği en küçük adım (tolerans)
+ADAPTIVE_SWEEP_SLOPE_TOLERANCE = 0.01   # Komşu yarım aralıklar arasındaki izin verilen bağıl yakıt eğimi farkı
+
+# Dispatch kırılma noktası haritası (dispatch_map.py)
+DISPATCH_MAP_SCAN_STEP_KW = 50      # Strateji değişimlerini yakalamak için ilk tarama adımı
+DISPATCH_MAP_TOLERANCE_KW = 0.01    # Segment sınırlarının ikiye bölme ile bulunacağı hassasiyet
+DISPATCH_MAP_CACHE_SIZE = 4096      # Süreç genelinde saklanan en fazla harita (harita başına birkaç KB; bir boyutlandırma araması yüzlerce filo kurar)
+
+# Zaman alanı sefer simülasyonu (voyage_simulator.py)
+SIM_MIN_RUN_TIME_S = 1800                          # Devreye alınan jeneratörün en az çalışma süresi (s)
+SIM_START_FUEL_KG = {"Ana": 12.0, "Liman": 5.0}    # Her devreye almada harcanan ek yakıt (kg)
+SIM_HYSTERESIS_FRACTION = 0.05                     # Durdurma kararı için yük artışı payı (histerezis bandı)
+
+# Varsayılan elektriksel zincir verimi (motor * konvertör * pano * alternatör), yeni kombinasyon sayfasının varsayılanları
+DEFAULT_TOTAL_ELEC_EFF_FACTOR = 0.97 * 0.985 * 0.995 * 0.98
+
+# Filo analizi (fleet_analysis.py): paralel işçi süreç sayısı (None: CPU sayısı)
+FLEET_MAX_WORKERS = None
+
+# Ölçüm loglarından SFOC eğrisi uydurma (sfoc_fitting.py)
+SFOC_FIT_DEGREE = 2                       # SFOC(yük) polinom derecesi
+SFOC_FIT_CHUNK_ROWS = 500_000             # Bir seferde okunan log satırı (bellek sınırı)
+SFOC_FIT_MAX_PASSES = 8                   # En fazla log geçişi (1 OLS + Huber IRLS geçişleri)
+SFOC_FIT_HUBER_K = 1.345                  # Huber ağırlık eşiği (robust ölçek katı)
+SFOC_FIT_VALID_LOAD_RANGE = (5.0, 115.0)  # Uydurmaya alınan yük aralığı (%)
+SFOC_FIT_VALID_SFOC_RANGE = (100.0, 400.0) # Fiziksel olarak makul SFOC aralığı (g/kWh)
+
+# Oturum sonuç deposu (session_store.py): tüm oturumlarca paylaşılan, içerik özetine göre tekilleştirilen sonuç tabloları
+SESSION_RESULT_SPILL_DIR = None      # Boşta kalan sonuçlar için özel alt klasörün açılacağı yer (None: sistem geçici klasörü)
+SESSION_RESULT_SPILL_IDLE_S = 900    # Bu süre erişilmeyen sonuçlar bellekten diske taşınır (s)
+SESSION_RESULT_EXPIRE_S = 86400      # Bu süre erişilmeyen sonuçlar tamamen silinir (s)
+
+# Sayfa girdilerinin varsayılan değerleri (widget'lar ve başlangıçta önbellek ısıtma aynı değerleri kullanır)
+FUEL_ANALYSIS_DEFAULTS = {
+    "gen_power_range": (2000, 3400), "sea_power_range": (3000, 4400), "maneuver_power_range": (1600, 2700),
+    "sea_duration": 48.0, "maneuver_duration": 4.0, "main_engine_mcr": 7200, "conv_aux_dg_mcr": 800, "aux_power_kw": 300,
+    "gen_qty_range": (3, 3), "load_dependent_eff": False
+}
+NEW_COMBINATION_DEFAULTS = {
+    "main_gen_mcr": 2400, "main_gen_qty": 3, "port_gen_mcr": 1000, "port_gen_qty": 1,
+    "sea_power_range": (3000, 4400), "maneuver_power_range": (1600, 2700),
+    "sea_duration": 48.0, "maneuver_duration": 4.0, "main_engine_mcr_ref": 7200, "conv_aux_dg_mcr": 800, "aux_power_kw": 300,
+    "motor_eff": 97.0, "converter_eff": 98.5, "switchboard_eff": 99.5, "generator_elec_eff": 98.0,
+    "load_sharing": "proportional", "load_dependent_eff": False
+}
+
+# Sunucu başlangıcında arka planda önceden hesaplanacak senaryolar (cache_warmup.py).
+# Her senaryo bir sayfayı ("fuel_analysis" / "new_combinations") ve varsayılanlardan farklı girdileri belirtir.
+WARMUP_ENABLED = True
+WARMUP_SCENARIOS = [
+    {"page": "fuel_analysis"},
+    {"page": "new_combinations"},
+    {"page": "new_combinations", "port_gen_qty": 0},
+    {"page": "new_combinations", "main_gen_mcr": 2000, "main_gen_qty": 4}
+]
+
+# Optimum jeneratör boyutlandırma (generator_sizing.py)
+SIZING_MCR_STEP_KW = 50         # MCR arama ızgarası adımı (kW)
+SIZING_BRACKET_POINTS = 7       # Altın oran aramasından önce vadiyi bulmak için kaba tarama noktası sayısı
+
+# Enerji depolama (batarya) dispatch'i (energy_storage.py)
+BATTERY_SOC_GRID_POINTS = 101               # Dinamik programlamadaki SOC ızgarası nokta sayısı
+BATTERY_SOC_LIMITS = (0.2, 0.9)             # İzin verilen SOC aralığı (kapasitenin oranı)
+BATTERY_UNSERVED_PENALTY_T_PER_KWH = 1.0    # Karşılanamayan enerji cezası (ton/kWh); yakıt tasarrufundan her zaman baskın
+BATTERY_MIN_BLOCK_OFFSETS = 4               # Karar adımı (örnek bloğu) tam C-oranında en az bu kadar SOC ızgara adımı hareket edebilmeli
+BATTERY_MAX_TRANSITIONS = 20_000_000        # Örnek x SOC geçişi dizilerinin üst sınırı (bellek); aşılırsa hata
+
+# İşçi süreçlerle paylaşılan (bellek eşlemeli) SFOC / dispatch tabloları (shared_tables.py)
+SHARED_TABLES_DIR = None            # Süreç başına özel tablo klasörünün açılacağı yer (None: sistem geçici klasörü)
+
+# Yerel hesap servisi (compute_service.py): diğer araçlar için HTTP/JSON uç noktaları, sadece localhost
+COMPUTE_SERVICE_ENABLED = False             # True: Streamlit uygulamasıyla aynı süreçte başlatılır (önbellekler ortak)
+COMPUTE_SERVICE_HOST = "127.0.0.1"
+COMPUTE_SERVICE_PORT = 8765
+COMPUTE_SERVICE_BATCH_WINDOW_S = 0.005      # Eşzamanlı tekil isteklerin toplanacağı bekleme süresi (s)
+COMPUTE_SERVICE_MAX_BATCH = 512             # Bir toplu değerlendirmedeki en fazla istek
+COMPUTE_SERVICE_LATENCY_WINDOW = 2000       # Gecikme yüzdelikleri için uç nokta başına saklanan son istek sayısı
+
+# Ekonomik yük paylaşımı (economic_dispatch.py): çalışan jeneratörler arasında eşit artımsal maliyet
+ECONOMIC_DISPATCH_LOAD_LIMITS = (25.0, 100.0)   # Birim başı izin verilen yük aralığı (%)
+ECONOMIC_DISPATCH_TABLE_STEP_PERCENT = 0.5      # Artımsal maliyet tablosunun yük adımı (%)
+ECONOMIC_DISPATCH_TOLERANCE_KW = 1e-3           # Lambda iterasyonunda toplam güç uyuşmazlığı toleransı
+ECONOMIC_DISPATCH_MAX_ITERATIONS = 30
+
+# Geliştirici gecikme paneli (telemetry.py): sayfa aşamalarının süreleri, önbellek hit/miss, tablo boyutları
+TELEMETRY_ENABLED = False           # Kenar çubuğundaki onay kutusunun varsayılanı
+TELEMETRY_HISTORY_RUNS = 500        # Süreç genelinde saklanan son çalıştırma sayısı (tüm oturumlar)
+
+# Birim güç taramasında eşit jeneratörlerin devreye alınması (core_calculations.commit_generators)
+UNIT_COMMITMENT_LOAD_BAND = (40.0, 92.0)    # Jeneratör başı izin verilen yük aralığı (%)
+
+# Jeneratör seti kataloğu (genset_catalog.py): üretici modelleri (MCR, SFOC tablosu, ağırlık, taban alanı)
+GENSET_CATALOG_DIR = None                           # JSON / CSV katalog dosyalarının klasörü (None: sadece sayfadan yüklenenler)
+GENSET_CATALOG_SFOC_LOADS = (25, 50, 75, 85, 100)   # SFOC tablosunun önceden değerlendirildiği yükler (%)
+GENSET_CATALOG_MAX_OVERSIZE = 1.6                   # Aday filonun kurulu gücü en fazla en yüksek talebin bu katı
+GENSET_CATALOG_MAX_FLEETS = 80                      # Değerlendirilecek en fazla aday filo (kurulu güce göre artan)
+
+# Sürümlü SFOC eğri dosyaları (sfoc_library.py): <anahtar>.json, değişiklikler sunucu yeniden başlatılmadan fark edilir
+SFOC_LIBRARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sfoc_library")
+SFOC_LIBRARY_POLL_S = 2.0           # Dosyaların (mtime/boyut, gerekirse içerik özeti) kontrol aralığı (s)
+
+# Grafik seyreltme (plot_decimation.py): büyük tarama sonuçlarında tarayıcıya gönderilen nokta sayısı sınırlı tutulur
+PLOT_MAX_POINTS_PER_CHART = 2000    # Grafik başına gönderilen en fazla nokta (seri başına kova min/maks seyreltme)
+PLOT_MAX_BAR_GROUPS = 150           # Bu sayıdan fazla x değeri olan çubuk grafikler WebGL çizgi/işaretçiye döner
+PLOT_WEBGL_MIN_POINTS = 1000        # Bu sayıdan fazla noktalı çizgi / saçılım grafikleri WebGL (scattergl) ile çizilir
+
+# Sefer metrikleri (voyage_metrics.py): yakıt ile aynı geçişte biriktirilen CO2, çalışma ve yük bandı saatleri
+CO2_EMISSION_FACTOR = 3.206         # t CO2 / t yakıt (MGO/MDO dönüşüm katsayısı, IMO Cf)
+METRIC_LOAD_BAND = (65.0, 92.0)     # Jeneratör başı verimli yük bandı (%): altı / içi / üstü ayrı saat sayacı
+
+# Yüke bağlı elektriksel verim (core_calculations.CompiledEfficiencyTable): bileşen verimi (%) - şaft yükü (%, anma
+# tahrik gücüne göre). Eğriler anma (%100) değerine oranlanır; sayfalardaki / manifest'teki verimler anma verimi kabul edilir.
+# Değerler üretici verisi değil, tipik kısmi yük eğilimini gösteren temsili değerlerdir; ekipman verisiyle değiştirilmelidir.
+# Özellik varsayılan olarak kapalıdır (sonuçlar sabit verimle hesaplanır), sayfalarda / manifest'te açılır.
+ELECTRICAL_EFFICIENCY_CURVES = {
+    "motor":       {10: 90.0, 25: 95.0, 50: 96.7, 75: 97.0, 100: 97.0},
+    "converter":   {10: 94.0, 25: 97.0, 50: 98.2, 75: 98.5, 100: 98.5},
+    "switchboard": {10: 99.0, 25: 99.3, 50: 99.5, 75: 99.5, 100: 99.5},
+    "alternator":  {10: 92.0, 25: 95.5, 50: 97.4, 75: 98.0, 100: 98.0},
+}
+ELECTRICAL_EFFICIENCY_LOAD_DEPENDENT = False    # Filo manifest'inde 'load_dependent_eff' verilmemişse (sayfalar: *_DEFAULTS)
+ELECTRICAL_EFFICIENCY_TABLE_STEP_PERCENT = 0.5  # Derlenmiş tablonun yük adımı (%)
+ELECTRICAL_EFFICIENCY_TABLE_MAX_LOAD = 150.0    # Tablonun üst yük sınırı (%); üstü ve eğri uçlarının dışı sabit tutulur
@@ -1,18 +1,166 @@
 # core_calculations.py
+import re
 import numpy as np
-from scipy.interpolate import interp1d
+from scipy.interpolate import BSpline, interp1d
+
+from config import (
+    UNIT_COMMITMENT_LOAD_BAND,
+    ELECTRICAL_EFFICIENCY_CURVES,
+    ELECTRICAL_EFFICIENCY_TABLE_STEP_PERCENT,
+    ELECTRICAL_EFFICIENCY_TABLE_MAX_LOAD
+)
+from economic_dispatch import economic_dispatch
 
 # --- Ortak Hesaplama Fonksiyonları ---
-def determine_generator_usage(total_power, unit_power):
+def commit_generators(total_power, unit_power, installed_qty, load_band=UNIT_COMMITMENT_LOAD_BAND):
+    """
+    Eşit birimlerden oluşan bir filoda çalışacak jeneratör sayısı, kapalı formda ve vektörel (argümanlar yayınlanır).
+    Yük bandının üst sınırını aşmayan en küçük adet n = ceil(P / (üst * U)); kayan nokta sınırında bir adet
+    düzeltilir. n kurulu adedi aşıyorsa veya yük bandın altına düşüyorsa (daha fazla jeneratör yükü daha da
+    düşürür) geçerli bir dağıtım yoktur. Döndürür: (adet, jeneratör başı yük %); geçersiz noktalarda (0, NaN).
+    """
+    total_power, unit_power, installed_qty = np.broadcast_arrays(
+        np.asarray(total_power, dtype=float), np.asarray(unit_power, dtype=float), np.asarray(installed_qty)
+    )
+    low, high = load_band
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = np.maximum(np.ceil(total_power * 100 / (high * unit_power)), 1)
+        n = np.where(total_power / (n * unit_power) * 100 > high, n + 1, n)
+        n = np.where((n > 1) & (total_power / ((n - 1) * unit_power) * 100 <= high), n - 1, n)
+        load = total_power / (n * unit_power) * 100
+    valid = (unit_power > 0) & (total_power > 0) & np.isfinite(load) & (n <= installed_qty) & (load >= low)
+    return np.where(valid, n, 0).astype(int), np.where(valid, load, np.nan)
+
+def determine_generator_usage(total_power, unit_power, installed_qty=3):
     if unit_power <= 0: return None, None
     if total_power <= 0: return 0, 0.0
-    for n in range(1, 4):
-        load_per_gen = (total_power / (n * unit_power)) * 100
-        if 40 <= load_per_gen <= 92:
-            return n, load_per_gen
-    return None, None
+    n, load = commit_generators(total_power, unit_power, installed_qty)
+    return (int(n), float(load)) if n > 0 else (None, None)
+
+class CompiledSfocCurve(dict):
+    """
+    SFOC tablosu (yük-% : g/kWh) gibi davranan, interpolatörü bir kez kurulmuş eğri.
+    Sözlük yerine geçebilir (ALL_SFOC_CURVES vb.), ayrıca yük dizileri üzerinde vektörel çağrılabilir.
+    Noktalardan kuadratik interpolasyonla ya da (ölçüm verisinden uydurulmuş) bir polinomdan oluşturulabilir.
+    Kurulduktan sonra noktaları değiştirilmemelidir.
+    """
+    def __init__(self, sfoc_data_input):
+        super().__init__(sfoc_data_input)
+        self._interp_func = None
+        self.coefficients = None # Polinom eğriler için (yük/100 cinsinden, yüksek dereceden başlayarak)
+        if len(self) >= 2:
+            loads = np.array(list(self.keys()), dtype=float)
+            sfocs = np.array(list(self.values()), dtype=float)
+            sorted_indices = np.argsort(loads)
+            try:
+                self._interp_func = interp1d(loads[sorted_indices], sfocs[sorted_indices], kind='quadratic', fill_value="extrapolate")
+            except ValueError: self._interp_func = None
+
+    @classmethod
+    def from_polynomial(cls, coefficients, sample_loads=(25, 50, 75, 85, 100)):
+        # SFOC(yük) = polyval(coefficients, yük/100); sözlük noktaları gösterim için polinomdan örneklenir.
+        coefficients = tuple(float(c) for c in coefficients)
+        curve = cls({load: round(float(np.polyval(coefficients, load / 100.0)), 3) for load in sample_loads})
+        curve.coefficients = coefficients
+        curve._interp_func = lambda load_percentage: np.polyval(coefficients, load_percentage / 100.0)
+        return curve
+
+    @classmethod
+    def from_spline(cls, sfoc_data_input, knots, coefficients, degree):
+        # spline_tables() çıktısından (örn. paylaşılan bellekteki dizilerden) interpolasyonu yeniden kurmadan oluşturur.
+        curve = cls.__new__(cls)
+        dict.__init__(curve, sfoc_data_input)
+        curve.coefficients = None
+        curve._interp_func = BSpline.construct_fast(knots, coefficients, int(degree), extrapolate=True)
+        return curve
+
+    def spline_tables(self):
+        # Nokta tabanlı eğrinin kuadratik spline'ı: (düğümler, katsayılar, derece); polinom / geçersiz eğrilerde None.
+        spline = getattr(self._interp_func, "_spline", None)
+        if self.coefficients is not None or spline is None: return None
+        return np.asarray(spline.t, dtype=float), np.ascontiguousarray(spline.c[:, 0], dtype=float), spline.k
+
+    @property
+    def is_valid(self):
+        return self._interp_func is not None
+
+    def fingerprint(self):
+        if self.coefficients is not None: return ("polynomial", self.coefficients)
+        return tuple(sorted((float(l), float(s)) for l, s in self.items()))
+
+    def __call__(self, load_percentage):
+        if self._interp_func is None: return np.full(np.shape(load_percentage), np.nan)
+        return self._interp_func(np.asarray(load_percentage, dtype=float))
+
+    def __reduce__(self):
+        # Polinom eğriler de işçi süreçlere doğru aktarılsın (lambda pickle edilemez)
+        if self.coefficients is not None: return (CompiledSfocCurve.from_polynomial, (self.coefficients, tuple(self.keys())))
+        return (CompiledSfocCurve, (dict(self),))
+
+def compile_sfoc_curves(sfoc_curves):
+    # {"main_de_gen": {...}, ...} sözlüğündeki her eğriyi CompiledSfocCurve'e çevirir (zaten derlenmişse dokunmaz).
+    return {key: curve if isinstance(curve, CompiledSfocCurve) else CompiledSfocCurve(curve) for key, curve in sfoc_curves.items()}
+
+def sfoc_curves_fingerprint(sfoc_curves, keys=None):
+    # Önbellek anahtarı olarak kullanılabilecek, eğri içeriğinden türetilmiş değiştirilemez temsil.
+    keys = sorted(sfoc_curves) if keys is None else keys
+    return tuple(
+        (key, sfoc_curves[key].fingerprint() if isinstance(sfoc_curves[key], CompiledSfocCurve)
+              else tuple(sorted((float(l), float(s)) for l, s in sfoc_curves[key].items())))
+        for key in keys if key in sfoc_curves
+    )
+
+class CompiledEfficiencyTable:
+    """
+    Elektriksel zincir bileşenlerinin (motor, konvertör, pano, alternatör) yüke bağlı verim eğrilerinin,
+    eşit aralıklı şaft yükü ızgarasında bir kez değerlendirilmiş kısmi yük katsayıları (verim / anma verimi).
+    Zincirin toplam katsayısı (bileşenlerin çarpımı) da ayrıca tutulur. Sorguda ızgara indeksi yükten doğrudan
+    hesaplanır (arama yok) ve komşu iki değer arasında doğrusal interpolasyon yapılır; tarama hızı sabit verimle aynı kalır.
+    Bileşen yükü şaft yüküyle aynı kabul edilir (seri zincir). Eğri uçlarının dışı ve tablo üstü sabit tutulur.
+    """
+    def __init__(self, curves=ELECTRICAL_EFFICIENCY_CURVES, step_percent=ELECTRICAL_EFFICIENCY_TABLE_STEP_PERCENT,
+                 max_load_percent=ELECTRICAL_EFFICIENCY_TABLE_MAX_LOAD):
+        self.curves = {component: dict(points) for component, points in curves.items()}
+        self.step_percent = float(step_percent)
+        self.loads = np.linspace(0.0, max_load_percent, int(round(max_load_percent / step_percent)) + 1)
+        self.factors = {}
+        for component, points in self.curves.items():
+            loads, efficiencies = (np.array(v, dtype=float) for v in zip(*sorted(points.items())))
+            rated = np.interp(100.0, loads, efficiencies)
+            if not (efficiencies > 0).all() or rated <= 0: raise ValueError(f"{component}: verim değerleri pozitif olmalı")
+            self.factors[component] = np.interp(self.loads, loads, efficiencies) / rated
+        self.chain_factors = np.prod(list(self.factors.values()), axis=0) if self.factors else np.ones_like(self.loads)
+
+    def _lookup(self, table, load_percent):
+        position = np.clip(np.asarray(load_percent, dtype=float), 0.0, self.loads[-1]) / self.step_percent
+        index = np.minimum(position.astype(int), len(table) - 2)
+        weight = position - index
+        return table[index] * (1.0 - weight) + table[index + 1] * weight
+
+    def factor(self, component, load_percent):
+        # Bileşenin kısmi yük katsayısı (anma yükünde 1); tabloda olmayan bileşen için 1
+        if component not in self.factors: return np.ones(np.shape(load_percent))
+        return self._lookup(self.factors[component], load_percent)
+
+    def chain_factor(self, load_percent):
+        # Zincirin toplam kısmi yük katsayısı: DE gücü = sabit verimli DE gücü / katsayı
+        return self._lookup(self.chain_factors, load_percent)
+
+    def fingerprint(self):
+        return tuple((component, tuple(sorted(points.items()))) for component, points in sorted(self.curves.items())) + (self.step_percent,)
+
+_ELECTRICAL_EFFICIENCY_TABLE = None
+
+def electrical_efficiency_table():
+    # config.py eğrilerinden derlenmiş tablo; süreç başına bir kez kurulur.
+    global _ELECTRICAL_EFFICIENCY_TABLE
+    if _ELECTRICAL_EFFICIENCY_TABLE is None: _ELECTRICAL_EFFICIENCY_TABLE = CompiledEfficiencyTable()
+    return _ELECTRICAL_EFFICIENCY_TABLE
 
 def interpolate_sfoc_non_linear(load_percentage, sfoc_data_input):
+    if isinstance(sfoc_data_input, CompiledSfocCurve):
+        if not sfoc_data_input.is_valid: return None
+        return float(sfoc_data_input(load_percentage))
     if not isinstance(sfoc_data_input, dict) or len(sfoc_data_input) < 2: return None
     loads = list(sfoc_data_input.keys())
     sfocs = list(sfoc_data_input.values())
@@ -32,26 +180,86 @@ def calculate_fuel(power_output_kw, load_percent_on_engine, duration_hr, sfoc_da
     if sfoc is None or sfoc < 50: return 0.0
     return (power_output_kw * duration_hr * sfoc) / 1_000_000
 
-def calculate_power_flow(shaft_power, motor_eff, converter_eff, switchboard_eff, generator_alternator_eff):
-    if shaft_power <= 0: return None, None
-    if not all([motor_eff > 0, converter_eff > 0, switchboard_eff > 0, generator_alternator_eff > 0]): return None, None
-    p_shaft = shaft_power; p_motor_input = p_shaft / motor_eff; p_converter_input = p_motor_input / converter_eff
+def _power_flow_chain(p_shaft, motor_eff, converter_eff, switchboard_eff, generator_alternator_eff):
+    # Şafttan geriye doğru her elemanın giriş gücü ve kaybı (skaler veya dizi)
+    p_motor_input = p_shaft / motor_eff; p_converter_input = p_motor_input / converter_eff
     p_switchboard_input_from_gens = p_converter_input / switchboard_eff; p_alternator_elec_output = p_switchboard_input_from_gens
     p_alternator_mech_input = p_alternator_elec_output / generator_alternator_eff
-    if any([not np.isfinite(val) for val in [p_motor_input, p_converter_input, p_switchboard_input_from_gens, p_alternator_mech_input]]): return None, None
     loss_motor = p_motor_input - p_shaft; loss_converter = p_converter_input - p_motor_input
     loss_switchboard = p_switchboard_input_from_gens - p_converter_input; loss_alternator = p_alternator_mech_input - p_alternator_elec_output
     power_values = { "shaft": p_shaft, "motor_input": p_motor_input, "converter_input": p_converter_input, "switchboard_input_from_gens": p_switchboard_input_from_gens, "alternator_elec_output": p_alternator_elec_output, "alternator_mech_input": p_alternator_mech_input }
     loss_values = { "motor": loss_motor, "converter": loss_converter, "switchboard": loss_switchboard, "alternator": loss_alternator }
     return power_values, loss_values
 
+def calculate_power_flow(shaft_power, motor_eff, converter_eff, switchboard_eff, generator_alternator_eff,
+                         efficiency_table=None, rated_shaft_power_kw=None):
+    # Girdilerden herhangi biri dizi ise tüm şaft gücü aralığı tek geçişte hesaplanır; geçersiz elemanlar NaN olur.
+    # efficiency_table verilirse verimler anma verimi kabul edilip şaft yüküne göre kısmi yük katsayısıyla çarpılır.
+    if efficiency_table is not None and rated_shaft_power_kw:
+        load_percent = np.maximum(np.asarray(shaft_power, dtype=float), 0.0) / rated_shaft_power_kw * 100
+        scalar = np.ndim(shaft_power) == 0
+        motor_eff, converter_eff, switchboard_eff, generator_alternator_eff = (
+            float(eff * factor) if scalar and np.ndim(eff) == 0 else eff * factor
+            for eff, factor in zip((motor_eff, converter_eff, switchboard_eff, generator_alternator_eff),
+                                   (efficiency_table.factor(component, load_percent) for component in ("motor", "converter", "switchboard", "alternator")))
+        )
+    inputs = (shaft_power, motor_eff, converter_eff, switchboard_eff, generator_alternator_eff)
+    if any(np.ndim(val) > 0 for val in inputs):
+        p_shaft, motor_eff, converter_eff, switchboard_eff, generator_alternator_eff = np.broadcast_arrays(*(np.asarray(val, dtype=float) for val in inputs))
+        valid = (p_shaft > 0) & (motor_eff > 0) & (converter_eff > 0) & (switchboard_eff > 0) & (generator_alternator_eff > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            power_values, loss_values = _power_flow_chain(np.where(valid, p_shaft, np.nan), motor_eff, converter_eff, switchboard_eff, generator_alternator_eff)
+        valid &= np.isfinite(power_values["alternator_mech_input"])
+        return ({key: np.where(valid, val, np.nan) for key, val in power_values.items()},
+                {key: np.where(valid, val, np.nan) for key, val in loss_values.items()})
+
+    if shaft_power <= 0: return None, None
+    if not all([motor_eff > 0, converter_eff > 0, switchboard_eff > 0, generator_alternator_eff > 0]): return None, None
+    power_values, loss_values = _power_flow_chain(shaft_power, motor_eff, converter_eff, switchboard_eff, generator_alternator_eff)
+    if any([not np.isfinite(val) for val in [power_values["motor_input"], power_values["converter_input"], power_values["switchboard_input_from_gens"], power_values["alternator_mech_input"]]]): return None, None
+    return power_values, loss_values
+
+def total_electrical_efficiency(motor_eff_perc, converter_eff_perc, switchboard_eff_perc, generator_elec_eff_perc):
+    # Yüzde verimliliklerden toplam elektriksel zincir verim faktörü (motor * konvertör * pano * alternatör).
+    return (motor_eff_perc / 100.0) * (converter_eff_perc / 100.0) * (switchboard_eff_perc / 100.0) * (generator_elec_eff_perc / 100.0)
+
+def required_de_power_for_mode(shaft_power, mode_label, total_elec_eff_factor, conventional_shaft_eff, propulsion_path_inv_eff, aux_power_demand_kw,
+                               efficiency_table=None, rated_shaft_power_kw=None):
+    # Yeni kombinasyon sayfasındaki şaft gücü -> jeneratörlerden istenen DE gücü dönüşümü (skaler veya dizi).
+    # Seyir: şaft gücü geleneksel şaft verimiyle tabana indirilip elektriksel zincir verimine bölünür.
+    # Manevra: sabit tahrik yolu ters verimi + yardımcı güç ihtiyacı.
+    # efficiency_table verilirse tahrik yolu verimleri şaft yüküne (rated_shaft_power_kw'a göre) bağlıdır.
+    shaft_power = np.maximum(np.asarray(shaft_power, dtype=float), 0.0)
+    mode_label = np.asarray(mode_label)
+    aux_power = aux_power_demand_kw if aux_power_demand_kw > 0 else 0.0
+    chain_factor = 1.0
+    if efficiency_table is not None and rated_shaft_power_kw:
+        chain_factor = efficiency_table.chain_factor(shaft_power / rated_shaft_power_kw * 100)
+    power_basis_sea = shaft_power * conventional_shaft_eff
+    if total_elec_eff_factor > 1e-9:
+        de_power_sea = power_basis_sea / (total_elec_eff_factor * chain_factor)
+    else:
+        de_power_sea = np.where(power_basis_sea > 0, np.inf, 0.0)
+    de_power_maneuver = shaft_power * propulsion_path_inv_eff / chain_factor + aux_power
+    return np.where(mode_label == "Seyir", de_power_sea, np.where(mode_label == "Manevra", de_power_maneuver, 0.0))
+
 def find_min_gens_for_power(required_power, unit_mcr, unit_qty):
     if unit_mcr <= 0 or unit_qty <= 0: return None
     if required_power <= 0: return 0
     min_gens = np.ceil(required_power / unit_mcr)
     return int(min_gens) if min_gens <= unit_qty else None
 
-def evaluate_combination(required_de_power, running_gens_info, sfoc_curves, duration):
+def _economic_power_per_gen(required_de_power, running_gens_info, sfoc_curves):
+    # Farklı tipteki çalışan jeneratörler arasında eşit artımsal maliyetle paylaşım (aynı tipler eşit yüklenir)
+    unit_types = list(dict.fromkeys(running_gens_info))
+    curves = compile_sfoc_curves({gen_type: sfoc_curves['main_de_gen' if gen_type == "Ana" else 'port_gen'] for _, gen_type in unit_types})
+    if not all(curve.is_valid for curve in curves.values()): return None
+    result = economic_dispatch(required_de_power, [(mcr, running_gens_info.count((mcr, gen_type)), curves[gen_type]) for mcr, gen_type in unit_types])
+    power_by_type = dict(zip(unit_types, result["unit_power_kw"][0]))
+    return [float(power_by_type[info]) for info in running_gens_info]
+
+def evaluate_combination(required_de_power, running_gens_info, sfoc_curves, duration, load_sharing="proportional"):
+    # load_sharing: "proportional" (MCR orantılı) veya "economic" (eşit artımsal maliyet, economic_dispatch.py)
     if not running_gens_info: return None
     running_mcrs = [mcr for mcr, gen_type in running_gens_info]
     total_running_capacity = sum(running_mcrs)
@@ -60,7 +268,10 @@ def evaluate_combination(required_de_power, running_gens_info, sfoc_curves, dura
     if required_de_power > total_running_capacity * 1.001: return None # %0.1 tolerans
     
     power_per_gen_list = []
-    if total_running_capacity > 0:
+    if load_sharing == "economic" and len(set(running_gens_info)) > 1:
+        power_per_gen_list = _economic_power_per_gen(required_de_power, running_gens_info, sfoc_curves)
+        if power_per_gen_list is None: return None
+    elif total_running_capacity > 0:
         # Güç, çalışan jeneratörlerin kapasiteleriyle orantılı olarak dağıtılır
         power_per_gen_list = [(required_de_power * gen_mcr / total_running_capacity) for gen_mcr in running_mcrs]
     else: # total_running_capacity = 0 ise (yukarıda kontrol edildi ama yine de)
@@ -107,9 +318,15 @@ def evaluate_combination(required_de_power, running_gens_info, sfoc_curves, dura
     else:
         return None
 
-def get_best_combination(required_de_power, main_mcr, main_qty, port_mcr, port_qty, sfoc_curves, duration):
+def get_best_combination(required_de_power, main_mcr, main_qty, port_mcr, port_qty, sfoc_curves, duration, load_sharing="proportional"):
+    _, fuel, label, loads, original_info = select_best_combination(required_de_power, main_mcr, main_qty, port_mcr, port_qty, sfoc_curves, duration, load_sharing)
+    return fuel, label, loads, original_info
+
+def select_best_combination(required_de_power, main_mcr, main_qty, port_mcr, port_qty, sfoc_curves, duration, load_sharing="proportional"):
+    # get_best_combination ile aynı karar; ek olarak seçilen strateji anahtarını da döndürür
+    # ("main_eff", "assisted_optimal", "port_only", ..., yük yoksa "no_load", seçenek yoksa "none").
     if required_de_power <= 0:
-        return 0.0, "0 kW Yük (Yakıt Yok)", [], (None, None, False)
+        return "no_load", 0.0, "0 kW Yük (Yakıt Yok)", [], (None, None, False)
 
     evaluated_options = {}
 
@@ -175,6 +392,14 @@ def get_best_combination(required_de_power, main_mcr, main_qty, port_mcr, port_q
         current_original_main_info_for_assisted = original_main_info_tuple_for_assisted_strategy
 
         for n_main_assisted_try in n_main_options_for_assisted:
+            if load_sharing == "economic":
+                # Ekonomik paylaşımda liman yükü eşit artımsal maliyetle de belirlenir. Dışbükey olmayan düşük yük bölgesinde
+                # (zarf yaklaşımı) ızgara noktası daha iyi olabildiğinden aşağıdaki ızgara adayları da yarışmaya devam eder.
+                eval_res_assisted = evaluate_combination(required_de_power, [(port_mcr, "Liman")] + [(main_mcr, "Ana")] * n_main_assisted_try, sfoc_curves, duration, load_sharing)
+                if eval_res_assisted and eval_res_assisted[0] < main_only_inefficient_candidate_fuel and eval_res_assisted[0] < best_overall_assisted_fuel:
+                    best_overall_assisted_fuel, loads_assisted = eval_res_assisted
+                    label_assisted = f"{n_main_assisted_try}x{main_mcr}kW Ana ({loads_assisted[1][1]:.1f}%) + 1x{port_mcr}kW Liman ({loads_assisted[0][1]:.1f}%)"
+                    best_overall_assisted_details = (best_overall_assisted_fuel, label_assisted, loads_assisted, original_main_info_tuple_for_assisted_strategy)
             # Liman jeneratörünün yük aralığı: %50 ile %89 arasında 5'er adımlarla.
             # Önceki kodda range(89, 49, -5) idi, bu %89, %84, ..., %54, %49 yapar.
             # İstenen aralık %60-%85 ise range(85, 59, -5) olmalıydı.
@@ -285,7 +510,45 @@ def get_best_combination(required_de_power, main_mcr, main_qty, port_mcr, port_q
              final_original_info_tuple = (original_info[0], original_info[1], original_info[2] if len(original_info) == 3 else is_assisted_flag_from_key)
         else:
             final_original_info_tuple = (None, None, is_assisted_flag_from_key)
-        return fuel, label, loads, final_original_info_tuple
+        return final_choice_key, fuel, label, loads, final_original_info_tuple
     else:
         # Bu noktaya gelinmemesi lazım eğer evaluated_options boş değilse, ama bir güvenlik önlemi.
-        return 0.0, "Uygun Kombinasyon Yok (Karar Verilemedi)", [], (None, None, False)
\ No newline at end of file
+        return "none", 0.0, "Uygun Kombinasyon Yok (Karar Verilemedi)", [], (None, None, False)
+
+# --- Uyarlamalı Güç Taraması ---
+def dispatch_label_key(label):
+    # Destekli mod etiketlerindeki "(63.2%)" gibi sürekli değişen yük yüzdelerini at;
+    # geriye sadece kombinasyonun yapısı kalır (örn. "2x2400kW Ana + 1x1000kW Liman").
+    return re.sub(r"\s*\(\s*-?[\d.]+%\)", "", label) if isinstance(label, str) else label
+
+def adaptive_power_sweep(evaluate_point, power_min, power_max, coarse_step, min_step, slope_tolerance, label_key=dispatch_label_key):
+    """
+    Güç aralığını kaba adımla tarar, sadece seçilen kombinasyonun (etiket) veya yakıt eğiminin
+    değiştiği aralıkları `min_step` kW'a kadar ikiye bölerek inceltir.
+    evaluate_point(p) -> (yakıt, etiket, ...) döndürmelidir. Sonuç: güce göre sıralı [(p, sonuç), ...]
+    """
+    if power_max < power_min: return []
+    if coarse_step <= 0 or min_step <= 0: raise ValueError("coarse_step ve min_step pozitif olmalı")
+    evaluated = {}
+
+    def point(p):
+        if p not in evaluated: evaluated[p] = evaluate_point(p)
+        return evaluated[p]
+
+    coarse_points = list(np.arange(power_min, power_max, coarse_step, dtype=float)) + [float(power_max)]
+    stack = list(zip(coarse_points[:-1], coarse_points[1:]))
+    while stack:
+        a, b = stack.pop()
+        if b - a <= min_step: continue
+        m = (a + b) / 2.0
+        (fa, la), (fm, lm), (fb, lb) = point(a)[:2], point(m)[:2], point(b)[:2]
+        split = not (label_key(la) == label_key(lm) == label_key(lb))
+        if not split:
+            # Yarım aralıkların eğimleri birbirinden belirgin farklıysa yakıt eğrisi burada kırılıyor demektir.
+            slope_left = (fm - fa) / (m - a); slope_right = (fb - fm) / (b - m)
+            scale = max(abs(slope_left), abs(slope_right), 1e-12)
+            split = abs(slope_left - slope_right) / scale > slope_tolerance
+        if split:
+            stack.append((m, b)); stack.append((a, m))
+    for p in coarse_points: point(p)
+    return sorted(evaluated.items())
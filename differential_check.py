@@ -0,0 +1,229 @@
+# differential_check.py
+"""
+Hızlandırılmış dispatch / SFOC interpolasyon motorlarını dondurulmuş referansa (reference_dispatch.py)
+karşı farksal olarak test eder. Rastgele filolar ve her filo için uç durumlar (sıfır güç, kapasite
+sınırları, %40/65/92/110 eşikleri ve bunların hemen altı/üstü, liman jeneratörsüz filolar) üretilir;
+her aday motorun yakıt, etiket ve yük dağılımı referansla toleranslar içinde karşılaştırılır.
+
+Kullanım: python differential_check.py --cases 100000 --workers 8 [--candidates core_calculations dispatch_map]
+Uyumsuzluk bulunursa çıkış kodu 1'dir.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import ALL_SFOC_CURVES, DISPATCH_MAP_TOLERANCE_KW
+from core_calculations import CompiledSfocCurve, compile_sfoc_curves, get_best_combination, interpolate_sfoc_non_linear, dispatch_label_key
+from dispatch_map import DispatchMap
+import reference_dispatch
+
+# Karşılaştırma toleransları
+FUEL_RTOL = 1e-9          # Yakıt (ton) bağıl
+FUEL_ATOL = 1e-12         # Yakıt (ton) mutlak
+LOAD_ATOL = 1e-6          # Jeneratör yükü (%) mutlak
+SFOC_RTOL = 1e-12         # SFOC (g/kWh) bağıl
+
+CASES_PER_FLEET = 500
+THRESHOLD_PERCENTS = (40, 65, 92, 100, 110)
+THRESHOLD_NUDGE = 1e-9    # Eşiklerin hemen altı/üstü için bağıl kaydırma
+DURATIONS_H = (0.5, 1.0, 4.0, 24.0, 48.0)
+
+# --- Aday motorlar: filo -> (güç, süre) -> (yakıt, etiket, yükler) ---
+def _prepare_core_calculations(fleet, compiled_curves):
+    main_mcr, main_qty, port_mcr, port_qty = fleet
+    def evaluate(power, duration):
+        return get_best_combination(power, main_mcr, main_qty, port_mcr, port_qty, compiled_curves, duration)[:3]
+    return evaluate
+
+def _prepare_dispatch_map(fleet, compiled_curves):
+    dispatch_map = DispatchMap(*fleet, compiled_curves)
+    def evaluate(power, duration):
+        label, loads = dispatch_map.combination_at(power)
+        return float(dispatch_map.fuel(power, duration)), label, loads
+    return evaluate
+
+# power_tolerance_kw: aday, segment sınırlarını bu hassasiyetle buluyorsa sınırın bu kadar yakınındaki
+# uyumsuzluklar, adayın seçtiği kombinasyon yapısı referansın (güç ± tolerans) seçimiyle aynıysa hata sayılmaz.
+CANDIDATES = {
+    "core_calculations": {"prepare": _prepare_core_calculations, "power_tolerance_kw": 0.0},
+    "dispatch_map": {"prepare": _prepare_dispatch_map, "power_tolerance_kw": DISPATCH_MAP_TOLERANCE_KW}
+}
+
+def _compiled_curve_candidate(loads, curve_data):
+    return CompiledSfocCurve(curve_data)(loads)
+
+def _core_interpolation_candidate(loads, curve_data):
+    curve = CompiledSfocCurve(curve_data)
+    return np.array([interpolate_sfoc_non_linear(load, curve) for load in loads], dtype=float)
+
+SFOC_CANDIDATES = {"compiled_curve": _compiled_curve_candidate, "core_interpolate": _core_interpolation_candidate}
+
+# --- Girdi üretimi ---
+def generate_fleets(n_fleets, rng):
+    # Sabit uç filolar (varsayılan, liman jeneratörsüz, liman > ana) + rastgele filolar
+    fleets = [(2400, 3, 1000, 1), (2400, 3, 1000, 0), (2400, 3, 0, 1), (800, 2, 1200, 2), (3600, 1, 500, 3)]
+    while len(fleets) < n_fleets:
+        main_mcr = int(rng.choice(np.arange(500, 4001, 50)))
+        main_qty = int(rng.integers(1, 7))
+        if rng.random() < 0.25:
+            port_mcr, port_qty = int(rng.choice([0, 500, 1000])), 0
+        else:
+            port_mcr, port_qty = int(rng.choice(np.arange(200, 1501, 50))), int(rng.integers(1, 4))
+        fleets.append((main_mcr, main_qty, port_mcr, port_qty))
+    return fleets[:n_fleets]
+
+def edge_powers(fleet):
+    main_mcr, main_qty, port_mcr, port_qty = fleet
+    powers = [0.0, -10.0, 1e-3]
+    total_capacity = main_mcr * main_qty + port_mcr * port_qty
+    for unit_mcr, qty in ((main_mcr, main_qty), (port_mcr, port_qty)):
+        for n in range(1, qty + 1):
+            for pct in THRESHOLD_PERCENTS:
+                p = n * unit_mcr * pct / 100.0
+                powers += [p * (1 - THRESHOLD_NUDGE), p, p * (1 + THRESHOLD_NUDGE)]
+    powers += [total_capacity, total_capacity * 1.001, total_capacity * 1.0011]
+    return powers
+
+def generate_powers(fleet, n_cases, rng):
+    main_mcr, main_qty, port_mcr, port_qty = fleet
+    edges = edge_powers(fleet)[:n_cases]
+    upper = 1.15 * (main_mcr * main_qty + port_mcr * port_qty)
+    return np.concatenate([edges, rng.uniform(0.0, upper, max(n_cases - len(edges), 0))])
+
+# --- Karşılaştırma ---
+def compare_results(reference, candidate):
+    # Uyumsuzluk nedenini (metin) ya da eşleşiyorsa None döndürür.
+    ref_fuel, ref_label, ref_loads = reference
+    cand_fuel, cand_label, cand_loads = candidate
+    if cand_label != ref_label: return f"etiket: '{cand_label}' != '{ref_label}'"
+    if not math.isclose(cand_fuel, ref_fuel, rel_tol=FUEL_RTOL, abs_tol=FUEL_ATOL): return f"yakıt: {cand_fuel!r} != {ref_fuel!r}"
+    if len(cand_loads) != len(ref_loads): return f"çalışan jeneratör sayısı: {len(cand_loads)} != {len(ref_loads)}"
+    for (c_mcr, c_load, c_kind), (r_mcr, r_load, r_kind) in zip(sorted(cand_loads, key=lambda x: x[2]), sorted(ref_loads, key=lambda x: x[2])):
+        if c_mcr != r_mcr or c_kind != r_kind: return f"jeneratör: {c_mcr} {c_kind} != {r_mcr} {r_kind}"
+        if abs(c_load - r_load) > LOAD_ATOL: return f"yük: {c_load!r} != {r_load!r}"
+    return None
+
+def same_structure(reference, candidate):
+    # Aynı strateji/kombinasyon mu (etiketteki yük yüzdeleri ve yük değerleri hariç)?
+    return (dispatch_label_key(reference[1]) == dispatch_label_key(candidate[1]) and
+            sorted((mcr, kind) for mcr, _, kind in reference[2]) == sorted((mcr, kind) for mcr, _, kind in candidate[2]))
+
+def check_fleet(task):
+    """
+    Tek filo için tüm adayları referansla karşılaştırır (işçi süreçte çalışır).
+    Döndürür: {aday: {"cases", "boundary", "failed", "mismatches": [...]}}
+    """
+    fleet, seed, n_cases, candidate_names, max_report = task
+    rng = np.random.default_rng(seed)
+    powers = generate_powers(fleet, n_cases, rng)
+    durations = rng.choice(DURATIONS_H, len(powers))
+    compiled_curves = compile_sfoc_curves(ALL_SFOC_CURVES)
+    main_mcr, main_qty, port_mcr, port_qty = fleet
+
+    def reference(power, duration):
+        return reference_dispatch.get_best_combination(power, main_mcr, main_qty, port_mcr, port_qty, ALL_SFOC_CURVES, duration)[:3]
+
+    reference_results = [reference(float(p), float(d)) for p, d in zip(powers, durations)]
+    report = {}
+    for name in candidate_names:
+        spec = CANDIDATES[name]
+        evaluate = spec["prepare"](fleet, compiled_curves)
+        tolerance = spec["power_tolerance_kw"]
+        stats = {"cases": 0, "boundary": 0, "failed": 0, "mismatches": []}
+        for power, duration, ref in zip(powers, durations, reference_results):
+            power, duration = float(power), float(duration)
+            stats["cases"] += 1
+            try:
+                candidate = evaluate(power, duration)
+                reason = compare_results(ref, candidate)
+            except Exception as e: # Adayın çökmesi de bir uyumsuzluktur
+                candidate, reason = None, f"hata: {type(e).__name__}: {e}"
+            if reason and tolerance > 0 and candidate is not None and any(
+                same_structure(reference(power + shift, duration), candidate) for shift in (-tolerance, tolerance)
+            ):
+                stats["boundary"] += 1
+                continue
+            if reason:
+                stats["failed"] += 1
+                if len(stats["mismatches"]) < max_report:
+                    stats["mismatches"].append({"fleet": fleet, "power": power, "duration": duration, "reason": reason})
+        report[name] = stats
+    return report
+
+def check_sfoc_interpolation(n_cases, rng, candidate_names=tuple(SFOC_CANDIDATES)):
+    # Her SFOC eğrisi için eşik/uç yükler + rastgele yüklerde aday interpolasyonları referansla karşılaştırır.
+    report = {}
+    for name in candidate_names:
+        stats = {"cases": 0, "failed": 0, "mismatches": []}
+        for curve_name, curve_data in ALL_SFOC_CURVES.items():
+            loads = np.concatenate([[0.0, 1e-6, *THRESHOLD_PERCENTS, *curve_data.keys(), 120.0], rng.uniform(-10.0, 130.0, n_cases)])
+            expected = np.array([reference_dispatch.interpolate_sfoc_non_linear(float(x), curve_data) for x in loads], dtype=float)
+            actual = np.asarray(SFOC_CANDIDATES[name](loads, curve_data), dtype=float)
+            bad = ~np.isclose(actual, expected, rtol=SFOC_RTOL, atol=0.0)
+            stats["cases"] += len(loads)
+            stats["failed"] += int(bad.sum())
+            stats["mismatches"] += [{"curve": curve_name, "load": float(x), "reason": f"{a!r} != {e!r}"}
+                                    for x, a, e in zip(loads[bad][:5], actual[bad][:5], expected[bad][:5])]
+        report[name] = stats
+    return report
+
+def run_differential_check(n_cases=100_000, workers=None, seed=0, candidate_names=tuple(CANDIDATES),
+                           sfoc_cases=10_000, max_report=5):
+    """
+    Dispatch adaylarını `n_cases` güç noktasında (filolara bölünmüş), SFOC adaylarını eğri başına
+    `sfoc_cases` yükte referansla karşılaştırır. Filolar ve girdiler `seed`'den türetilir; işçi
+    sayısından bağımsız olarak aynı girdiler, aynı sırada üretilir.
+    """
+    n_fleets = max(math.ceil(n_cases / CASES_PER_FLEET), 1)
+    seed_sequence = np.random.SeedSequence(seed)
+    fleet_seed, sfoc_seed, *case_seeds = seed_sequence.spawn(n_fleets + 2)
+    fleets = generate_fleets(n_fleets, np.random.default_rng(fleet_seed))
+    per_fleet = [CASES_PER_FLEET] * (n_fleets - 1) + [n_cases - CASES_PER_FLEET * (n_fleets - 1)]
+    tasks = [(fleet, case_seed, count, tuple(candidate_names), max_report) for fleet, case_seed, count in zip(fleets, case_seeds, per_fleet)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        fleet_reports = [check_fleet(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            fleet_reports = list(executor.map(check_fleet, tasks, chunksize=max(len(tasks) // (workers * 4), 1)))
+
+    summary = {}
+    for name in candidate_names:
+        stats = {"cases": 0, "boundary": 0, "failed": 0, "mismatches": []}
+        for fleet_report in fleet_reports:
+            part = fleet_report[name]
+            stats["cases"] += part["cases"]; stats["boundary"] += part["boundary"]; stats["failed"] += part["failed"]
+            stats["mismatches"] += part["mismatches"][:max(max_report - len(stats["mismatches"]), 0)]
+        summary[name] = stats
+    summary.update({f"sfoc:{name}": stats for name, stats in check_sfoc_interpolation(sfoc_cases, np.random.default_rng(sfoc_seed)).items()})
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dispatch/SFOC motorları için farksal test (dondurulmuş referansa karşı).")
+    parser.add_argument("--cases", type=int, default=100_000, help="Toplam dispatch test noktası")
+    parser.add_argument("--workers", type=int, default=None, help="İşçi süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--candidates", nargs="+", choices=list(CANDIDATES), default=list(CANDIDATES))
+    parser.add_argument("--sfoc-cases", type=int, default=10_000, help="Eğri başına rastgele SFOC yük noktası")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    summary = run_differential_check(args.cases, args.workers, args.seed, args.candidates, args.sfoc_cases)
+    failed = False
+    for name, stats in summary.items():
+        line = f"{name:<24} vaka: {stats['cases']:>8}  uyumsuz: {stats['failed']:>6}"
+        if "boundary" in stats: line += f"  sınırda (tolerans içi): {stats['boundary']}"
+        print(line)
+        for mismatch in stats["mismatches"]: print("    ", mismatch)
+        failed |= stats["failed"] > 0
+    print(f"Süre: {time.perf_counter() - started:.1f} s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+# dispatch_map.py
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config import DISPATCH_MAP_SCAN_STEP_KW, DISPATCH_MAP_TOLERANCE_KW, DISPATCH_MAP_CACHE_SIZE
+from core_calculations import (
+    select_best_combination,
+    compile_sfoc_curves,
+    sfoc_curves_fingerprint
+)
+from voyage_metrics import accumulate_unit_metrics
+
+# Dispatch haritasında kullanılan SFOC eğrileri (DE sistemindeki jeneratörler)
+DISPATCH_SFOC_KEYS = ("main_de_gen", "port_gen")
+
+STRATEGY_LABELS = {
+    "no_load": "Yük Yok",
+    "main_eff": "Sadece Ana (Verimli Bölge)",
+    "main_eff_plus_one": "Sadece Ana (+1 Jeneratör)",
+    "main_ineff_low": "Sadece Ana (Düşük Yük)",
+    "main_ineff_low_plus_one": "Sadece Ana (+1, Düşük Yük)",
+    "main_fallback_plus_one": "Sadece Ana (+1, Yüksek Yük)",
+    "main_fallback_at_n_main1": "Sadece Ana (Yüksek Yük)",
+    "port_only": "Sadece Liman",
+    "assisted_optimal": "Destekli Mod (Ana + Liman)",
+    "none": "Uygun Kombinasyon Yok"
+}
+
+
+class DispatchMap:
+    """
+    Sabit bir jeneratör filosu için get_best_combination çıktısının parçalı haritası.
+
+    Her güç aralığında (segment) tek bir strateji ve çalışan jeneratör yapısı vardır; segment
+    sınırları strateji değişimleri üzerinde ikiye bölme (bisection) ile `tolerance_kw` hassasiyetle
+    bulunur. Segment içindeki yakıt debisi, çalışan jeneratörlerin SFOC eğrilerinden kapalı formda
+    hesaplanır; herhangi bir güç için sorgu bir ikili aramadır (np.searchsorted).
+    """
+
+    def __init__(self, main_mcr, main_qty, port_mcr, port_qty, sfoc_curves,
+                 scan_step_kw=DISPATCH_MAP_SCAN_STEP_KW, tolerance_kw=DISPATCH_MAP_TOLERANCE_KW):
+        if scan_step_kw <= 0 or tolerance_kw <= 0: raise ValueError("scan_step_kw ve tolerance_kw pozitif olmalı")
+        self.main_mcr, self.main_qty = main_mcr, main_qty
+        self.port_mcr, self.port_qty = port_mcr, port_qty
+        self.sfoc_curves = compile_sfoc_curves({key: sfoc_curves[key] for key in DISPATCH_SFOC_KEYS})
+        self.tolerance_kw = tolerance_kw
+        self.max_power = max(main_mcr, 0) * max(main_qty, 0) + max(port_mcr, 0) * max(port_qty, 0)
+        self.evaluations = 0
+        self._build(scan_step_kw)
+
+    @classmethod
+    def from_tables(cls, main_mcr, main_qty, port_mcr, port_qty, sfoc_curves, tolerance_kw, evaluations,
+                    breakpoints, segment_keys, segment_n_main, segment_n_port, segment_port_fixed_load):
+        # Daha önce kurulmuş bir haritanın dizilerinden (örn. paylaşılan bellekten, salt okunur) tarama yapmadan oluşturur.
+        dispatch_map = cls.__new__(cls)
+        dispatch_map.main_mcr, dispatch_map.main_qty = main_mcr, main_qty
+        dispatch_map.port_mcr, dispatch_map.port_qty = port_mcr, port_qty
+        dispatch_map.sfoc_curves = compile_sfoc_curves({key: sfoc_curves[key] for key in DISPATCH_SFOC_KEYS})
+        dispatch_map.tolerance_kw = tolerance_kw
+        dispatch_map.max_power = max(main_mcr, 0) * max(main_qty, 0) + max(port_mcr, 0) * max(port_qty, 0)
+        dispatch_map.evaluations = evaluations
+        dispatch_map.breakpoints, dispatch_map.segment_keys = breakpoints, segment_keys
+        dispatch_map.segment_n_main, dispatch_map.segment_n_port = segment_n_main, segment_n_port
+        dispatch_map.segment_port_fixed_load = segment_port_fixed_load
+        return dispatch_map
+
+    # --- Kurulum ---
+    def _signature(self, power):
+        # Bir güç noktasındaki dispatch yapısı: (strateji, ana adedi, liman adedi, sabit liman yükü veya NaN)
+        self.evaluations += 1
+        key, _, _, loads, _ = select_best_combination(
+            power, self.main_mcr, self.main_qty, self.port_mcr, self.port_qty, self.sfoc_curves, 1.0
+        )
+        n_main = sum(1 for _, _, gen_kind in loads if gen_kind == "Ana")
+        n_port = sum(1 for _, _, gen_kind in loads if gen_kind == "Liman")
+        port_fixed_load = np.nan
+        if key == "assisted_optimal":
+            port_fixed_load = next(load for _, load, gen_kind in loads if gen_kind == "Liman")
+        return key, n_main, n_port, port_fixed_load
+
+    @staticmethod
+    def _same(sig_a, sig_b):
+        return sig_a[:3] == sig_b[:3] and (sig_a[3] == sig_b[3] or (np.isnan(sig_a[3]) and np.isnan(sig_b[3])))
+
+    def _locate_boundaries(self, a, sig_a, b, sig_b, boundaries):
+        # (a, b] aralığındaki tüm strateji değişimlerini bul; sınır, yeni yapının doğrulandığı uç (b) olarak kaydedilir.
+        if b - a <= self.tolerance_kw:
+            boundaries.append((b, sig_b))
+            return
+        m = (a + b) / 2.0
+        sig_m = self._signature(m)
+        if not self._same(sig_a, sig_m): self._locate_boundaries(a, sig_a, m, sig_m, boundaries)
+        if not self._same(sig_m, sig_b): self._locate_boundaries(m, sig_m, b, sig_b, boundaries)
+
+    def _structural_powers(self):
+        # Kombinasyon seçiminin yapısal olarak değişebileceği güçler (adet / yük bandı eşikleri, destekli moddaki
+        # liman yük adımları). Bunlar ve hemen üstleri taramaya eklenir ki tarama adımından dar segmentler kaçmasın.
+        points = []
+        for n in range(1, max(self.main_qty, 0) + 1):
+            points += [n * self.main_mcr * f for f in (0.65, 0.92, 1.0)]
+        for n in range(1, max(self.port_qty, 0) + 1):
+            points.append(n * self.port_mcr)
+        if self.port_qty >= 1 and self.port_mcr > 0:
+            for port_load in range(90, 40, -5):
+                port_power = self.port_mcr * port_load / 100.0
+                points.append(port_power)
+                points += [port_power + n * self.main_mcr * f for n in range(1, max(self.main_qty, 0) + 1) for f in (0.5, 0.92)]
+        points = np.asarray(points, dtype=float)
+        return np.concatenate([points, points + self.tolerance_kw])
+
+    def _build(self, scan_step_kw):
+        scan_end = max(self.max_power * 1.01, self.tolerance_kw * 2)
+        scan_points = np.union1d(np.arange(self.tolerance_kw, scan_end, scan_step_kw), self._structural_powers())
+        scan_points = list(scan_points[(scan_points >= self.tolerance_kw) & (scan_points < scan_end)]) + [scan_end]
+        first_signature = self._signature(scan_points[0])
+        boundaries = [(0.0, first_signature)]
+        previous_point, previous_signature = scan_points[0], first_signature
+        for point in scan_points[1:]:
+            signature = self._signature(point)
+            if not self._same(previous_signature, signature):
+                self._locate_boundaries(previous_point, previous_signature, point, signature, boundaries)
+            previous_point, previous_signature = point, signature
+
+        self.breakpoints = np.array([start for start, _ in boundaries] + [scan_end], dtype=float)
+        self.segment_keys = np.array([sig[0] for _, sig in boundaries], dtype=object)
+        self.segment_n_main = np.array([sig[1] for _, sig in boundaries], dtype=int)
+        self.segment_n_port = np.array([sig[2] for _, sig in boundaries], dtype=int)
+        self.segment_port_fixed_load = np.array([sig[3] for _, sig in boundaries], dtype=float)
+
+    # --- Sorgular ---
+    @property
+    def n_segments(self):
+        return len(self.segment_keys)
+
+    def segment_index(self, powers):
+        # Her güç için segment indeksi (O(log n)); harita dışındaki (kapasite üstü) güçler için -1.
+        powers = np.asarray(powers, dtype=float)
+        idx = np.searchsorted(self.breakpoints, powers, side='right') - 1
+        return np.where((powers > 0) & (powers <= self.breakpoints[-1]), np.clip(idx, 0, self.n_segments - 1), -1)
+
+    def unit_powers(self, powers, idx=None):
+        # Segment yapısına göre (ana jeneratör başı güç, liman jeneratörü başı güç) kW olarak.
+        powers = np.asarray(powers, dtype=float)
+        idx = self.segment_index(powers) if idx is None else idx
+        safe_idx = np.maximum(idx, 0)
+        n_main = self.segment_n_main[safe_idx].astype(float)
+        n_port = self.segment_n_port[safe_idx].astype(float)
+        port_fixed_load = self.segment_port_fixed_load[safe_idx]
+        fixed = ~np.isnan(port_fixed_load)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total_capacity = n_main * self.main_mcr + n_port * self.port_mcr
+            shared_load_fraction = np.where(total_capacity > 0, powers / total_capacity, 0.0)
+            port_power_fixed = self.port_mcr * np.nan_to_num(port_fixed_load) / 100.0
+            main_power_fixed = np.where(n_main > 0, (powers - port_power_fixed) / n_main, 0.0)
+        main_power_each = np.where(fixed, main_power_fixed, shared_load_fraction * self.main_mcr)
+        port_power_each = np.where(fixed, port_power_fixed, shared_load_fraction * self.port_mcr)
+        main_power_each = np.where(n_main > 0, main_power_each, 0.0)
+        port_power_each = np.where(n_port > 0, port_power_each, 0.0)
+        return main_power_each, port_power_each, n_main, n_port
+
+    def _unit_fuel(self, powers, idx):
+        # Birim tipi başına (çalışan adet, birim başı yük %, toplam yakıt g/saat)
+        main_power_each, port_power_each, n_main, n_port = self.unit_powers(powers, idx)
+        main_load = main_power_each / self.main_mcr * 100 if self.main_mcr > 0 else np.zeros_like(powers)
+        port_load = port_power_each / self.port_mcr * 100 if self.port_mcr > 0 else np.zeros_like(powers)
+        fuel_main = np.where(main_power_each > 0, n_main * main_power_each * self.sfoc_curves["main_de_gen"](main_load), 0.0)
+        fuel_port = np.where(port_power_each > 0, n_port * port_power_each * self.sfoc_curves["port_gen"](port_load), 0.0)
+        return (n_main, main_load, fuel_main), (n_port, port_load, fuel_port)
+
+    def _served(self, idx):
+        return (idx >= 0) & (self.segment_keys[np.maximum(idx, 0)] != "none")
+
+    def unit_fuel_rates(self, powers):
+        # Birim tipi başına (çalışan adet, birim başı yük %, yakıt debisi ton/saat) ve uygun kombinasyon maskesi.
+        powers = np.asarray(powers, dtype=float)
+        idx = self.segment_index(powers)
+        main, port = self._unit_fuel(powers, idx)
+        return {"Ana": main[:2] + (main[2] / 1_000_000,), "Liman": port[:2] + (port[2] / 1_000_000,)}, self._served(idx)
+
+    def fuel_rate(self, powers):
+        # Yakıt debisi (ton/saat); yük yoksa 0, uygun kombinasyon yoksa NaN.
+        powers = np.asarray(powers, dtype=float)
+        idx = self.segment_index(powers)
+        (_, _, fuel_main), (_, _, fuel_port) = self._unit_fuel(powers, idx)
+        rate = np.where(self._served(idx), (fuel_main + fuel_port) / 1_000_000, np.nan)
+        return np.where(powers <= 0, 0.0, rate)
+
+    def metrics(self, powers, durations_h, groups=None, n_groups=1):
+        """
+        Yakıt, CO2, birim tipi başına çalışma ve yük bandı saatleri tek geçişte (voyage_metrics.accumulate_unit_metrics).
+        Uygun kombinasyonu olmayan (kapasite üstü) noktalar sayaçlara girmez; süreleri "unserved_h" içinde (grup başına).
+        """
+        powers = np.asarray(powers, dtype=float)
+        durations_h = np.broadcast_to(np.asarray(durations_h, dtype=float), powers.shape)
+        units, served = self.unit_fuel_rates(powers)
+        active = served & (powers > 0)
+        metrics = accumulate_unit_metrics(durations_h, {
+            kind: (np.where(active, count, 0), load, np.where(active, rate * durations_h, 0.0)) for kind, (count, load, rate) in units.items()
+        }, groups, n_groups)
+        unserved = ~served & (powers > 0)
+        metrics["unserved_h"] = np.bincount(np.zeros(len(powers), dtype=int) if groups is None else groups,
+                                            weights=np.where(unserved, durations_h, 0.0), minlength=n_groups)
+        return metrics
+
+    def fuel(self, powers, duration):
+        # get_best_combination'ın yakıt çıktısının (ton) vektörel karşılığı; uygun kombinasyon yoksa 0.
+        return np.nan_to_num(self.fuel_rate(powers), nan=0.0) * duration
+
+    def strategy_at(self, power):
+        idx = int(self.segment_index(power))
+        if power <= 0: return "no_load"
+        return self.segment_keys[idx] if idx >= 0 else "none"
+
+    def combination_at(self, power):
+        # get_best_combination ile aynı biçimde (etiket, yük listesi)
+        if power <= 0: return "0 kW Yük (Yakıt Yok)", []
+        idx = self.segment_index(power)
+        key = self.segment_keys[int(idx)] if int(idx) >= 0 else "none"
+        if key == "none": return "Uygun Kombinasyon Yok (Karar Verilemedi)", []
+        main_power_each, port_power_each, n_main, n_port = (float(v) for v in self.unit_powers(power, idx))
+        n_main, n_port = int(n_main), int(n_port)
+        main_load = main_power_each / self.main_mcr * 100 if self.main_mcr > 0 else 0.0
+        port_load = port_power_each / self.port_mcr * 100 if self.port_mcr > 0 else 0.0
+        if key == "assisted_optimal":
+            label = f"{n_main}x{self.main_mcr}kW Ana ({main_load:.1f}%) + 1x{self.port_mcr}kW Liman ({port_load:.1f}%)"
+            return label, [(self.main_mcr, main_load, "Ana")] * n_main + [(self.port_mcr, port_load, "Liman")]
+        if key == "port_only":
+            return f"{n_port}x {self.port_mcr}kW Liman", [(self.port_mcr, port_load, "Liman")] * n_port
+        return f"{n_main}x {self.main_mcr}kW Ana", [(self.main_mcr, main_load, "Ana")] * n_main
+
+    def envelope_frame(self):
+        # Mühendislere gösterilecek çalışma zarfı: her segmentin güç aralığı ve stratejisi.
+        rows = []
+        for i in range(self.n_segments):
+            start, end = self.breakpoints[i], self.breakpoints[i + 1]
+            key = self.segment_keys[i]
+            mid_label, _ = self.combination_at((start + end) / 2.0) if end > start else ("", [])
+            port_fixed_load = self.segment_port_fixed_load[i]
+            rows.append({
+                "Başlangıç DE Gücü (kW)": round(start, 2), "Bitiş DE Gücü (kW)": round(end, 2),
+                "Strateji": STRATEGY_LABELS.get(key, key), "Strateji Anahtarı": key,
+                "Ana Jen. Adedi": int(self.segment_n_main[i]), "Liman Jen. Adedi": int(self.segment_n_port[i]),
+                "Sabit Liman Yükü (%)": None if np.isnan(port_fixed_load) else port_fixed_load,
+                "Örnek Kombinasyon": mid_label
+            })
+        return pd.DataFrame(rows)
+
+
+# (filo, eğri parmak izi) -> DispatchMap; en eski kullanılan harita önbellek dolunca atılır.
+# Oturumlar, önbellek ısıtma ve hesap servisi iş parçacıkları aynı önbelleği kullandığından erişim kilitlidir.
+_DISPATCH_MAP_CACHE = OrderedDict()
+_DISPATCH_MAP_CACHE_LOCK = threading.Lock()
+
+def get_dispatch_map(main_mcr, main_qty, port_mcr, port_qty, sfoc_curves):
+    # Aynı filo ve aynı SFOC eğrileri için harita bir kez kurulur, sonraki çağrılar önbellekten gelir.
+    cache_key = (main_mcr, main_qty, port_mcr, port_qty, sfoc_curves_fingerprint(sfoc_curves, DISPATCH_SFOC_KEYS))
+    with _DISPATCH_MAP_CACHE_LOCK:
+        if cache_key in _DISPATCH_MAP_CACHE:
+            _DISPATCH_MAP_CACHE.move_to_end(cache_key)
+            return _DISPATCH_MAP_CACHE[cache_key]
+    dispatch_map = DispatchMap(main_mcr, main_qty, port_mcr, port_qty, sfoc_curves) # Kurulum kilit dışında (diğer filoları bekletmez)
+    with _DISPATCH_MAP_CACHE_LOCK:
+        _DISPATCH_MAP_CACHE[cache_key] = dispatch_map
+        while len(_DISPATCH_MAP_CACHE) > DISPATCH_MAP_CACHE_SIZE: _DISPATCH_MAP_CACHE.popitem(last=False)
+    return dispatch_map
+
+def discard_dispatch_maps(stale_curves):
+    # stale_curves: {eğri anahtarı: eski eğrinin fingerprint()'i}. Bu eğrilerle kurulmuş haritalar önbellekten çıkarılır
+    # (diğer eğrilerin değişmesi haritaları etkilemez). Döndürür: çıkarılan harita sayısı.
+    stale = {(key, fingerprint) for key, fingerprint in stale_curves.items() if key in DISPATCH_SFOC_KEYS}
+    if not stale: return 0
+    with _DISPATCH_MAP_CACHE_LOCK:
+        keys = [cache_key for cache_key in _DISPATCH_MAP_CACHE if stale & set(cache_key[4])]
+        for cache_key in keys: del _DISPATCH_MAP_CACHE[cache_key]
+    return len(keys)
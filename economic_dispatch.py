@@ -0,0 +1,112 @@
+# economic_dispatch.py
+import threading
+
+import numpy as np
+
+from config import (
+    ECONOMIC_DISPATCH_LOAD_LIMITS,
+    ECONOMIC_DISPATCH_TABLE_STEP_PERCENT,
+    ECONOMIC_DISPATCH_TOLERANCE_KW,
+    ECONOMIC_DISPATCH_MAX_ITERATIONS
+)
+
+LOAD_SHARING_LABELS = {
+    "proportional": "MCR Orantılı",
+    "economic": "Ekonomik Dispatch (Eşit Artımsal Maliyet)"
+}
+
+# Eğri parmak izi + yük sınırları -> (yük ızgarası %, monoton artımsal maliyet g/kWh)
+_INCREMENTAL_COST_TABLES = {}
+_INCREMENTAL_COST_TABLES_LOCK = threading.Lock()
+
+def incremental_cost_table(curve, load_limits=ECONOMIC_DISPATCH_LOAD_LIMITS, step_percent=ECONOMIC_DISPATCH_TABLE_STEP_PERCENT):
+    """
+    Derlenmiş SFOC eğrisinden (CompiledSfocCurve) artımsal maliyet tablosu (g/kWh), yük sınırları içinde `step_percent` aralıklı.
+    Yakıt debisi (yük * SFOC) düşük yükte dışbükey değildir; tablo bu yüzden debinin alt dışbükey zarfından
+    çıkarılır: zarfın köşelerindeki artımsal maliyet, komşu kenar eğimlerinin ortalamasıdır (kesin artan, ters çevrilebilir).
+    """
+    key = (curve.fingerprint(), tuple(load_limits), step_percent)
+    with _INCREMENTAL_COST_TABLES_LOCK:
+        table = _INCREMENTAL_COST_TABLES.get(key)
+    if table is not None: return table
+    loads = np.linspace(load_limits[0], load_limits[1], int(round((load_limits[1] - load_limits[0]) / step_percent)) + 1)
+    rates = loads * curve(loads)
+    hull = [0]
+    for i in range(1, len(loads)): # Monoton zincir: alt zarf
+        while len(hull) >= 2 and (rates[hull[-1]] - rates[hull[-2]]) * (loads[i] - loads[hull[-1]]) >= (rates[i] - rates[hull[-1]]) * (loads[hull[-1]] - loads[hull[-2]]):
+            hull.pop()
+        hull.append(i)
+    edge_slopes = np.diff(rates[hull]) / np.diff(loads[hull])
+    incremental_cost = np.concatenate(([edge_slopes[0]], (edge_slopes[:-1] + edge_slopes[1:]) / 2, [edge_slopes[-1]]))
+    if len(edge_slopes) == 1: incremental_cost = incremental_cost + np.array([-1e-9, 1e-9]) # Doğrusal debi: tek kenar
+    table = (loads[hull], incremental_cost)
+    with _INCREMENTAL_COST_TABLES_LOCK:
+        _INCREMENTAL_COST_TABLES[key] = table
+    return table
+
+def _fuel_rate(unit_power_kw, units):
+    # Birim başı güçlerden (N, birim tipi) toplam yakıt debisi (ton/saat)
+    rate = np.zeros(unit_power_kw.shape[0])
+    for j, (mcr, count, curve) in enumerate(units):
+        power = unit_power_kw[:, j]
+        rate += np.where(power > 0, count * power * curve(power / mcr * 100), 0.0)
+    return rate / 1_000_000
+
+def economic_dispatch(demand_kw, units, load_limits=ECONOMIC_DISPATCH_LOAD_LIMITS,
+                      tolerance_kw=ECONOMIC_DISPATCH_TOLERANCE_KW, max_iterations=ECONOMIC_DISPATCH_MAX_ITERATIONS):
+    """
+    Çalışan jeneratörler arasında eşit artımsal maliyet (lambda iterasyonu) ile yük paylaşımı, birçok güç için birlikte.
+
+    `units`: [(mcr_kw, adet, derlenmiş SFOC eğrisi), ...]; aynı tipteki birimler eşit yüklenir. Her birimin
+    lambda -> güç ters fonksiyonu artımsal maliyet tablosundan doğrusal interpolasyondur (yük sınırlarında
+    kırpılır); toplam güç lambda'da parçalı doğrusal olduğundan Newton adımları (aralık dışına çıkarsa
+    ikiye bölme) birkaç iterasyonda yakınsar. Talep yük sınırlarıyla karşılanamıyorsa veya eğri dışbükey
+    olmadığı için sonuç MCR orantılı paylaşımdan kötüyse o nokta için orantılı paylaşım kullanılır.
+
+    Döndürür: {"unit_power_kw": (N, birim tipi), "fuel_rate_t_h", "lambda", "economic" (maske), "iterations"}
+    """
+    demand_kw = np.atleast_1d(np.asarray(demand_kw, dtype=float))
+    mcrs = np.array([mcr for mcr, _, _ in units], dtype=float)
+    counts = np.array([count for _, count, _ in units], dtype=float)
+    tables = [incremental_cost_table(curve, load_limits) for _, _, curve in units]
+
+    def unit_outputs(lam):
+        # lambda (N,) -> birim başı güç (N, birim tipi) ve toplam gücün lambda'ya göre eğimi
+        power, slope = np.empty((len(lam), len(units))), np.zeros(len(lam))
+        for j, (loads, costs) in enumerate(tables):
+            load = np.interp(lam, costs, loads)
+            segment = np.clip(np.searchsorted(costs, lam, side='right') - 1, 0, len(costs) - 2)
+            inside = (lam >= costs[0]) & (lam < costs[-1])
+            d_load = (loads[segment + 1] - loads[segment]) / (costs[segment + 1] - costs[segment])
+            power[:, j] = load / 100 * mcrs[j]
+            slope += np.where(inside, counts[j] * mcrs[j] / 100 * d_load, 0.0)
+        return power, slope
+
+    capacity_min = float(np.sum(counts * mcrs) * load_limits[0] / 100)
+    capacity_max = float(np.sum(counts * mcrs) * load_limits[1] / 100)
+    feasible = (demand_kw >= capacity_min - tolerance_kw) & (demand_kw <= capacity_max + tolerance_kw)
+    lower = np.full(len(demand_kw), min(costs[0] for _, costs in tables))
+    upper = np.full(len(demand_kw), max(costs[-1] for _, costs in tables))
+    # Başlangıç: MCR orantılı yükte birimlerin artımsal maliyetlerinin kapasite ağırlıklı ortalaması
+    load_fraction = np.clip(demand_kw / np.sum(counts * mcrs) * 100, load_limits[0], load_limits[1])
+    lam = sum(counts[j] * mcrs[j] * np.interp(load_fraction, loads, costs) for j, (loads, costs) in enumerate(tables)) / np.sum(counts * mcrs)
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        power, slope = unit_outputs(lam)
+        mismatch = demand_kw - power @ counts
+        converged = ~feasible | (np.abs(mismatch) <= tolerance_kw)
+        if converged.all(): break
+        lower = np.where(mismatch > 0, lam, lower)
+        upper = np.where(mismatch < 0, lam, upper)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = lam + mismatch / slope
+        lam = np.where(converged, lam, np.where((slope > 0) & (newton > lower) & (newton < upper), newton, (lower + upper) / 2))
+    power, _ = unit_outputs(lam)
+    # Tolerans içindeki kalan fark kapasiteyle orantılı dağıtılır (toplam güç talebe tam eşit olsun)
+    power = power + np.outer((demand_kw - power @ counts) / np.sum(counts * mcrs), mcrs)
+
+    proportional = np.outer(demand_kw / np.sum(counts * mcrs), mcrs)
+    economic = feasible & (_fuel_rate(power, units) <= _fuel_rate(proportional, units))
+    power = np.where(economic[:, None], power, proportional)
+    return {"unit_power_kw": power, "fuel_rate_t_h": _fuel_rate(power, units), "lambda": np.where(economic, lam, np.nan),
+            "economic": economic, "iterations": iterations}
@@ -0,0 +1,140 @@
+# energy_storage.py
+import numpy as np
+import pandas as pd
+
+from config import (
+    BATTERY_SOC_GRID_POINTS,
+    BATTERY_SOC_LIMITS,
+    BATTERY_UNSERVED_PENALTY_T_PER_KWH,
+    BATTERY_MIN_BLOCK_OFFSETS,
+    BATTERY_MAX_TRANSITIONS
+)
+
+def _fuel_and_unserved(dispatch_map, diesel_kw, duration_h):
+    # Jeneratörlerden istenen güç için yakıt (ton) ve karşılanamayan enerji (kWh); kapasite üstü kısım karşılanamaz sayılır.
+    served_kw = np.minimum(diesel_kw, dispatch_map.max_power)
+    rate = dispatch_map.fuel_rate(served_kw)
+    unserved_kw = np.where(np.isnan(rate), diesel_kw, diesel_kw - served_kw)
+    return np.nan_to_num(rate, nan=0.0) * duration_h, np.maximum(unserved_kw, 0.0) * duration_h
+
+def _block_ids(duration_h, min_block_h):
+    # Ardışık örnekleri, başlangıç zamanları aynı `min_block_h` aralığına düşenler bir blok olacak şekilde gruplar.
+    # `min_block_h`'ten uzun örnekler kendi bloklarıdır; sıra korunur. Döndürür: örnek başına blok indeksi (0..B-1)
+    start_h = np.concatenate(([0.0], np.cumsum(duration_h)[:-1]))
+    return np.unique(np.floor(start_h / min_block_h + 1e-9), return_inverse=True)[1]
+
+def optimize_storage_dispatch(de_power_kw, duration_h, dispatch_map, capacity_kwh, c_rate, round_trip_efficiency,
+                              initial_soc=0.5, soc_limits=BATTERY_SOC_LIMITS, soc_points=BATTERY_SOC_GRID_POINTS,
+                              unserved_penalty_t_per_kwh=BATTERY_UNSERVED_PENALTY_T_PER_KWH,
+                              min_block_offsets=BATTERY_MIN_BLOCK_OFFSETS, max_transitions=BATTERY_MAX_TRANSITIONS):
+    """
+    Yük profili boyunca bataryanın şarj/deşarj planını dinamik programlama ile çıkarır (toplam yakıt en az).
+
+    Batarya enerjisi `soc_limits` aralığında `soc_points` noktalı bir ızgaraya bölünür; her adımda
+    bataryanın bir ızgara noktasından diğerine geçişi (C-oranı sınırı içinde) jeneratörlerden istenen
+    gücü değiştirir ve yakıt dispatch haritasından gelir. Geçiş maliyetleri tüm adımlar için tek vektörel
+    sorguyla hesaplanır; geriye doğru geçişte her adım tüm SOC durumları üzerinde NumPy ile çözülür.
+    Şarj/deşarj verimi, tur verimliliğinin kareköküdür. Profil sonunda SOC başlangıç değerinin altına
+    inemez (bedava enerji yok). Karşılanamayan enerji `unserved_penalty_t_per_kwh` ile cezalandırılır.
+
+    Kısa örnekli profillerde (örn. 1 s) tek örneğin enerjisi bir SOC ızgara adımından küçük kalır; bu yüzden
+    karar adımları, tam C-oranında en az `min_block_offsets` ızgara adımı hareket edebilecek uzunlukta ardışık
+    örnek bloklarıdır. Batarya gücü blok içinde sabittir, yakıt ve karşılanamayan enerji yine her örnek için
+    hesaplanır; zaman çizelgesi örnek başınadır. Örnek x geçiş sayısı `max_transitions`'ı aşarsa veya profil
+    bataryanın bir ızgara adımı hareket etmesine yetmeyecek kadar kısaysa ValueError verilir.
+    """
+    demand_kw = np.maximum(np.nan_to_num(np.asarray(de_power_kw, dtype=float)), 0.0)
+    duration_h = np.broadcast_to(np.asarray(duration_h, dtype=float), demand_kw.shape)
+    if capacity_kwh <= 0 or c_rate <= 0 or round_trip_efficiency <= 0 or soc_points < 2 or len(demand_kw) == 0:
+        raise ValueError("Batarya kapasitesi, C-oranı, tur verimliliği pozitif ve SOC ızgarası en az 2 noktalı olmalı.")
+    diesel_only_fuel, diesel_only_unserved = _fuel_and_unserved(dispatch_map, demand_kw, duration_h)
+
+    efficiency = np.sqrt(min(round_trip_efficiency, 1.0))
+    energy_kwh = np.linspace(soc_limits[0] * capacity_kwh, soc_limits[1] * capacity_kwh, soc_points)
+    energy_step_kwh = energy_kwh[1] - energy_kwh[0]
+    max_power_kw = c_rate * capacity_kwh
+
+    # Karar blokları: (örnek) -> blok; blok süresi blok içindeki örneklerin toplamı
+    block = _block_ids(duration_h, max(min_block_offsets, 1) * efficiency * energy_step_kwh / max_power_kw)
+    n_blocks = int(block[-1]) + 1
+    block_h = np.bincount(block, weights=duration_h, minlength=n_blocks)
+
+    # Blok başına olası ızgara kaymaları (+: şarj, -: deşarj). En büyük kayma, en uzun blokta deşarj sınırıdır.
+    max_offset = int(min(soc_points - 1, np.floor(max_power_kw * block_h.max() / (efficiency * energy_step_kwh) + 1e-9)))
+    if max_offset == 0:
+        raise ValueError(f"Profil süresi ({block_h.sum():.3f} saat) bataryanın C-oranıyla bir SOC ızgara adımı "
+                         f"({energy_step_kwh:.2f} kWh) şarj/deşarj etmesine yetmiyor.")
+    offsets = np.arange(-max_offset, max_offset + 1)
+    if len(demand_kw) * len(offsets) > max_transitions:
+        raise ValueError(f"Profil çok büyük: {len(demand_kw)} örnek x {len(offsets)} SOC geçişi (sınır {max_transitions}); "
+                         "profili daha seyrek örnekleyin.")
+    stored_kwh = offsets * energy_step_kwh
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Bataryanın baraya verdiği güç (+: deşarj, -: şarj için çektiği güç), (blok, kayma)
+        battery_kw = np.where(stored_kwh > 0, -stored_kwh / efficiency, -stored_kwh * efficiency)[None, :] / block_h[:, None]
+    battery_kw = np.where(offsets[None, :] == 0, 0.0, battery_kw)
+    # Yakıt, karşılanamayan enerji ve fizibilite örnek başına (örnek, kayma), sonra bloklara toplanır
+    diesel_kw = demand_kw[:, None] - battery_kw[block]
+    fuel_t, unserved_kwh = _fuel_and_unserved(dispatch_map, np.maximum(np.nan_to_num(diesel_kw), 0.0), duration_h[:, None])
+    block_starts = np.flatnonzero(np.r_[True, block[1:] != block[:-1]])
+    block_fuel_t, block_unserved_kwh = np.add.reduceat(fuel_t, block_starts, axis=0), np.add.reduceat(unserved_kwh, block_starts, axis=0)
+    block_diesel_ok = np.minimum.reduceat(diesel_kw, block_starts, axis=0) >= -1e-9
+    feasible = (np.abs(battery_kw) <= max_power_kw * (1 + 1e-9)) & block_diesel_ok & ((block_h[:, None] > 0) | (offsets[None, :] == 0))
+    step_cost = np.where(feasible, block_fuel_t + unserved_penalty_t_per_kwh * block_unserved_kwh, np.inf)
+
+    # Geriye doğru değer iterasyonu: value[i] = i. SOC durumundan profil sonuna kadar en az maliyet
+    start = int(np.argmin(np.abs(energy_kwh - initial_soc * capacity_kwh)))
+    value = np.where(np.arange(soc_points) >= start, 0.0, np.inf)
+    target = np.arange(soc_points)[None, :] + offsets[:, None]
+    in_grid = (target >= 0) & (target < soc_points)
+    target = np.clip(target, 0, soc_points - 1)
+    policy = np.empty((n_blocks, soc_points), dtype=np.int16)
+    columns = np.arange(soc_points)
+    for t in range(n_blocks - 1, -1, -1):
+        candidates = np.where(in_grid, value[target], np.inf) + step_cost[t][:, None]
+        policy[t] = np.argmin(candidates, axis=0)
+        value = candidates[policy[t], columns]
+
+    # İleri geçiş: başlangıç SOC'sinden politikayı izle
+    chosen = np.empty(n_blocks, dtype=int)
+    state = start
+    soc_index = np.empty(n_blocks + 1, dtype=int)
+    soc_index[0] = state
+    for t in range(n_blocks):
+        chosen[t] = policy[t, state]
+        state += offsets[chosen[t]]
+        soc_index[t + 1] = state
+    samples = np.arange(len(demand_kw))
+    path_battery_kw = battery_kw[block, chosen[block]]
+    path_diesel_kw = demand_kw - path_battery_kw
+    path_fuel_t, path_unserved_kwh = fuel_t[samples, chosen[block]], unserved_kwh[samples, chosen[block]]
+    # Blok içinde sabit güçte SOC doğrusal değişir: örnek sonundaki SOC, blok içindeki geçen süre oranıyla
+    block_energy = energy_kwh[soc_index]
+    elapsed_h = np.cumsum(duration_h) - np.concatenate(([0.0], np.cumsum(block_h)))[block]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(block_h[block] > 0, elapsed_h / block_h[block], 1.0)
+    end_energy = block_energy[block] + (block_energy[block + 1] - block_energy[block]) * np.clip(fraction, 0.0, 1.0)
+    soc_end_percent = end_energy / capacity_kwh * 100
+    soc_start_percent = np.concatenate(([block_energy[0] / capacity_kwh * 100], soc_end_percent[:-1]))
+
+    return {
+        "total_fuel_t": float(path_fuel_t.sum()),
+        "diesel_only_fuel_t": float(diesel_only_fuel.sum()),
+        "fuel_saving_t": float(diesel_only_fuel.sum() - path_fuel_t.sum()),
+        "unserved_kwh": float(path_unserved_kwh.sum()),
+        "diesel_only_unserved_kwh": float(diesel_only_unserved.sum()),
+        "discharged_kwh": float(np.sum(np.maximum(path_battery_kw, 0.0) * duration_h)),
+        "timeline": pd.DataFrame({
+            "Time (h)": np.concatenate(([0.0], np.cumsum(duration_h)[:-1])),
+            "Duration (h)": duration_h,
+            "Demand (kW)": demand_kw,
+            "Battery Power (kW)": path_battery_kw,
+            "Diesel Power (kW)": path_diesel_kw,
+            "SOC Start (%)": soc_start_percent,
+            "SOC End (%)": soc_end_percent,
+            "Fuel (ton)": path_fuel_t
+        }),
+        "soc_points": soc_points,
+        "decision_steps": n_blocks,
+        "max_offset": max_offset
+    }
@@ -0,0 +1,172 @@
+# fleet_analysis.py
+import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    ALL_SFOC_CURVES,
+    CONVENTIONAL_SHAFT_EFFICIENCY,
+    PROPULSION_PATH_INV_EFFICIENCY,
+    DEFAULT_TOTAL_ELEC_EFF_FACTOR,
+    FLEET_MAX_WORKERS,
+    CO2_EMISSION_FACTOR,
+    ELECTRICAL_EFFICIENCY_LOAD_DEPENDENT
+)
+from core_calculations import compile_sfoc_curves, required_de_power_for_mode, electrical_efficiency_table
+from dispatch_map import get_dispatch_map
+from load_profiles import read_load_profile, sample_durations_h, PROFILE_TIME_COLUMN, PROFILE_POWER_COLUMN, PROFILE_MODE_COLUMN
+from reference_engine import conventional_reference_fuel
+from shared_tables import publish_fleet_tables, attach_fleet_tables
+from voyage_metrics import total_metrics, metric_columns
+
+# Manifest'te her gemi için zorunlu alanlar
+VESSEL_REQUIRED_FIELDS = ("name", "main_engine_mcr", "main_gen_mcr", "main_gen_qty", "profile")
+# Sayısal alanlar: alan -> (tamsayı mı, alt sınır, alt sınır dahil mi, üst sınır)
+VESSEL_NUMERIC_FIELDS = {
+    "main_engine_mcr": (False, 0, False, None), "main_gen_mcr": (False, 0, False, None), "main_gen_qty": (True, 1, True, None),
+    "port_gen_mcr": (False, 0, True, None), "port_gen_qty": (True, 0, True, None),
+    "aux_dg_mcr": (False, 0, True, None), "aux_power_kw": (False, 0, True, None), "total_elec_eff": (False, 0, False, 1.0)
+}
+# Sayaçları özet tablosuna yazılan birim tipleri (DispatchMap.metrics)
+UNIT_KINDS = ("Ana", "Liman")
+
+# İşçi süreçlerdeki tablolar: {"sfoc_curves": {...}, "dispatch_maps": {filo_anahtarı: DispatchMap}}; diziler bellek eşlemeli dosyalardan salt okunur
+_WORKER_TABLES = {}
+
+def load_fleet_manifest(path):
+    """
+    Filo manifest'ini (JSON) okur ve doğrular. Biçim:
+    {"vessels": [{"name": ..., "main_engine_mcr": ..., "aux_dg_mcr": ..., "aux_power_kw": ...,
+                  "main_gen_mcr": ..., "main_gen_qty": ..., "port_gen_mcr": ..., "port_gen_qty": ...,
+                  "total_elec_eff": ..., "load_dependent_eff": true | false, "profile": "profil.csv" | [{"mode", "shaft_power_kw", "hours"}, ...]}]}
+    Göreli profil dosya yolları manifest'in bulunduğu klasöre göre çözülür.
+    """
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return normalize_fleet_manifest(manifest, base_dir=os.path.dirname(os.path.abspath(path)))
+
+def normalize_fleet_manifest(manifest, base_dir="."):
+    vessels = manifest.get("vessels") if isinstance(manifest, dict) else None
+    if not vessels: raise ValueError("Manifest'te 'vessels' listesi bulunamadı veya boş.")
+    normalized = []
+    for i, vessel in enumerate(vessels):
+        if not isinstance(vessel, dict): raise ValueError(f"{i + 1}. gemi bir nesne olmalı.")
+        missing = [field for field in VESSEL_REQUIRED_FIELDS if field not in vessel]
+        if missing: raise ValueError(f"{i + 1}. gemide eksik alan(lar): {', '.join(missing)}")
+        vessel = {
+            "aux_dg_mcr": 800, "aux_power_kw": 300, "port_gen_mcr": 0, "port_gen_qty": 0,
+            "total_elec_eff": DEFAULT_TOTAL_ELEC_EFF_FACTOR, "load_dependent_eff": ELECTRICAL_EFFICIENCY_LOAD_DEPENDENT, **vessel
+        }
+        vessel.update({field: _vessel_number(vessel, field, i + 1) for field in VESSEL_NUMERIC_FIELDS})
+        if not isinstance(vessel["load_dependent_eff"], bool): raise ValueError(f"{i + 1}. gemi: 'load_dependent_eff' true / false olmalı.")
+        if not isinstance(vessel["profile"], (str, list)): raise ValueError(f"{i + 1}. gemi: 'profile' dosya adı veya satır listesi olmalı.")
+        if isinstance(vessel["profile"], str) and not os.path.isabs(vessel["profile"]):
+            vessel["profile"] = os.path.join(base_dir, vessel["profile"])
+        normalized.append(vessel)
+    return normalized
+
+def _vessel_number(vessel, field, position):
+    # Manifest sayısını doğrular ve dönüştürür ("3" -> 3); tam sayı değerler int kalır (etiketler / filo anahtarları değişmez)
+    integer, lower, inclusive, upper = VESSEL_NUMERIC_FIELDS[field]
+    raw = vessel[field]
+    try:
+        if isinstance(raw, bool): raise ValueError
+        value = float(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"{position}. gemi: '{field}' sayı olmalı (verilen: {raw!r}).") from None
+    if not math.isfinite(value) or value < lower or (value == lower and not inclusive) or (upper is not None and value > upper):
+        bounds = f"{'>=' if inclusive else '>'} {lower}" + (f" ve <= {upper:g}" if upper is not None else "")
+        raise ValueError(f"{position}. gemi: '{field}' {bounds} olmalı (verilen: {raw!r}).")
+    if integer and not value.is_integer(): raise ValueError(f"{position}. gemi: '{field}' tam sayı olmalı (verilen: {raw!r}).")
+    return int(value) if value.is_integer() else value
+
+def fleet_key(vessel):
+    # Aynı jeneratör filosuna sahip gemiler aynı dispatch tablosunu paylaşır.
+    return (vessel["main_gen_mcr"], vessel["main_gen_qty"], vessel["port_gen_mcr"], vessel["port_gen_qty"])
+
+def _profile_arrays(profile):
+    # (şaft gücü, mod, süre saat) dizileri; profil ya CSV yolu ya da satır listesi olabilir.
+    if isinstance(profile, str):
+        frame = read_load_profile(profile)
+        return (frame[PROFILE_POWER_COLUMN].to_numpy(dtype=float), frame[PROFILE_MODE_COLUMN].astype(str).to_numpy(),
+                sample_durations_h(frame[PROFILE_TIME_COLUMN].to_numpy()))
+    frame = pd.DataFrame(profile)
+    return (frame[PROFILE_POWER_COLUMN].to_numpy(dtype=float), frame[PROFILE_MODE_COLUMN].astype(str).to_numpy(),
+            frame["hours"].to_numpy(dtype=float))
+
+def build_fleet_tables(vessels, sfoc_curves=ALL_SFOC_CURVES):
+    # Derlenmiş SFOC eğrileri ve her farklı filo için dispatch haritası (ana süreçte bir kez kurulur).
+    return {
+        "sfoc_curves": compile_sfoc_curves(sfoc_curves),
+        "dispatch_maps": {key: get_dispatch_map(*key, sfoc_curves) for key in {fleet_key(v) for v in vessels}}
+    }
+
+def _init_worker(published_tables):
+    _WORKER_TABLES.clear()
+    _WORKER_TABLES.update(attach_fleet_tables(published_tables))
+
+def evaluate_vessel(vessel, tables=None):
+    # Tek bir gemi için geleneksel referans ve DE alternatifinin sefer yakıtı (Seyir/Manevra kırılımıyla).
+    tables = tables if tables is not None else _WORKER_TABLES
+    sfoc_curves = tables["sfoc_curves"]
+    shaft_power, modes, durations_h = _profile_arrays(vessel["profile"])
+
+    conventional_fuel, _ = conventional_reference_fuel(
+        shaft_power, modes, durations_h, vessel["main_engine_mcr"], vessel["aux_dg_mcr"], vessel["aux_power_kw"],
+        sfoc_curves["main_engine"], sfoc_curves["aux_dg"]
+    )
+    de_power = required_de_power_for_mode(
+        shaft_power, modes, vessel["total_elec_eff"], CONVENTIONAL_SHAFT_EFFICIENCY, PROPULSION_PATH_INV_EFFICIENCY, vessel["aux_power_kw"],
+        electrical_efficiency_table(), vessel["main_engine_mcr"] if vessel["load_dependent_eff"] else None
+    )
+    dispatch_map = tables["dispatch_maps"][fleet_key(vessel)]
+    finite = np.isfinite(de_power)
+    sea, maneuver = modes == "Seyir", modes == "Manevra"
+    # Yakıt, CO2, çalışma ve yük bandı saatleri tek geçişte; gruplar: 0 Seyir, 1 Manevra, 2 diğer modlar
+    metrics = dispatch_map.metrics(np.where(finite, de_power, 0.0), durations_h, np.where(sea, 0, np.where(maneuver, 1, 2)), n_groups=3)
+    de_fuel = total_metrics({kind: metrics[kind] for kind in UNIT_KINDS})
+
+    return {
+        "Gemi": vessel["name"],
+        "Filo (DE)": f"{vessel['main_gen_qty']}x{vessel['main_gen_mcr']}kW Ana" + (f" + {vessel['port_gen_qty']}x{vessel['port_gen_mcr']}kW Liman" if vessel["port_gen_qty"] > 0 and vessel["port_gen_mcr"] > 0 else ""),
+        "Sefer Süresi (saat)": float(durations_h.sum()),
+        "Geleneksel Seyir Yakıtı (ton)": float(conventional_fuel[sea].sum()),
+        "Geleneksel Manevra Yakıtı (ton)": float(conventional_fuel[maneuver].sum()),
+        "DE Seyir Yakıtı (ton)": float(de_fuel["fuel_t"][0]),
+        "DE Manevra Yakıtı (ton)": float(de_fuel["fuel_t"][1]),
+        "Geleneksel CO2 (ton)": float(conventional_fuel[sea | maneuver].sum()) * CO2_EMISSION_FACTOR,
+        "DE CO2 (ton)": float(de_fuel["co2_t"][:2].sum()),
+        **{column: value for kind in UNIT_KINDS for column, value in metric_columns(metrics[kind], f"{kind} Jen.").items()},
+        "Karşılanamayan Süre (saat)": float(metrics["unserved_h"].sum())
+    }
+
+def run_fleet_analysis(vessels, max_workers=FLEET_MAX_WORKERS, sfoc_curves=ALL_SFOC_CURVES):
+    """
+    Tüm gemileri paralel işçi süreçlerde değerlendirir ve filo toplamıyla birlikte özet tablo döndürür.
+    Derlenmiş eğriler ve dispatch tabloları ana süreçte bir kez kurulup bellek eşlemeli dosyalara yayımlanır;
+    işçiler bunlara salt okunur bağlanır (kopyalama / pickle yok, işçi sayısıyla bellek artmaz).
+    """
+    tables = build_fleet_tables(vessels, sfoc_curves)
+    workers = min(max_workers or os.cpu_count() or 1, len(vessels))
+    if workers <= 1:
+        rows = [evaluate_vessel(vessel, tables) for vessel in vessels]
+    else:
+        # spawn: iş parçacıklı sunucu sürecinden fork edilmez; işçiler tabloları bellek eşlemeli dosyalardan açar (kalıtım gerekmez)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(publish_fleet_tables(tables),)) as executor:
+            rows = list(executor.map(evaluate_vessel, vessels))
+
+    summary = pd.DataFrame(rows)
+    summary["Geleneksel Toplam (ton)"] = summary["Geleneksel Seyir Yakıtı (ton)"] + summary["Geleneksel Manevra Yakıtı (ton)"]
+    summary["DE Toplam (ton)"] = summary["DE Seyir Yakıtı (ton)"] + summary["DE Manevra Yakıtı (ton)"]
+    summary["Tasarruf (ton)"] = summary["Geleneksel Toplam (ton)"] - summary["DE Toplam (ton)"]
+    totals = summary.select_dtypes("number").sum()
+    total_row = {"Gemi": "FİLO TOPLAMI", "Filo (DE)": f"{len(summary)} gemi", **totals.to_dict()}
+    summary = pd.concat([summary, pd.DataFrame([total_row])], ignore_index=True)
+    summary["Tasarruf (%)"] = np.where(summary["Geleneksel Toplam (ton)"] > 0, summary["Tasarruf (ton)"] / summary["Geleneksel Toplam (ton)"] * 100, np.nan)
+    return summary.round(2)
@@ -0,0 +1,66 @@
+# fleet_analysis_page.py
+import json
+import os
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from fleet_analysis import normalize_fleet_manifest, run_fleet_analysis
+from load_profiles import read_load_profile, sample_durations_h, PROFILE_TIME_COLUMN, PROFILE_POWER_COLUMN, PROFILE_MODE_COLUMN
+from sfoc_library import current_sfoc_curves
+
+def render_page():
+    """ "Filo Analizi" sayfasının içeriğini ve mantığını render eder. """
+    st.header("Filo Genelinde Dizel Elektrik Yakıt Analizi")
+    st.sidebar.header("Filo Analizi Girdi Ayarları")
+    max_workers_fl = st.sidebar.number_input("Paralel İşçi Süreç Sayısı", min_value=1, max_value=max(os.cpu_count() or 1, 1), value=max(os.cpu_count() or 1, 1), step=1, key="fl_max_workers")
+
+    st.markdown(
+        "Gemi konfigürasyonlarını ve yük profillerini içeren bir **manifest (JSON)** yükleyin. "
+        "Profiller manifest içinde satır listesi (`mode`, `shaft_power_kw`, `hours`) olarak ya da "
+        f"aşağıda yüklenen CSV dosyalarının adlarıyla (`{PROFILE_TIME_COLUMN}`, `{PROFILE_POWER_COLUMN}`, `{PROFILE_MODE_COLUMN}`) verilebilir."
+    )
+    manifest_file_fl = st.file_uploader("Filo Manifest'i (JSON)", type=["json"], key="fl_manifest_file")
+    profile_files_fl = st.file_uploader("Yük Profilleri (CSV)", type=["csv"], accept_multiple_files=True, key="fl_profile_files")
+
+    if "fl_summary_df" not in st.session_state: st.session_state.fl_summary_df = pd.DataFrame()
+
+    if manifest_file_fl is not None and st.sidebar.button("Filo HESAPLA", key="fl_calculate_button"):
+        try:
+            vessels_fl = normalize_fleet_manifest(json.load(manifest_file_fl))
+            uploaded_profiles_fl = {f.name: f for f in profile_files_fl or []}
+            for vessel_fl in vessels_fl:
+                if not isinstance(vessel_fl["profile"], str): continue
+                # Arayüzde profil adları sadece yüklenen dosyalara çözülür; sunucu dosya sistemi okunmaz (yollar sadece CLI için)
+                profile_name_fl = os.path.basename(vessel_fl["profile"])
+                if profile_name_fl not in uploaded_profiles_fl:
+                    raise ValueError(f"'{vessel_fl['name']}' gemisinin profili '{profile_name_fl}' yüklenen CSV dosyaları arasında yok.")
+                profile_df_fl = read_load_profile(uploaded_profiles_fl[profile_name_fl])
+                vessel_fl["profile"] = pd.DataFrame({
+                    PROFILE_MODE_COLUMN: profile_df_fl[PROFILE_MODE_COLUMN].astype(str),
+                    PROFILE_POWER_COLUMN: profile_df_fl[PROFILE_POWER_COLUMN],
+                    "hours": sample_durations_h(profile_df_fl[PROFILE_TIME_COLUMN].to_numpy())
+                })
+            with st.spinner(f"{len(vessels_fl)} gemi değerlendiriliyor..."):
+                st.session_state.fl_summary_df = run_fleet_analysis(vessels_fl, max_workers=int(max_workers_fl), sfoc_curves=current_sfoc_curves())
+        except (ValueError, KeyError, OSError) as e:
+            st.error(f"Filo analizi yapılamadı: {e}")
+            st.session_state.fl_summary_df = pd.DataFrame()
+
+    if not st.session_state.fl_summary_df.empty:
+        summary_fl = st.session_state.fl_summary_df
+        fleet_total_fl = summary_fl.iloc[-1]
+        col1_fl, col2_fl, col3_fl = st.columns(3)
+        col1_fl.metric("Geleneksel Toplam (ton)", f"{fleet_total_fl['Geleneksel Toplam (ton)']:.1f}")
+        col2_fl.metric("DE Toplam (ton)", f"{fleet_total_fl['DE Toplam (ton)']:.1f}")
+        col3_fl.metric("Filo Tasarrufu (ton)", f"{fleet_total_fl['Tasarruf (ton)']:.1f}", delta=f"{fleet_total_fl['Tasarruf (%)']:.2f}%")
+        st.dataframe(summary_fl, use_container_width=True)
+
+        per_vessel_fl = summary_fl.iloc[:-1].melt(
+            id_vars="Gemi", value_vars=["Geleneksel Toplam (ton)", "DE Toplam (ton)"],
+            var_name="Sistem", value_name="Yakıt (ton)"
+        )
+        fig_fleet_fl = px.bar(per_vessel_fl, x="Gemi", y="Yakıt (ton)", color="Sistem", barmode="group",
+                              title="Gemi Bazında Yakıt Karşılaştırması (Geleneksel vs DE)")
+        st.plotly_chart(fig_fleet_fl, use_container_width=True)
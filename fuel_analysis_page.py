@@ -6,220 +6,297 @@ import plotly.express as px
 import graphviz # Eğer graphviz kurulu değilse: pip install graphviz streamlit-agraph
 
 # Proje içi modüllerden importlar
-# DEĞİŞİKLİK: İlgili SFOC verileri doğrudan import ediliyor
-from config import (
-    SFOC_DATA_MAIN_ENGINE,
-    SFOC_DATA_AUX_DG,
-    SFOC_DATA_MAIN_DE_GEN,
-    SFOC_DATA_PORT_GEN,
-    ALL_SFOC_CURVES
-)
+# DEĞİŞİKLİK: SFOC eğrileri config yerine SFOC kütüphanesinden (sfoc_library) geliyor
+from config import FUEL_ANALYSIS_DEFAULTS
 from core_calculations import (
-    determine_generator_usage,
-    interpolate_sfoc_non_linear, # SFOC eğrisi çizimi için
-    calculate_fuel,
-    calculate_power_flow      # Güç akış diyagramı için
+    commit_generators,
+    calculate_power_flow,     # Güç akış diyagramı için
+    electrical_efficiency_table
 )
+from generator_sizing import optimize_generator_sizing, evaluate_catalog_fleets
+from genset_catalog import build_genset_catalog, catalog_sources_from_dir
+from dispatch_map import DISPATCH_SFOC_KEYS
+from reference_engine import conventional_reference, REFERENCE_SFOC_KEYS
+from sfoc_library import SFOC_CACHE_HASH_FUNCS, current_sfoc_curves, get_sfoc_library
+from plot_decimation import drilldown_frame, sweep_figure
+from voyage_metrics import accumulate_unit_metrics, metric_columns
+from session_store import get_result_store
+import telemetry
+
+@st.cache_data
+def build_power_flow_dot_source(shaft_power, motor_eff, converter_eff, switchboard_eff, generator_alt_eff, rated_shaft_power_kw=None):
+    # Güç akışı diyagramının DOT kaynağı; (şaft gücü, dört verimlilik) ile önbelleğe alınır, böylece
+    # ilgisiz widget'ların tetiklediği yeniden çalıştırmalarda graphviz grafiği tekrar kurulmaz.
+    # rated_shaft_power_kw verilirse verimler anma verimidir ve şaft yüküne göre düşürülür (yüke bağlı verim).
+    telemetry.cache_miss("build_power_flow_dot_source")
+    power_vals, loss_vals = calculate_power_flow(shaft_power, motor_eff, converter_eff, switchboard_eff, generator_alt_eff,
+                                                 electrical_efficiency_table(), rated_shaft_power_kw)
+    if not (power_vals and loss_vals): return None, None, None
+    dot = graphviz.Digraph('power_flow_diagram', comment='Güç Akışı ve Kayıplar (İyileştirilmiş Stil)')
+    dot.attr(rankdir='LR')
+    dot.attr('node', shape='plaintext', fontsize='14', fontname='Arial') # shape='plaintext' HTML etiketleri için
+    dot.attr('edge', fontsize='12', fontname='Arial')
+
+    def format_loss_perc_diag(loss_key, input_key):
+         # Kayıp yüzdesi bileşenin kendi girişine göre (yüke bağlı verimde anma verimi değil, uygulanan verim)
+         percent_val = loss_vals[loss_key] / power_vals[input_key] * 100 if power_vals[input_key] > 0 else np.nan
+         return f'({percent_val:.1f}%)' if not np.isnan(percent_val) else '(N/A)'
+
+
+    with dot.subgraph(name='cluster_electrical') as c:
+        c.attr(style='rounded', color='#EEEEEE', label='Elektriksel Sistem') # Gri arka planlı küme
+
+        # Alternatör Düğümü
+        c.node('alternator_in', label=f"""<
+<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#E0F2F7'>
+    <TR><TD COLSPAN='2' ALIGN='CENTER'><B>Alternatörler</B></TD></TR>
+    <TR><TD ALIGN='LEFT'>Mekanik Giriş:</TD><TD ALIGN='RIGHT'>{power_vals['alternator_mech_input']:.0f} kW</TD></TR>
+    <TR><TD ALIGN='LEFT'>Elektrik Çıkış:</TD><TD ALIGN='RIGHT'>{power_vals['alternator_elec_output']:.0f} kW</TD></TR>
+    <TR><TD ALIGN='LEFT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>Kayıp:</FONT></TD><TD ALIGN='RIGHT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>{loss_vals['alternator']:.0f} kW ({format_loss_perc_diag('alternator', 'alternator_mech_input')})</FONT></TD></TR>
+</TABLE>>""", tooltip="Alternatörler ve verimliliği")
 
-def render_page():
-    """ "Yakıt Analizi" sayfasının içeriğini ve mantığını render eder. """
-    st.sidebar.header("Yakıt Analizi Girdi Ayarları")
-    # Widget'lar için benzersiz key'ler (önemli!)
-    gen_power_range_input = st.sidebar.slider("Jeneratör Birim Güç Aralığı (kW)", 1800, 3600, (2000, 3400), step=100, key="fa_gen_power_range")
-    sea_power_range_input = st.sidebar.slider("Seyir Şaft Güç Aralığı (kW)", 2500, 5500, (3000, 4400), step=100, key="fa_sea_power_range")
-    maneuver_power_range_input = st.sidebar.slider("Manevra Şaft Güç Aralığı (kW)", 1500, 3500, (1600, 2700), step=100, key="fa_maneuver_power_range")
-    sea_duration_input = st.sidebar.number_input("Seyir Süresi (saat)", min_value=1.0, value=48.0, step=1.0, key="fa_sea_duration")
-    maneuver_duration_input = st.sidebar.number_input("Manevra Süresi (saat)", min_value=1.0, value=4.0, step=1.0, key="fa_maneuver_duration")
-    main_engine_mcr_input = st.sidebar.number_input("Ana Makine MCR (kW)", min_value=1000, value=7200, step=100, key="fa_main_engine_mcr")
-    conv_aux_dg_mcr_input = st.sidebar.number_input( "Yardımcı DG MCR Değeri (kW) (Geleneksel Manevra İçin)", min_value=100, value=800, step=50, key="fa_conv_aux_dg_mcr" )
-    aux_power_demand_input = st.sidebar.number_input("Yardımcı Güç İhtiyacı (kW)", min_value=0, value=300, step=50, key="fa_aux_power")
+        # Ana Pano Düğümü
+        c.node('switchboard', label=f"""<
+<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#F0F4C3'>
+    <TR><TD ALIGN='CENTER'><B>Ana Pano</B></TD></TR>
+    <TR><TD ALIGN='LEFT'>Giriş:</TD><TD ALIGN='RIGHT'>{power_vals['switchboard_input_from_gens']:.0f} kW</TD></TR>
+    <TR><TD ALIGN='LEFT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>Kayıp:</FONT></TD><TD ALIGN='RIGHT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>{loss_vals['switchboard']:.0f} kW ({format_loss_perc_diag('switchboard', 'switchboard_input_from_gens')})</FONT></TD></TR>
+</TABLE>>""", tooltip="Ana Pano ve kayıpları")
 
-    # --- Session State Başlatma (Sadece bu sayfa için) ---
-    if "fa_results_df" not in st.session_state: st.session_state.fa_results_df = pd.DataFrame()
-    if "fa_detailed_df" not in st.session_state: st.session_state.fa_detailed_df = pd.DataFrame()
-    if "fa_usage_df" not in st.session_state: st.session_state.fa_usage_df = pd.DataFrame()
-    if "fa_show_fuel_results" not in st.session_state: st.session_state.fa_show_fuel_results = False
+        # Frekans Konvertörü Düğümü
+        c.node('converter', label=f"""<
+<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#FCE4EC'>
+    <TR><TD ALIGN='CENTER'><B>Frekans Konvertörü</B></TD></TR>
+    <TR><TD ALIGN='LEFT'>Giriş:</TD><TD ALIGN='RIGHT'>{power_vals['converter_input']:.0f} kW</TD></TR>
+    <TR><TD ALIGN='LEFT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>Kayıp:</FONT></TD><TD ALIGN='RIGHT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>{loss_vals['converter']:.0f} kW ({format_loss_perc_diag('converter', 'converter_input')})</FONT></TD></TR>
+</TABLE>>""", tooltip="Frekans Konvertörü ve kayıpları")
 
-    @st.cache_data
-    def calculate_all_results_for_fuel_analysis(
-        current_gen_power_range, current_sea_power_range, current_maneuver_power_range,
-        current_sea_duration, current_maneuver_duration, current_main_engine_mcr,
-        current_aux_power_demand_kw, # Hem seyir hem manevra için ortak yardımcı güç
-        current_conv_aux_dg_mcr_kw # Geleneksel manevra için yardımcı DG MCR'ı
-    ):
-        # DEĞİŞİKLİK: sfoc_data_global kullanımı kaldırıldı.
-        results_summary_list = []
-        detailed_data_list = []
-        generator_usage_data_list = []
-
-        # --- 1. Ana Makine Referans Verileri ---
-        # Seyir Modu - Ana Makine
-        total_sea_fuel_main_engine_overall = 0
-        for shaft_power_sea in range(current_sea_power_range[0], current_sea_power_range[1] + 100, 100):
-            if shaft_power_sea <= 0 or current_main_engine_mcr <= 0: continue
-            main_engine_load_sea = (shaft_power_sea / current_main_engine_mcr) * 100
-            if main_engine_load_sea > 0:
-                # DEĞİŞİKLİK: Ana makine için doğru SFOC verisi kullanılıyor.
-                fuel_main_ref_sea = calculate_fuel(shaft_power_sea, main_engine_load_sea, current_sea_duration, SFOC_DATA_MAIN_ENGINE)
-                if fuel_main_ref_sea > 0:
-                    total_sea_fuel_main_engine_overall += fuel_main_ref_sea
-                    detailed_data_list.append({
-                        "Combo": "Ana Makine Referans", "Mode": "Seyir", "Shaft Power (kW)": shaft_power_sea,
-                        "DE Power (kW)": np.nan, "Fuel (ton)": round(fuel_main_ref_sea, 3), "System Type": "Ana Makine",
-                        "Load (%)": round(main_engine_load_sea, 2)
-                    })
-
-        # Manevra Modu - Ana Makine (GÜNCELLENMİŞ HESAPLAMA: ME + Yardımcı DG'ler)
-        total_maneuver_fuel_main_engine_overall = 0
-        SABIT_YARDIMCI_DG_SAYISI_MANEVRA = 2
-        for shaft_power_maneuver in range(current_maneuver_power_range[0], current_maneuver_power_range[1] + 100, 100):
-            current_shaft_power_man = max(0, shaft_power_maneuver)
-
-            me_propulsion_fuel_maneuver = 0
-            main_engine_load_maneuver = 0
-            if current_main_engine_mcr > 0:
-                 main_engine_load_maneuver = (current_shaft_power_man / current_main_engine_mcr) * 100
-                 if main_engine_load_maneuver >= 0:
-                    # DEĞİŞİKLİK: Ana makine için doğru SFOC verisi kullanılıyor.
-                    me_propulsion_fuel_maneuver = calculate_fuel(current_shaft_power_man, main_engine_load_maneuver, current_maneuver_duration, SFOC_DATA_MAIN_ENGINE)
-                    me_propulsion_fuel_maneuver = me_propulsion_fuel_maneuver if me_propulsion_fuel_maneuver > 0 else 0
-            
-            total_aux_dg_fuel_maneuver = 0
-            load_per_aux_dg_percent = 0
-            if current_aux_power_demand_kw > 0 and current_conv_aux_dg_mcr_kw > 0 and SABIT_YARDIMCI_DG_SAYISI_MANEVRA > 0:
-                power_per_aux_dg = current_aux_power_demand_kw / SABIT_YARDIMCI_DG_SAYISI_MANEVRA
-                if power_per_aux_dg <= current_conv_aux_dg_mcr_kw:
-                    load_per_aux_dg_percent = (power_per_aux_dg / current_conv_aux_dg_mcr_kw) * 100
-                    if load_per_aux_dg_percent >= 0:
-                        # DEĞİŞİKLİK: Yardımcı jeneratör için doğru SFOC verisi kullanılıyor.
-                        fuel_one_dg = calculate_fuel(power_per_aux_dg, load_per_aux_dg_percent, current_maneuver_duration, SFOC_DATA_AUX_DG)
-                        if fuel_one_dg > 0:
-                            total_aux_dg_fuel_maneuver = fuel_one_dg * SABIT_YARDIMCI_DG_SAYISI_MANEVRA
-                            
-            total_conventional_maneuver_fuel_point = me_propulsion_fuel_maneuver + total_aux_dg_fuel_maneuver
-
-            if total_conventional_maneuver_fuel_point > 0:
-                total_maneuver_fuel_main_engine_overall += total_conventional_maneuver_fuel_point
-                detailed_data_list.append({
-                    "Combo": "Ana Makine Referans", "Mode": "Manevra", "Shaft Power (kW)": current_shaft_power_man,
-                    "DE Power (kW)": np.nan, 
-                    "Fuel (ton)": round(total_conventional_maneuver_fuel_point, 3), "System Type": "Ana Makine",
-                    "Load (%)": round(main_engine_load_maneuver, 2)
-                })
-
-        # --- 2. Jeneratör Verilerini Hesapla (DE Sistemi) ---
-        propulsion_path_inv_efficiency = 0.95 / (0.97*0.985*0.995*0.98)
-        AUX_PATH_EFFICIENCY_FOR_DE_SEA_AUX = 0.968
-
-        for gen_power_unit in range(current_gen_power_range[0], current_gen_power_range[1] + 100, 100):
-            if gen_power_unit <= 0: continue
-            combo_label = f"3 x {gen_power_unit} kW Jeneratör"
-            current_combo_total_sea_fuel_generators = 0
-            current_combo_total_maneuver_fuel_generators = 0
-
-            # Seyir modu - Jeneratörler
-            for shaft_power_from_slider_sea in range(current_sea_power_range[0], current_sea_power_range[1] + 100, 100):
-                current_shaft_power_sea = max(0, shaft_power_from_slider_sea)
-                effective_shaft_power_for_propulsion_sea = max(0, current_shaft_power_sea - current_aux_power_demand_kw)
-                de_power_for_propulsion_sea = effective_shaft_power_for_propulsion_sea * propulsion_path_inv_efficiency
-                de_power_for_auxiliary_sea = 0
-                if current_aux_power_demand_kw > 0:
-                    if AUX_PATH_EFFICIENCY_FOR_DE_SEA_AUX > 0:
-                        de_power_for_auxiliary_sea = current_aux_power_demand_kw / AUX_PATH_EFFICIENCY_FOR_DE_SEA_AUX
-                    else:
-                        de_power_for_auxiliary_sea = float('inf')
-                total_de_power_on_generators_sea = de_power_for_propulsion_sea + de_power_for_auxiliary_sea
-
-                if total_de_power_on_generators_sea <= 0 or not np.isfinite(total_de_power_on_generators_sea):
-                    continue
-
-                ngen_sea, load_sea = determine_generator_usage(total_de_power_on_generators_sea, gen_power_unit)
-                if ngen_sea is not None and load_sea is not None:
-                    # DEĞİŞİKLİK: Dizel Elektrik ana jeneratörleri için doğru SFOC verisi kullanılıyor.
-                    fuel_gen_sea = calculate_fuel(total_de_power_on_generators_sea, load_sea, current_sea_duration, SFOC_DATA_MAIN_DE_GEN)
-                    if fuel_gen_sea > 0:
-                        current_combo_total_sea_fuel_generators += fuel_gen_sea
-                        detailed_data_list.append({
-                            "Combo": combo_label, "Mode": "Seyir", "Shaft Power (kW)": current_shaft_power_sea,
-                            "DE Power (kW)": round(total_de_power_on_generators_sea),
-                            "Fuel (ton)": round(fuel_gen_sea, 3), "System Type": "Jeneratör",
-                            "Load (%)": round(load_sea, 2)
-                        })
-                        generator_usage_data_list.append({
-                            "Combo": combo_label, "Mode": "Seyir", "DE Power (kW)": round(total_de_power_on_generators_sea),
-                            "Generators Used": ngen_sea, "Load Per Generator (%)": round(load_sea, 2)
-                        })
-
-            # Manevra modu - Jeneratörler
-            for shaft_power_from_slider_maneuver in range(current_maneuver_power_range[0], current_maneuver_power_range[1] + 100, 100):
-                current_shaft_power_man = max(0, shaft_power_from_slider_maneuver)
-                de_power_for_propulsion_man = current_shaft_power_man * propulsion_path_inv_efficiency
-                de_power_for_auxiliary_man = current_aux_power_demand_kw if current_aux_power_demand_kw > 0 else 0
-                total_de_power_on_generators_man = de_power_for_propulsion_man + de_power_for_auxiliary_man
-
-                if total_de_power_on_generators_man <= 0 or not np.isfinite(total_de_power_on_generators_man):
-                    continue
-                
-                ngen_maneuver, load_maneuver = determine_generator_usage(total_de_power_on_generators_man, gen_power_unit)
-                if ngen_maneuver is not None and load_maneuver is not None:
-                    # DEĞİŞİKLİK: Dizel Elektrik ana jeneratörleri için doğru SFOC verisi kullanılıyor.
-                    fuel_gen_maneuver = calculate_fuel(total_de_power_on_generators_man, load_maneuver, current_maneuver_duration, SFOC_DATA_MAIN_DE_GEN)
-                    if fuel_gen_maneuver > 0:
-                        current_combo_total_maneuver_fuel_generators += fuel_gen_maneuver
-                        detailed_data_list.append({
-                            "Combo": combo_label, "Mode": "Manevra", "Shaft Power (kW)": current_shaft_power_man,
-                            "DE Power (kW)": round(total_de_power_on_generators_man),
-                            "Fuel (ton)": round(fuel_gen_maneuver, 3), "System Type": "Jeneratör",
-                            "Load (%)": round(load_maneuver, 2)
-                        })
-                        generator_usage_data_list.append({
-                            "Combo": combo_label, "Mode": "Manevra", "DE Power (kW)": round(total_de_power_on_generators_man),
-                            "Generators Used": ngen_maneuver, "Load Per Generator (%)": round(load_maneuver, 2)
-                        })
-            
-            if current_combo_total_sea_fuel_generators > 0 or current_combo_total_maneuver_fuel_generators > 0:
-                sea_diff = total_sea_fuel_main_engine_overall - current_combo_total_sea_fuel_generators
-                canal_passage_diff = total_maneuver_fuel_main_engine_overall - current_combo_total_maneuver_fuel_generators
-                berthing_maneuver_diff = total_maneuver_fuel_main_engine_overall - (current_combo_total_maneuver_fuel_generators/8)
-                results_summary_list.append({
-                    "Jeneratör Kombinasyonu": combo_label,
-                    "Seyirde Yakılan Yakıt (DE) (ton)": round(current_combo_total_sea_fuel_generators, 2),
-                    "Manevrada Yakılan Yakıt (DE) (ton)": round(current_combo_total_maneuver_fuel_generators, 2),
-                    "Seyir Yakıt Farkı (ton)": round(sea_diff, 2),
-                    "Kanal Geçiş Yakıt Farkı (ton)": round(canal_passage_diff, 2),
-                    "Yanaşma Manevrası Yakıt Farkı (ton)": round(berthing_maneuver_diff, 2)
-                })
-        
-        return pd.DataFrame(results_summary_list), pd.DataFrame(detailed_data_list), pd.DataFrame(generator_usage_data_list)
+    # Elektrik Motoru Düğümü (Küme dışında olabilir veya içinde)
+    dot.node('motor_out', label=f"""<
+<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#D4EDDA'>
+    <TR><TD ALIGN='CENTER'><B>Elektrik Motoru</B></TD></TR>
+    <TR><TD ALIGN='LEFT'>Giriş:</TD><TD ALIGN='RIGHT'>{power_vals['motor_input']:.0f} kW</TD></TR>
+    <TR><TD ALIGN='LEFT'>Çıkış (Şafta):</TD><TD ALIGN='RIGHT'>{power_vals['shaft']:.0f} kW</TD></TR>
+    <TR><TD ALIGN='LEFT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>Kayıp:</FONT></TD><TD ALIGN='RIGHT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>{loss_vals['motor']:.0f} kW ({format_loss_perc_diag('motor', 'motor_input')})</FONT></TD></TR>
+</TABLE>>""", tooltip="Elektrik Motoru ve kayıpları")
+    
+    # Ana Tahrik Elemanı (Sanal Düğüm) - Daha yukarıda, akışın başında olabilir
+    dot.node('prime_mover', label=f"""<
+<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#FFF9C4'>
+    <TR><TD ALIGN='CENTER'><B>Ana Tahrik Elemanı</B><BR/>(Dizel Motorlar)</TD></TR>
+</TABLE>>""", tooltip="Yakıtın enerjiye dönüştüğü yer")
 
-    # ... Kodun geri kalanı orijinal haliyle korunuyor ...
-    # "HESAPLA" butonu ve sonrası olduğu gibi kalır.
-    if st.sidebar.button("HESAPLA", key="fa_calculate_button"):
-        st.session_state.fa_show_fuel_results = True
-        st.session_state.fa_results_df, st.session_state.fa_detailed_df, st.session_state.fa_usage_df = \
-            calculate_all_results_for_fuel_analysis(
-                gen_power_range_input, sea_power_range_input, maneuver_power_range_input,
-                sea_duration_input, maneuver_duration_input, main_engine_mcr_input,
-                aux_power_demand_input,
-                conv_aux_dg_mcr_input
-            )
-        if st.session_state.fa_results_df.empty and st.session_state.fa_detailed_df.empty:
-             st.warning("Hesaplama yapıldı ancak 'Yakıt Analizi' için gösterilecek sonuç bulunamadı. Girdilerinizi kontrol edin.")
+    # Şaft Gücü Düğümü
+    dot.node('shaft_node', label=f"""<
+<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#E1BEE7'>
+    <TR><TD ALIGN='CENTER'><B>Şaft Gücü (Pervane)</B></TD></TR>
+    <TR><TD ALIGN='CENTER'>{power_vals['shaft']:.0f} kW</TD></TR>
+</TABLE>>""", tooltip="Pervaneye iletilen net güç")
 
-    st.header("Dizel Elektrik ve Geleneksel Sistem Yakıt Tüketim Analizi")
 
-    if st.session_state.fa_show_fuel_results and not st.session_state.fa_results_df.empty:
+    # Kenarlar (Güç Akışı) - Renkler ve oklar
+    dot.edge('prime_mover', 'alternator_in', label=f"Mekanik Güç\n{power_vals['alternator_mech_input']:.0f} kW", penwidth="2", color="#4A148C", style="dashed", arrowhead="normal", fontcolor="#4A148C")
+    dot.edge('alternator_in', 'switchboard', label=f"{power_vals['alternator_elec_output']:.0f} kW", penwidth="2.5", color="#1B5E20", arrowhead="vee", fontcolor="#1B5E20")
+    dot.edge('switchboard', 'converter', label=f"{power_vals['converter_input']:.0f} kW", penwidth="2.5", color="#E65100", arrowhead="vee", fontcolor="#E65100")
+    dot.edge('converter', 'motor_out', label=f"{power_vals['motor_input']:.0f} kW", penwidth="2.5", color="#AD1457", arrowhead="vee", fontcolor="#AD1457")
+    dot.edge('motor_out', 'shaft_node', label=f"{power_vals['shaft']:.0f} kW", penwidth="2.5", color="#0D47A1", arrowhead="vee", fontcolor="#0D47A1")
+
+    return dot.source, power_vals, loss_vals
+
+# DE sisteminde şaft -> jeneratör güç dönüşümü (tahrik yolu ters verimi, seyirde yardımcı güç yolu verimi)
+DE_PROPULSION_PATH_INV_EFFICIENCY = 0.95 / (0.97*0.985*0.995*0.98)
+AUX_PATH_EFFICIENCY_FOR_DE_SEA_AUX = 0.968
+
+# Önbellekli hesapların kullandığı SFOC eğrileri: sadece bunlardan biri değişince sonuçları yeniden hesaplanır
+FUEL_ANALYSIS_SFOC_KEYS = REFERENCE_SFOC_KEYS + ("main_de_gen",)
+SIZING_SFOC_KEYS = REFERENCE_SFOC_KEYS + DISPATCH_SFOC_KEYS
+
+@st.cache_data(hash_funcs=SFOC_CACHE_HASH_FUNCS)
+def calculate_all_results_for_fuel_analysis(
+    current_gen_power_range, current_sea_power_range, current_maneuver_power_range,
+    current_sea_duration, current_maneuver_duration, current_main_engine_mcr,
+    current_aux_power_demand_kw, # Hem seyir hem manevra için ortak yardımcı güç
+    current_conv_aux_dg_mcr_kw, # Geleneksel manevra için yardımcı DG MCR'ı
+    sfoc_curves, # FUEL_ANALYSIS_SFOC_KEYS eğrileri (SfocCurveSet)
+    current_gen_qty_range=(3, 3), # Kurulu jeneratör adedi aralığı (tarama boyutu)
+    current_load_dependent_eff=False # True: tahrik yolu verimi şaft yüküne bağlı (anma gücü ana makine MCR'ı)
+):
+    # DEĞİŞİKLİK: sfoc_data_global kullanımı kaldırıldı; eğriler parametre olarak gelir (önbellek anahtarına girer).
+    telemetry.cache_miss("calculate_all_results_for_fuel_analysis")
+    results_summary_list = []
+    detailed_data_list = []
+    generator_usage_data_list = []
+
+    # --- 1. Ana Makine Referans Verileri ---
+    # Seyir: sadece ana makine; Manevra: ana makine + sabit sayıda yardımcı DG. Referans jeneratör taramasından
+    # bağımsızdır; paylaşılan önbellekten gelir (reference_engine.conventional_reference).
+    reference = conventional_reference(
+        current_sea_power_range, current_maneuver_power_range, current_sea_duration, current_maneuver_duration,
+        current_main_engine_mcr, current_conv_aux_dg_mcr_kw, current_aux_power_demand_kw, sfoc_curves.subset(REFERENCE_SFOC_KEYS)
+    )
+    for mode_label, mode_reference in reference.items():
+        for shaft_power_ref, fuel_ref, load_ref in zip(mode_reference["shaft_power_kw"].tolist(), mode_reference["fuel_t"].tolist(), mode_reference["load_percent"].tolist()):
+            detailed_data_list.append({
+                "Combo": "Ana Makine Referans", "Mode": mode_label, "Shaft Power (kW)": shaft_power_ref,
+                "DE Power (kW)": np.nan, "Fuel (ton)": round(fuel_ref, 3), "System Type": "Ana Makine",
+                "Load (%)": round(load_ref, 2)
+            })
+    total_sea_fuel_main_engine_overall = reference["Seyir"]["total_fuel_t"]
+    total_maneuver_fuel_main_engine_overall = reference["Manevra"]["total_fuel_t"]
+
+    # --- 2. Jeneratör Verilerini Hesapla (DE Sistemi) ---
+    # Birim güç x kurulu adet kombinasyonları (birim dışta, adet içte) ile tarama noktalarının ızgarası tek seferde
+    # değerlendirilir: devreye alınan adet kapalı formdan (commit_generators), yakıt derlenmiş SFOC eğrisinden.
+    combos = [
+        (gen_power_unit, gen_qty)
+        for gen_power_unit in range(current_gen_power_range[0], current_gen_power_range[1] + 100, 100) if gen_power_unit > 0
+        for gen_qty in range(current_gen_qty_range[0], current_gen_qty_range[1] + 1) if gen_qty > 0
+    ]
+    shaft_power, modes, de_power, durations_h = fuel_analysis_de_demand(
+        current_sea_power_range, current_maneuver_power_range, current_sea_duration, current_maneuver_duration, current_aux_power_demand_kw,
+        current_main_engine_mcr if current_load_dependent_eff else None
+    )
+    unit_powers = np.array([gen_power_unit for gen_power_unit, _ in combos], dtype=float)[:, None]
+    installed_qty = np.array([gen_qty for _, gen_qty in combos], dtype=int)[:, None]
+    demanded = (de_power > 0) & np.isfinite(de_power)
+    ngen, load = commit_generators(np.where(demanded, de_power, 0.0), unit_powers, installed_qty)
+    sfoc = sfoc_curves["main_de_gen"](np.nan_to_num(load))
+    # DEĞİŞİKLİK: Dizel Elektrik ana jeneratörleri için doğru SFOC verisi kullanılıyor.
+    fuel = np.where((ngen > 0) & (sfoc >= 50) & (durations_h > 0), de_power * durations_h * sfoc / 1_000_000, 0.0)
+    used = demanded & (fuel > 0)
+    combo_index, point_index = np.nonzero(used)
+
+    combo_labels = np.array([f"{gen_qty} x {gen_power_unit} kW Jeneratör" for gen_power_unit, gen_qty in combos], dtype=object)
+    labels, point_modes = combo_labels[combo_index], modes[point_index]
+    de_rounded = np.round(de_power[point_index]).astype(int)
+    point_loads = np.round(load[combo_index, point_index], 2)
+    detailed_data_list.extend(pd.DataFrame({
+        "Combo": labels, "Mode": point_modes, "Shaft Power (kW)": shaft_power[point_index].astype(int),
+        "DE Power (kW)": de_rounded, "Fuel (ton)": np.round(fuel[combo_index, point_index], 3), "System Type": "Jeneratör",
+        "Load (%)": point_loads
+    }).to_dict(orient="records"))
+    generator_usage_data_list.extend(pd.DataFrame({
+        "Combo": labels, "Mode": point_modes, "DE Power (kW)": de_rounded,
+        "Generators Used": ngen[combo_index, point_index], "Load Per Generator (%)": point_loads
+    }).to_dict(orient="records"))
+
+    # Kombinasyon x mod sayaçları (yakıt, CO2, jeneratör çalışma ve yük bandı saatleri) tek geçişte; toplamlar
+    # nokta sırasıyla alınır. Gruplar: 0 Seyir, 1 Manevra
+    metrics = accumulate_unit_metrics(durations_h, {"Jeneratör": (np.where(used, ngen, 0), load, fuel)}, (modes != "Seyir").astype(int), n_groups=2)["Jeneratör"]
+    for i, combo_label in enumerate(combo_labels):
+        current_combo_total_sea_fuel_generators, current_combo_total_maneuver_fuel_generators = metrics["fuel_t"][i].tolist()
+        if current_combo_total_sea_fuel_generators > 0 or current_combo_total_maneuver_fuel_generators > 0:
+            sea_diff = total_sea_fuel_main_engine_overall - current_combo_total_sea_fuel_generators
+            canal_passage_diff = total_maneuver_fuel_main_engine_overall - current_combo_total_maneuver_fuel_generators
+            berthing_maneuver_diff = total_maneuver_fuel_main_engine_overall - (current_combo_total_maneuver_fuel_generators/8)
+            results_summary_list.append({
+                "Jeneratör Kombinasyonu": combo_label,
+                "Seyirde Yakılan Yakıt (DE) (ton)": round(current_combo_total_sea_fuel_generators, 2),
+                "Manevrada Yakılan Yakıt (DE) (ton)": round(current_combo_total_maneuver_fuel_generators, 2),
+                "Seyir Yakıt Farkı (ton)": round(sea_diff, 2),
+                "Kanal Geçiş Yakıt Farkı (ton)": round(canal_passage_diff, 2),
+                "Yanaşma Manevrası Yakıt Farkı (ton)": round(berthing_maneuver_diff, 2),
+                # Talep olup kurulu adet / yük bandıyla karşılanamayan (toplamlara girmeyen) noktalar
+                "Atlanan Nokta Sayısı": int(np.count_nonzero(demanded & ~used[i])),
+                "DE CO2 (ton)": round(float(metrics["co2_t"][i].sum()), 2),
+                **{column: round(value, 1) for column, value in metric_columns({"running_h": metrics["running_h"][i], "band_h": metrics["band_h"][i]}, "Jen.").items()}
+            })
+    
+    return pd.DataFrame(results_summary_list), pd.DataFrame(detailed_data_list), pd.DataFrame(generator_usage_data_list)
+
+def fuel_analysis_de_demand(sea_power_range, maneuver_power_range, sea_duration, maneuver_duration, aux_power_demand_kw, rated_shaft_power_kw=None):
+    # Tarama noktalarının (100 kW adım) jeneratörlerden istenen DE gücü (seyirde yardımcı güç ayrı yoldan), vektörel.
+    # rated_shaft_power_kw verilirse tahrik yolu verimi şaft yüküne bağlıdır (derlenmiş verim tablosundan).
+    # Döndürür: (şaft gücü, mod, DE gücü, süre) dizileri
+    sea_shaft = np.maximum(np.arange(sea_power_range[0], sea_power_range[1] + 100, 100, dtype=float), 0.0)
+    maneuver_shaft = np.maximum(np.arange(maneuver_power_range[0], maneuver_power_range[1] + 100, 100, dtype=float), 0.0)
+    aux_power = aux_power_demand_kw if aux_power_demand_kw > 0 else 0
+    sea_propulsion = np.maximum(sea_shaft - aux_power_demand_kw, 0.0)
+    sea_chain, maneuver_chain = 1.0, 1.0
+    if rated_shaft_power_kw:
+        sea_chain = electrical_efficiency_table().chain_factor(sea_propulsion / rated_shaft_power_kw * 100)
+        maneuver_chain = electrical_efficiency_table().chain_factor(maneuver_shaft / rated_shaft_power_kw * 100)
+    de_sea = sea_propulsion * DE_PROPULSION_PATH_INV_EFFICIENCY / sea_chain + aux_power / AUX_PATH_EFFICIENCY_FOR_DE_SEA_AUX
+    de_maneuver = maneuver_shaft * DE_PROPULSION_PATH_INV_EFFICIENCY / maneuver_chain + aux_power
+    return (np.concatenate([sea_shaft, maneuver_shaft]),
+            np.array(["Seyir"] * len(sea_shaft) + ["Manevra"] * len(maneuver_shaft)),
+            np.concatenate([de_sea, de_maneuver]),
+            np.concatenate([np.full(len(sea_shaft), float(sea_duration)), np.full(len(maneuver_shaft), float(maneuver_duration))]))
+
+@st.cache_data(hash_funcs=SFOC_CACHE_HASH_FUNCS, show_spinner=False)
+def optimize_sizing_for_fuel_analysis(
+    current_sea_power_range, current_maneuver_power_range, current_sea_duration, current_maneuver_duration,
+    current_main_engine_mcr, current_aux_power_demand_kw, current_conv_aux_dg_mcr_kw,
+    main_mcr_range, port_mcr_range, max_main_qty, max_port_qty, sfoc_curves, load_dependent_eff=False
+):
+    # Optimum boyutlandırma modu: tüm tarama noktalarının toplam sefer yakıtını en aza indiren ana/liman filosu.
+    # Döndürür: (adet kombinasyonu başına optimum tablosu (geleneksel sisteme göre farkla), arama bilgisi)
+    telemetry.cache_miss("optimize_sizing_for_fuel_analysis")
+    shaft_power, modes, de_power, durations_h = fuel_analysis_de_demand(
+        current_sea_power_range, current_maneuver_power_range, current_sea_duration, current_maneuver_duration, current_aux_power_demand_kw,
+        current_main_engine_mcr if load_dependent_eff else None
+    )
+    _, table, info = optimize_generator_sizing(de_power, durations_h, main_mcr_range, port_mcr_range, max_main_qty, max_port_qty, sfoc_curves=sfoc_curves)
+    reference = conventional_reference(
+        current_sea_power_range, current_maneuver_power_range, current_sea_duration, current_maneuver_duration,
+        current_main_engine_mcr, current_conv_aux_dg_mcr_kw, current_aux_power_demand_kw, sfoc_curves.subset(REFERENCE_SFOC_KEYS)
+    )
+    if not table.empty:
+        table["Geleneksel Sisteme Göre Fark (ton)"] = sum(mode_reference["total_fuel_t"] for mode_reference in reference.values()) - table["Sefer Yakıtı (ton)"]
+    return table.round(2), info
+
+@st.cache_data(hash_funcs=SFOC_CACHE_HASH_FUNCS, show_spinner=False)
+def evaluate_catalog_for_fuel_analysis(
+    current_sea_power_range, current_maneuver_power_range, current_sea_duration, current_maneuver_duration,
+    current_main_engine_mcr, current_aux_power_demand_kw, current_conv_aux_dg_mcr_kw,
+    catalog_fingerprint, _catalog, main_mcr_range, port_mcr_range, max_sfoc_at_75, max_main_qty, max_port_qty, sfoc_curves,
+    load_dependent_eff=False
+):
+    # Katalog modu: MCR / SFOC sorgusuna uyan modellerden kurulan aday filoların sefer yakıtı (katalog içeriği
+    # catalog_fingerprint ile önbellek anahtarına girer). Döndürür: (aday filo tablosu, bilgi sözlüğü)
+    telemetry.cache_miss("evaluate_catalog_for_fuel_analysis")
+    _, _, de_power, durations_h = fuel_analysis_de_demand(
+        current_sea_power_range, current_maneuver_power_range, current_sea_duration, current_maneuver_duration, current_aux_power_demand_kw,
+        current_main_engine_mcr if load_dependent_eff else None
+    )
+    max_sfoc = max_sfoc_at_75 if max_sfoc_at_75 > 0 else None
+    main_indices = _catalog.query(main_mcr_range, max_sfoc=max_sfoc)
+    port_indices = _catalog.query(port_mcr_range, max_sfoc=max_sfoc) if max_port_qty > 0 and port_mcr_range[1] > 0 else []
+    demand = np.isfinite(de_power) & (de_power > 0)
+    peak = float(de_power[demand].max()) if demand.any() else 0.0
+    fleets = _catalog.candidate_fleets(main_indices, port_indices, peak, max_main_qty, max_port_qty)
+    table = evaluate_catalog_fleets(de_power, durations_h, _catalog, fleets, sfoc_curves)
+    reference = conventional_reference(
+        current_sea_power_range, current_maneuver_power_range, current_sea_duration, current_maneuver_duration,
+        current_main_engine_mcr, current_conv_aux_dg_mcr_kw, current_aux_power_demand_kw, sfoc_curves.subset(REFERENCE_SFOC_KEYS)
+    )
+    if not table.empty:
+        table["Geleneksel Sisteme Göre Fark (ton)"] = sum(mode_reference["total_fuel_t"] for mode_reference in reference.values()) - table["Sefer Yakıtı (ton)"]
+    info = {"catalog_size": len(_catalog), "main_models": len(main_indices), "port_models": len(port_indices),
+            "candidate_fleets": len(fleets), "peak_de_power_kw": peak}
+    return table.round(2), info
+
+# --- Sayfa bölümleri: st.fragment ile, bölüm içindeki widget etkileşimi sadece o bölümü yeniden çalıştırır ---
+@st.fragment
+@telemetry.timed_section("Yakıt Analizi / Sonuçlar")
+def _render_fuel_results_section():
+    # Özet tablo ve karşılaştırma grafikleri (kombinasyon / mod seçimleri)
+    laps = telemetry.Laps("Sonuçlar")
+    fa_results_df, fa_detailed_df, fa_usage_df = get_result_store().get(st.session_state.fa_results_key)
+    laps.lap("sonuç deposu")
+    telemetry.record_frames("Yakıt Analizi sonuçları", fa_results_df, fa_detailed_df, fa_usage_df)
+    if st.session_state.fa_show_fuel_results and not fa_results_df.empty:
         st.subheader("Özet Sonuçlar")
-        st.dataframe(st.session_state.fa_results_df, use_container_width=True)
+        st.dataframe(fa_results_df, use_container_width=True)
 
         st.markdown("---")
         st.subheader("Detaylı Grafiksel Analiz")
 
         # Karşılaştırma için uygun jeneratör kombinasyonlarını bul
         available_gen_combos_fa = []
-        if not st.session_state.fa_detailed_df.empty:
+        if not fa_detailed_df.empty:
             available_gen_combos_fa = [
-                combo for combo in st.session_state.fa_detailed_df["Combo"].unique()
+                combo for combo in fa_detailed_df["Combo"].unique()
                 if combo != "Ana Makine Referans"
             ]
 
@@ -234,40 +311,52 @@ def render_page():
             )
 
             # Karşılaştırma grafiği için veri filtreleme
-            plot_data_gen_selected_fa = st.session_state.fa_detailed_df[
-                (st.session_state.fa_detailed_df["Combo"] == selected_gen_combo_fa) &
-                (st.session_state.fa_detailed_df["System Type"] == "Jeneratör") &
-                (st.session_state.fa_detailed_df["Mode"] == plot_mode_fa) &
-                (st.session_state.fa_detailed_df["Fuel (ton)"].notna()) &
-                (st.session_state.fa_detailed_df["Fuel (ton)"] > 0) # Sadece pozitif yakıt değerleri
+            plot_data_gen_selected_fa = fa_detailed_df[
+                (fa_detailed_df["Combo"] == selected_gen_combo_fa) &
+                (fa_detailed_df["System Type"] == "Jeneratör") &
+                (fa_detailed_df["Mode"] == plot_mode_fa) &
+                (fa_detailed_df["Fuel (ton)"].notna()) &
+                (fa_detailed_df["Fuel (ton)"] > 0) # Sadece pozitif yakıt değerleri
             ]
-            plot_data_me_ref_fa = st.session_state.fa_detailed_df[
-                (st.session_state.fa_detailed_df["System Type"] == "Ana Makine") &
-                (st.session_state.fa_detailed_df["Mode"] == plot_mode_fa) &
-                (st.session_state.fa_detailed_df["Fuel (ton)"].notna()) &
-                (st.session_state.fa_detailed_df["Fuel (ton)"] > 0)
+            plot_data_me_ref_fa = fa_detailed_df[
+                (fa_detailed_df["System Type"] == "Ana Makine") &
+                (fa_detailed_df["Mode"] == plot_mode_fa) &
+                (fa_detailed_df["Fuel (ton)"].notna()) &
+                (fa_detailed_df["Fuel (ton)"] > 0)
             ]
             combined_fuel_plot_data_fa = pd.concat([plot_data_gen_selected_fa, plot_data_me_ref_fa]).reset_index(drop=True)
+            laps.lap("filtreleme")
 
             if not combined_fuel_plot_data_fa.empty:
-                fig_fuel_comparison_fa = px.bar(
+                combined_fuel_plot_data_fa = drilldown_frame(
+                    combined_fuel_plot_data_fa, "Shaft Power (kW)", "Fuel (ton)", "System Type",
+                    key="fa_fuel_plot_range", label="Yakıt Grafiği Şaft Gücü Aralığı (kW)"
+                )
+                fig_fuel_comparison_fa = sweep_figure(
                     combined_fuel_plot_data_fa,
                     x="Shaft Power (kW)", y="Fuel (ton)", color="System Type",
                     barmode="group",
                     title=f"{selected_gen_combo_fa} vs Ana Makine Referans ({plot_mode_fa} Modu)",
                     labels={"Fuel (ton)": "Yakıt (ton)", "Shaft Power (kW)": "Şaft Gücü (kW)", "System Type": "Sistem Tipi"}
                 )
+                laps.lap("grafik oluşturma")
                 st.plotly_chart(fig_fuel_comparison_fa, use_container_width=True)
+                laps.lap("grafik gösterimi")
             else:
                 st.warning(f"{plot_mode_fa} modu için {selected_gen_combo_fa} veya Ana Makine Referansına ait gösterilecek karşılaştırmalı yakıt verisi bulunamadı.")
 
             # Jeneratör Kullanım Grafiği (Sadece seçilen jeneratör kombinasyonu için)
-            gen_usage_plot_data_fa = st.session_state.fa_usage_df[
-                (st.session_state.fa_usage_df["Combo"] == selected_gen_combo_fa) &
-                (st.session_state.fa_usage_df["Mode"] == plot_mode_fa)
+            gen_usage_plot_data_fa = fa_usage_df[
+                (fa_usage_df["Combo"] == selected_gen_combo_fa) &
+                (fa_usage_df["Mode"] == plot_mode_fa)
             ]
+            laps.lap("filtreleme")
             if not gen_usage_plot_data_fa.empty:
-                fig_usage_fa = px.bar(
+                gen_usage_plot_data_fa = drilldown_frame(
+                    gen_usage_plot_data_fa, "DE Power (kW)", "Generators Used",
+                    key="fa_usage_plot_range", label="Kullanım Grafiği DE Gücü Aralığı (kW)"
+                )
+                fig_usage_fa = sweep_figure(
                     gen_usage_plot_data_fa,
                     x="DE Power (kW)", y="Generators Used",
                     hover_data=["Load Per Generator (%)"],
@@ -277,17 +366,19 @@ def render_page():
                 )
                 fig_usage_fa.update_traces(
                     text=gen_usage_plot_data_fa["Load Per Generator (%)"].apply(lambda x: f'{x:.2f}%'),
-                    textposition='outside'
+                    textposition='outside', selector=dict(type="bar")
                 )
+                laps.lap("grafik oluşturma")
                 st.plotly_chart(fig_usage_fa, use_container_width=True)
+                laps.lap("grafik gösterimi")
 
-        elif not st.session_state.fa_detailed_df.empty: # Detaylı veri var ama jeneratör kombosu yok (sadece ana makine olabilir)
+        elif not fa_detailed_df.empty: # Detaylı veri var ama jeneratör kombosu yok (sadece ana makine olabilir)
             st.info("Hesaplama sonucunda jeneratör kombinasyonu bulunamadı, sadece Ana Makine Referans verileri mevcut olabilir.")
             # İsteğe bağlı: Sadece ana makine verilerini gösteren bir grafik eklenebilir.
-            plot_data_me_ref_only_fa = st.session_state.fa_detailed_df[
-                (st.session_state.fa_detailed_df["System Type"] == "Ana Makine") &
-                (st.session_state.fa_detailed_df["Fuel (ton)"].notna()) &
-                (st.session_state.fa_detailed_df["Fuel (ton)"] > 0)
+            plot_data_me_ref_only_fa = fa_detailed_df[
+                (fa_detailed_df["System Type"] == "Ana Makine") &
+                (fa_detailed_df["Fuel (ton)"].notna()) &
+                (fa_detailed_df["Fuel (ton)"] > 0)
             ]
             if not plot_data_me_ref_only_fa.empty:
                 plot_mode_me_only_fa = st.radio(
@@ -304,17 +395,67 @@ def render_page():
                     )
                     st.plotly_chart(fig_fuel_me_only_fa, use_container_width=True)
 
-    elif st.session_state.fa_show_fuel_results and st.session_state.fa_results_df.empty:
+    elif st.session_state.fa_show_fuel_results and fa_results_df.empty:
         # Bu kontrol, HESAPLA butonuna basıldıktan sonra boş DataFrame'ler döndüğünde çalışır.
         st.warning("Girilen parametrelerle 'Yakıt Analizi' için hesaplanacak uygun bir senaryo bulunamadı.")
 
+def _render_sizing_section():
+    # Optimum boyutlandırma sonucu: en iyi filo ve adet kombinasyonu başına optimumlar
+    sizing_table, = get_result_store().get(st.session_state.fa_sizing_key, count=1)
+    sizing_info = st.session_state.fa_sizing_info
+    if sizing_table.empty:
+        if sizing_info is not None:
+            st.warning("Verilen MCR ve adet aralıklarında tüm sefer talebini karşılayabilen bir jeneratör filosu bulunamadı.")
+        return
+    st.subheader("Optimum Jeneratör Boyutlandırma")
+    best = sizing_table.iloc[0]
+    best_label = f"{int(best['Ana Jen. Adedi'])}x{int(best['Ana Jen. MCR (kW)'])}kW Ana"
+    if best["Liman Jen. Adedi"] > 0: best_label += f" + {int(best['Liman Jen. Adedi'])}x{int(best['Liman Jen. MCR (kW)'])}kW Liman"
+    col1, col2, col3 = st.columns(3)
+    col1.metric("En İyi Filo", best_label)
+    col2.metric("Sefer Yakıtı (ton)", f"{best['Sefer Yakıtı (ton)']:.2f}")
+    col3.metric("Geleneksel Sisteme Göre Fark (ton)", f"{best['Geleneksel Sisteme Göre Fark (ton)']:.2f}")
+    st.dataframe(sizing_table, use_container_width=True)
+    st.caption(
+        f"{sizing_info['evaluations']} filo değerlendirildi (tam ızgara taraması: {sizing_info['brute_force_evaluations']}); "
+        f"en yüksek talebi karşılayamayan {sizing_info['pruned_quantity_combinations']} adet kombinasyonu budandı. "
+        f"En yüksek DE gücü: {sizing_info['peak_de_power_kw']:.0f} kW."
+    )
+    st.markdown("---")
+
+def _render_catalog_section():
+    # Katalog modu sonucu: en düşük sefer yakıtlı aday filo ve tüm adaylar
+    catalog_info = st.session_state.fa_catalog_info
+    if catalog_info is None: return
+    catalog_table, = get_result_store().get(st.session_state.fa_catalog_key, count=1)
+    st.subheader("Katalogdan Aday Filolar")
+    st.caption(
+        f"Katalogdaki {catalog_info['catalog_size']} modelden {catalog_info['main_models']} ana / {catalog_info['port_models']} liman modeli "
+        f"sorguya uydu; {catalog_info['candidate_fleets']} aday filo değerlendirildi. En yüksek DE gücü: {catalog_info['peak_de_power_kw']:.0f} kW."
+    )
+    if catalog_table.empty:
+        st.warning("Sorguya uyan modellerle tüm sefer talebini karşılayabilen bir aday filo bulunamadı.")
+        return
+    best = catalog_table.iloc[0]
+    best_label = f"{int(best['Ana Jen. Adedi'])}x {best['Ana Jen. Modeli']}"
+    if best["Liman Jen. Adedi"] > 0: best_label += f" + {int(best['Liman Jen. Adedi'])}x {best['Liman Jen. Modeli']}"
+    col1, col2, col3 = st.columns(3)
+    col1.metric("En İyi Aday", best_label)
+    col2.metric("Sefer Yakıtı (ton)", f"{best['Sefer Yakıtı (ton)']:.2f}")
+    col3.metric("Geleneksel Sisteme Göre Fark (ton)", f"{best['Geleneksel Sisteme Göre Fark (ton)']:.2f}")
+    st.dataframe(catalog_table, use_container_width=True)
+    st.markdown("---")
+
+@st.fragment
+@telemetry.timed_section("Yakıt Analizi / SFOC Eğrisi")
+def _render_sfoc_curve_section():
     # --- SFOC - Yük Eğrisi Grafiği (Kullanıcı Seçimli) ---
     st.markdown("---")
     st.subheader("Özgül Yakıt Tüketimi (SFOC) - Yük Eğrisi")
 
     # Kullanıcının makine tipi seçmesi için bir selectbox oluştur
-    # ALL_SFOC_CURVES sözlüğünü config.py'den import ettiğinizden emin olun.
-    # (Bu importun dosyanın başında yapıldığını varsayıyorum)
+    # Eğriler SFOC kütüphanesinden (sfoc_library) güncel halleriyle gelir.
+    sfoc_curves = current_sfoc_curves()
 
     sfoc_option_labels = {
         "main_engine": "Ana Makine (Geleneksel)",
@@ -322,8 +463,8 @@ def render_page():
         "port_gen": "Liman Jeneratörü (DE)",
         "aux_dg": "Yardımcı Dizel Jeneratör (Geleneksel)"
     }
-    # ALL_SFOC_CURVES anahtarlarının sfoc_option_labels'da olduğundan emin olalım
-    display_options = [sfoc_option_labels.get(key, key.replace("_", " ").title()) for key in ALL_SFOC_CURVES.keys()]
+    # Kütüphane anahtarlarının sfoc_option_labels'da olduğundan emin olalım
+    display_options = [sfoc_option_labels.get(key, key.replace("_", " ").title()) for key in sfoc_curves.keys()]
     
     # Seçilen etiketi tekrar anahtara çevirmek için ters bir eşleme
     # Bu eşlemenin sadece sfoc_option_labels'da tanımlı anahtarlar için doğru çalışacağına dikkat edin.
@@ -340,8 +481,10 @@ def render_page():
     selected_sfoc_key = key_map.get(selected_sfoc_label, selected_sfoc_label.lower().replace(" ", "_"))
 
 
-    if selected_sfoc_key and selected_sfoc_key in ALL_SFOC_CURVES:
-        sfoc_data_to_plot = ALL_SFOC_CURVES[selected_sfoc_key]
+    if selected_sfoc_key and selected_sfoc_key in sfoc_curves:
+        sfoc_data_to_plot = sfoc_curves[selected_sfoc_key]
+        curve_source = get_sfoc_library().sources().get(selected_sfoc_key, {})
+        st.caption(f"Kaynak: {curve_source.get('source')} (sürüm {curve_source.get('version')})")
 
         if sfoc_data_to_plot and isinstance(sfoc_data_to_plot, dict) and len(sfoc_data_to_plot) >= 2:
             loads_original = list(sfoc_data_to_plot.keys())
@@ -356,9 +499,9 @@ def render_page():
             plot_min_load, plot_max_load = 0, 110 
             interpolated_loads = np.linspace(plot_min_load, plot_max_load, 200)
             
-            interpolated_sfocs = [interpolate_sfoc_non_linear(load, sfoc_data_to_plot) for load in interpolated_loads]
+            interpolated_sfocs = sfoc_data_to_plot(interpolated_loads) # 200 nokta tek vektörel çağrıda (derlenmiş eğri)
 
-            valid_interpolated_data = [(load, sfoc) for load, sfoc in zip(interpolated_loads, interpolated_sfocs) if sfoc is not None and sfoc >= 50]
+            valid_interpolated_data = [(load, sfoc) for load, sfoc in zip(interpolated_loads, interpolated_sfocs) if np.isfinite(sfoc) and sfoc >= 50]
             
             if valid_interpolated_data:
                 interpolated_loads_valid, interpolated_sfocs_valid = zip(*valid_interpolated_data)
@@ -383,21 +526,27 @@ def render_page():
     else:
         st.error(f"'{selected_sfoc_label}' için SFOC anahtarı bulunamadı veya geçersiz.")
 
+@st.fragment
+@telemetry.timed_section("Yakıt Analizi / Güç Akışı")
+def _render_power_flow_section(loss_range_start, loss_range_end, rated_shaft_power_kw=None):
+    # Güç akışı diyagramı ve kayıp dağılımı; kayıp aralığı sidebar'daki seyir/manevra aralıklarından gelir.
+    # rated_shaft_power_kw verilirse (yüke bağlı verim) slider verimleri anma verimidir.
     # --- Güç Akışı ve Kayıplar Diyagramı ---
     st.markdown("---")
     st.subheader("Dizel Elektrik Güç Akışı ve Kayıpları Diyagramı")
-    st.sidebar.header("Güç Akışı Diyagramı Ayarları") # Ayrı başlık altında
+    # Diyagram ayarları bölümün içinde (fragment dışına, örn. sidebar'a yazılamaz); değişiklikleri sadece bu bölümü çalıştırır.
     if "fa_diagram_shaft_power" not in st.session_state: st.session_state.fa_diagram_shaft_power = 3000 # Default
 
-    diagram_shaft_power_input = st.sidebar.number_input(
+    diagram_shaft_power_input = st.number_input(
         "Diyagram için Şaft Gücü (kW)", min_value=100,
         value=int(st.session_state.fa_diagram_shaft_power), step=50, key="fa_diag_shaft_power_widget"
     )
-    st.sidebar.subheader("Sistem Verimlilikleri (%) (Diyagram İçin)")
-    motor_eff_diag_perc = st.sidebar.slider("Diyagram - Elektrik Motoru Verimliliği (%)", 90.0, 99.9, 97.0, step=0.1, key="fa_diag_motor_eff")
-    converter_eff_diag_perc = st.sidebar.slider("Diyagram - Frekans Konvertörü Verimliliği (%)", 90.0, 99.9, 98.5, step=0.1, key="fa_diag_converter_eff")
-    switchboard_eff_diag_perc = st.sidebar.slider("Diyagram - Main Switchboard Verimliliği (%)", 90.0, 99.9, 99.8, step=0.1, key="fa_diag_switchboard_eff")
-    generator_alt_eff_diag_perc = st.sidebar.slider("Diyagram - Alternatör Elektriksel Verimliliği (%)", 90.0, 99.9, 97.0, step=0.1, key="fa_diag_gen_alt_eff")
+    st.caption("Sistem Verimlilikleri (%) (Diyagram İçin)" + (" — anma verimleri; kısmi yükte tablodan düşürülür" if rated_shaft_power_kw else ""))
+    diag_col1, diag_col2, diag_col3, diag_col4 = st.columns(4)
+    motor_eff_diag_perc = diag_col1.slider("Diyagram - Elektrik Motoru Verimliliği (%)", 90.0, 99.9, 97.0, step=0.1, key="fa_diag_motor_eff")
+    converter_eff_diag_perc = diag_col2.slider("Diyagram - Frekans Konvertörü Verimliliği (%)", 90.0, 99.9, 98.5, step=0.1, key="fa_diag_converter_eff")
+    switchboard_eff_diag_perc = diag_col3.slider("Diyagram - Main Switchboard Verimliliği (%)", 90.0, 99.9, 99.8, step=0.1, key="fa_diag_switchboard_eff")
+    generator_alt_eff_diag_perc = diag_col4.slider("Diyagram - Alternatör Elektriksel Verimliliği (%)", 90.0, 99.9, 97.0, step=0.1, key="fa_diag_gen_alt_eff")
 
     # Hesaplama için verimlilikleri 0-1 aralığına çevir
     motor_eff_d = motor_eff_diag_perc / 100.0
@@ -405,85 +554,16 @@ def render_page():
     switchboard_eff_d = switchboard_eff_diag_perc / 100.0 # Pano geçiş verimliliği
     generator_alt_eff_d = generator_alt_eff_diag_perc / 100.0 # Alternatörün kendi verimliliği
 
-    power_vals, loss_vals = calculate_power_flow(
-        diagram_shaft_power_input, motor_eff_d, converter_eff_d, switchboard_eff_d, generator_alt_eff_d
+    laps = telemetry.Laps("Güç Akışı")
+    dot_source, power_vals, loss_vals = build_power_flow_dot_source(
+        diagram_shaft_power_input, motor_eff_d, converter_eff_d, switchboard_eff_d, generator_alt_eff_d, rated_shaft_power_kw
     )
+    laps.lap("DOT kaynağı", cache="build_power_flow_dot_source")
 
-    if power_vals and loss_vals: # Bu satırla başlayan blok
-        dot = graphviz.Digraph('power_flow_diagram', comment='Güç Akışı ve Kayıplar (İyileştirilmiş Stil)')
-        dot.attr(rankdir='LR')
-        dot.attr('node', shape='plaintext', fontsize='14', fontname='Arial') # shape='plaintext' HTML etiketleri için
-        dot.attr('edge', fontsize='12', fontname='Arial')
-
-        # format_loss_perc_diag fonksiyonunun bu if bloğundan önce tanımlandığından emin olun,
-        # veya bu blok içine taşıyın eğer sadece burada kullanılıyorsa.
-        # Önceki cevabımda bu fonksiyonun tanımı Graphviz bloğunun dışındaydı, o daha iyi.
-        # Eğer format_loss_perc_diag zaten yukarıda tanımlıysa, tekrar tanımlamanıza gerek yok.
-        # Sadece emin olmak için:
-        def format_loss_perc_diag(percent_val):
-             return f'({percent_val:.1f}%)' if not np.isnan(percent_val) else '(N/A)'
-
-
-        with dot.subgraph(name='cluster_electrical') as c:
-            c.attr(style='rounded', color='#EEEEEE', label='Elektriksel Sistem') # Gri arka planlı küme
-
-            # Alternatör Düğümü
-            c.node('alternator_in', label=f"""<
-<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#E0F2F7'>
-    <TR><TD COLSPAN='2' ALIGN='CENTER'><B>Alternatörler</B></TD></TR>
-    <TR><TD ALIGN='LEFT'>Mekanik Giriş:</TD><TD ALIGN='RIGHT'>{power_vals['alternator_mech_input']:.0f} kW</TD></TR>
-    <TR><TD ALIGN='LEFT'>Elektrik Çıkış:</TD><TD ALIGN='RIGHT'>{power_vals['alternator_elec_output']:.0f} kW</TD></TR>
-    <TR><TD ALIGN='LEFT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>Kayıp:</FONT></TD><TD ALIGN='RIGHT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>{loss_vals['alternator']:.0f} kW ({format_loss_perc_diag((1-generator_alt_eff_d)*100)})</FONT></TD></TR>
-</TABLE>>""", tooltip="Alternatörler ve verimliliği")
-
-            # Ana Pano Düğümü
-            c.node('switchboard', label=f"""<
-<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#F0F4C3'>
-    <TR><TD ALIGN='CENTER'><B>Ana Pano</B></TD></TR>
-    <TR><TD ALIGN='LEFT'>Giriş:</TD><TD ALIGN='RIGHT'>{power_vals['switchboard_input_from_gens']:.0f} kW</TD></TR>
-    <TR><TD ALIGN='LEFT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>Kayıp:</FONT></TD><TD ALIGN='RIGHT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>{loss_vals['switchboard']:.0f} kW ({format_loss_perc_diag((1-switchboard_eff_d)*100)})</FONT></TD></TR>
-</TABLE>>""", tooltip="Ana Pano ve kayıpları")
-
-            # Frekans Konvertörü Düğümü
-            c.node('converter', label=f"""<
-<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#FCE4EC'>
-    <TR><TD ALIGN='CENTER'><B>Frekans Konvertörü</B></TD></TR>
-    <TR><TD ALIGN='LEFT'>Giriş:</TD><TD ALIGN='RIGHT'>{power_vals['converter_input']:.0f} kW</TD></TR>
-    <TR><TD ALIGN='LEFT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>Kayıp:</FONT></TD><TD ALIGN='RIGHT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>{loss_vals['converter']:.0f} kW ({format_loss_perc_diag((1-converter_eff_d)*100)})</FONT></TD></TR>
-</TABLE>>""", tooltip="Frekans Konvertörü ve kayıpları")
-
-        # Elektrik Motoru Düğümü (Küme dışında olabilir veya içinde)
-        dot.node('motor_out', label=f"""<
-<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#D4EDDA'>
-    <TR><TD ALIGN='CENTER'><B>Elektrik Motoru</B></TD></TR>
-    <TR><TD ALIGN='LEFT'>Giriş:</TD><TD ALIGN='RIGHT'>{power_vals['motor_input']:.0f} kW</TD></TR>
-    <TR><TD ALIGN='LEFT'>Çıkış (Şafta):</TD><TD ALIGN='RIGHT'>{power_vals['shaft']:.0f} kW</TD></TR>
-    <TR><TD ALIGN='LEFT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>Kayıp:</FONT></TD><TD ALIGN='RIGHT' BGCOLOR='#FFEBEE'><FONT COLOR='#B71C1C'>{loss_vals['motor']:.0f} kW ({format_loss_perc_diag((1-motor_eff_d)*100)})</FONT></TD></TR>
-</TABLE>>""", tooltip="Elektrik Motoru ve kayıpları")
-        
-        # Ana Tahrik Elemanı (Sanal Düğüm) - Daha yukarıda, akışın başında olabilir
-        dot.node('prime_mover', label=f"""<
-<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#FFF9C4'>
-    <TR><TD ALIGN='CENTER'><B>Ana Tahrik Elemanı</B><BR/>(Dizel Motorlar)</TD></TR>
-</TABLE>>""", tooltip="Yakıtın enerjiye dönüştüğü yer")
-
-        # Şaft Gücü Düğümü
-        dot.node('shaft_node', label=f"""<
-<TABLE BORDER='0' CELLBORDER='1' CELLSPACING='0' CELLPADDING='5' BGCOLOR='#E1BEE7'>
-    <TR><TD ALIGN='CENTER'><B>Şaft Gücü (Pervane)</B></TD></TR>
-    <TR><TD ALIGN='CENTER'>{power_vals['shaft']:.0f} kW</TD></TR>
-</TABLE>>""", tooltip="Pervaneye iletilen net güç")
-
-
-        # Kenarlar (Güç Akışı) - Renkler ve oklar
-        dot.edge('prime_mover', 'alternator_in', label=f"Mekanik Güç\n{power_vals['alternator_mech_input']:.0f} kW", penwidth="2", color="#4A148C", style="dashed", arrowhead="normal", fontcolor="#4A148C")
-        dot.edge('alternator_in', 'switchboard', label=f"{power_vals['alternator_elec_output']:.0f} kW", penwidth="2.5", color="#1B5E20", arrowhead="vee", fontcolor="#1B5E20")
-        dot.edge('switchboard', 'converter', label=f"{power_vals['converter_input']:.0f} kW", penwidth="2.5", color="#E65100", arrowhead="vee", fontcolor="#E65100")
-        dot.edge('converter', 'motor_out', label=f"{power_vals['motor_input']:.0f} kW", penwidth="2.5", color="#AD1457", arrowhead="vee", fontcolor="#AD1457")
-        dot.edge('motor_out', 'shaft_node', label=f"{power_vals['shaft']:.0f} kW", penwidth="2.5", color="#0D47A1", arrowhead="vee", fontcolor="#0D47A1")
-
+    if dot_source: # Bu satırla başlayan blok
         st.markdown("### Güç Akışı ve Kayıplar")
-        st.graphviz_chart(dot, use_container_width=True) # use_container_width=True daha iyi olabilir
+        st.graphviz_chart(dot_source, use_container_width=True) # use_container_width=True daha iyi olabilir
+        laps.lap("graphviz")
     # ^^^ BİR ÖNCEKİ CEVAPTAKİ İYİLEŞTİRİLMİŞ KOD BURADA BİTER ^^^
 
     # Bu satırlar (st.info ve sonrası) yeni Graphviz bloğundan sonra gelmeli:
@@ -494,4 +574,126 @@ def render_page():
     elif diagram_shaft_power_input > 0:
         st.warning("Güç Akışı diyagramı hesaplanamadı. Lütfen Diyagram için Şaft Gücü'nün pozitif ve tüm sistem verimliliklerinin %0'dan büyük olduğundan emin olun.")
     else:
-        st.info("Güç Akışı diyagramını görmek için lütfen sidebar'dan 'Diyagram için Şaft Gücü' değeri girin ve verimlilikleri ayarlayın.")
\ No newline at end of file
+        st.info("Güç Akışı diyagramını görmek için lütfen yukarıdan 'Diyagram için Şaft Gücü' değeri girin ve verimlilikleri ayarlayın.")
+    # --- Şaft Gücü Aralığı Boyunca Kayıp Dağılımı (Vektörel, Tek Geçiş) ---
+    loss_range_shaft_powers = np.arange(loss_range_start, loss_range_end + 100, 100)
+    _, loss_range_vals = calculate_power_flow(loss_range_shaft_powers, motor_eff_d, converter_eff_d, switchboard_eff_d, generator_alt_eff_d,
+                                             electrical_efficiency_table(), rated_shaft_power_kw)
+    loss_range_df = pd.DataFrame({
+        "Shaft Power (kW)": loss_range_shaft_powers,
+        "Motor": loss_range_vals["motor"], "Frekans Konvertörü": loss_range_vals["converter"],
+        "Ana Pano": loss_range_vals["switchboard"], "Alternatör": loss_range_vals["alternator"]
+    }).melt(id_vars="Shaft Power (kW)", var_name="Component", value_name="Loss (kW)").dropna()
+    laps.lap("kayıp tablosu")
+    if not loss_range_df.empty:
+        fig_loss_range = px.area(
+            loss_range_df, x="Shaft Power (kW)", y="Loss (kW)", color="Component",
+            title=f"Kayıp Dağılımı ({loss_range_start}-{loss_range_end} kW Şaft Gücü Aralığı)",
+            labels={"Shaft Power (kW)": "Şaft Gücü (kW)", "Loss (kW)": "Kayıp (kW)", "Component": "Bileşen"}
+        )
+        laps.lap("grafik oluşturma")
+        st.plotly_chart(fig_loss_range, use_container_width=True)
+        laps.lap("grafik gösterimi")
+
+def render_page():
+    """ "Yakıt Analizi" sayfasının içeriğini ve mantığını render eder. """
+    st.sidebar.header("Yakıt Analizi Girdi Ayarları")
+    sfoc_curves = current_sfoc_curves()
+    # Widget'lar için benzersiz key'ler (önemli!)
+    gen_power_range_input = st.sidebar.slider("Jeneratör Birim Güç Aralığı (kW)", 1800, 3600, FUEL_ANALYSIS_DEFAULTS["gen_power_range"], step=100, key="fa_gen_power_range")
+    gen_qty_range_input = st.sidebar.slider("Kurulu Jeneratör Adedi Aralığı", 1, 8, FUEL_ANALYSIS_DEFAULTS["gen_qty_range"], step=1, key="fa_gen_qty_range")
+    sea_power_range_input = st.sidebar.slider("Seyir Şaft Güç Aralığı (kW)", 2500, 5500, FUEL_ANALYSIS_DEFAULTS["sea_power_range"], step=100, key="fa_sea_power_range")
+    maneuver_power_range_input = st.sidebar.slider("Manevra Şaft Güç Aralığı (kW)", 1500, 3500, FUEL_ANALYSIS_DEFAULTS["maneuver_power_range"], step=100, key="fa_maneuver_power_range")
+    sea_duration_input = st.sidebar.number_input("Seyir Süresi (saat)", min_value=1.0, value=FUEL_ANALYSIS_DEFAULTS["sea_duration"], step=1.0, key="fa_sea_duration")
+    maneuver_duration_input = st.sidebar.number_input("Manevra Süresi (saat)", min_value=1.0, value=FUEL_ANALYSIS_DEFAULTS["maneuver_duration"], step=1.0, key="fa_maneuver_duration")
+    main_engine_mcr_input = st.sidebar.number_input("Ana Makine MCR (kW)", min_value=1000, value=FUEL_ANALYSIS_DEFAULTS["main_engine_mcr"], step=100, key="fa_main_engine_mcr")
+    conv_aux_dg_mcr_input = st.sidebar.number_input( "Yardımcı DG MCR Değeri (kW) (Geleneksel Manevra İçin)", min_value=100, value=FUEL_ANALYSIS_DEFAULTS["conv_aux_dg_mcr"], step=50, key="fa_conv_aux_dg_mcr" )
+    aux_power_demand_input = st.sidebar.number_input("Yardımcı Güç İhtiyacı (kW)", min_value=0, value=FUEL_ANALYSIS_DEFAULTS["aux_power_kw"], step=50, key="fa_aux_power")
+    load_dependent_eff_input = st.sidebar.checkbox(
+        "Yüke Bağlı Elektriksel Verim", value=FUEL_ANALYSIS_DEFAULTS["load_dependent_eff"], key="fa_load_dependent_eff",
+        help="Motor, konvertör, pano ve alternatör verimleri kısmi yükte düşer (anma gücü: Ana Makine MCR)."
+    )
+
+    # --- Session State Başlatma (Sadece bu sayfa için) ---
+    # Sonuç tabloları oturumlar arası paylaşılan depoda; session_state sadece içerik anahtarını tutar.
+    if "fa_results_key" not in st.session_state: st.session_state.fa_results_key = None
+    result_store = get_result_store()
+    if "fa_show_fuel_results" not in st.session_state: st.session_state.fa_show_fuel_results = False
+
+    # Hesaplama modu: birim güç taraması (her 100 kW birim güç ayrı ayrı) veya optimum boyutlandırma (arama)
+    calculation_mode = st.sidebar.radio("Hesaplama Modu", ["Birim Güç Taraması", "Optimum Boyutlandırma", "Katalogdan Aday Filo"], key="fa_calculation_mode")
+    if "fa_sizing_key" not in st.session_state: st.session_state.fa_sizing_key = None
+    if "fa_sizing_info" not in st.session_state: st.session_state.fa_sizing_info = None
+    if "fa_catalog_key" not in st.session_state: st.session_state.fa_catalog_key = None
+    if "fa_catalog_info" not in st.session_state: st.session_state.fa_catalog_info = None
+    if calculation_mode == "Optimum Boyutlandırma":
+        st.sidebar.caption("Ana jeneratör MCR'ı 'Jeneratör Birim Güç Aralığı' içinde aranır.")
+        port_mcr_range_input = st.sidebar.slider("Liman Jeneratörü MCR Aralığı (kW)", 0, 2000, (500, 1500), step=50, key="fa_port_mcr_range")
+        max_main_qty_input = st.sidebar.number_input("En Fazla Ana Jeneratör Adedi", min_value=1, max_value=8, value=4, step=1, key="fa_max_main_qty")
+        max_port_qty_input = st.sidebar.number_input("En Fazla Liman Jeneratörü Adedi", min_value=0, max_value=3, value=1, step=1, key="fa_max_port_qty")
+        if st.sidebar.button("OPTİMUM BOYUTU BUL", key="fa_optimize_button"):
+            with telemetry.stage("Optimum boyutlandırma", cache="optimize_sizing_for_fuel_analysis"), st.spinner("Optimum filo aranıyor (ilk aramada her aday filo için dispatch haritası kurulur)..."):
+                sizing_table, sizing_info = optimize_sizing_for_fuel_analysis(
+                    sea_power_range_input, maneuver_power_range_input, sea_duration_input, maneuver_duration_input,
+                    main_engine_mcr_input, aux_power_demand_input, conv_aux_dg_mcr_input,
+                    gen_power_range_input, port_mcr_range_input, max_main_qty_input, max_port_qty_input,
+                    sfoc_curves.subset(SIZING_SFOC_KEYS), load_dependent_eff_input
+                )
+            st.session_state.fa_sizing_key = result_store.put((sizing_table,))
+            st.session_state.fa_sizing_info = sizing_info
+    elif calculation_mode == "Katalogdan Aday Filo":
+        st.sidebar.caption("Ana jeneratör modelleri 'Jeneratör Birim Güç Aralığı' içinden seçilir.")
+        catalog_files = st.sidebar.file_uploader("Genset Kataloğu (JSON / CSV)", type=["json", "csv"], accept_multiple_files=True, key="fa_catalog_files")
+        catalog_port_mcr_range_input = st.sidebar.slider("Liman Jeneratörü MCR Aralığı (kW)", 0, 2000, (500, 1500), step=50, key="fa_catalog_port_mcr_range")
+        catalog_max_sfoc_input = st.sidebar.number_input("En Fazla SFOC @%75 (g/kWh, 0: filtre yok)", min_value=0.0, value=0.0, step=1.0, key="fa_catalog_max_sfoc")
+        catalog_max_main_qty_input = st.sidebar.number_input("En Fazla Ana Jeneratör Adedi", min_value=1, max_value=8, value=4, step=1, key="fa_catalog_max_main_qty")
+        catalog_max_port_qty_input = st.sidebar.number_input("En Fazla Liman Jeneratörü Adedi", min_value=0, max_value=3, value=1, step=1, key="fa_catalog_max_port_qty")
+        catalog_sources = catalog_sources_from_dir() + tuple((f.name, f.getvalue()) for f in catalog_files or [])
+        if st.sidebar.button("ADAY FİLOLARI DEĞERLENDİR", key="fa_catalog_button"):
+            if not catalog_sources:
+                st.sidebar.warning("Katalog dosyası yüklenmedi (veya GENSET_CATALOG_DIR ayarlı değil).")
+            else:
+                try:
+                    with telemetry.stage("Katalog yükleme"):
+                        catalog = build_genset_catalog(catalog_sources)
+                    with telemetry.stage("Katalog adayları", cache="evaluate_catalog_for_fuel_analysis"), st.spinner("Aday filolar değerlendiriliyor..."):
+                        catalog_table, catalog_info = evaluate_catalog_for_fuel_analysis(
+                            sea_power_range_input, maneuver_power_range_input, sea_duration_input, maneuver_duration_input,
+                            main_engine_mcr_input, aux_power_demand_input, conv_aux_dg_mcr_input,
+                            catalog.fingerprint(), catalog, gen_power_range_input, catalog_port_mcr_range_input,
+                            catalog_max_sfoc_input, catalog_max_main_qty_input, catalog_max_port_qty_input,
+                            sfoc_curves.subset(SIZING_SFOC_KEYS), load_dependent_eff_input
+                        )
+                    st.session_state.fa_catalog_key = result_store.put((catalog_table,))
+                    st.session_state.fa_catalog_info = catalog_info
+                except ValueError as e:
+                    st.sidebar.error(f"Katalog okunamadı: {e}")
+    elif st.sidebar.button("HESAPLA", key="fa_calculate_button"):
+        st.session_state.fa_show_fuel_results = True
+        with telemetry.stage("Hesaplama", cache="calculate_all_results_for_fuel_analysis"):
+            fa_frames = calculate_all_results_for_fuel_analysis(
+                gen_power_range_input, sea_power_range_input, maneuver_power_range_input,
+                sea_duration_input, maneuver_duration_input, main_engine_mcr_input,
+                aux_power_demand_input,
+                conv_aux_dg_mcr_input,
+                sfoc_curves.subset(FUEL_ANALYSIS_SFOC_KEYS),
+                gen_qty_range_input,
+                load_dependent_eff_input
+            )
+        with telemetry.stage("Sonuç deposu (kayıt)"):
+            st.session_state.fa_results_key = result_store.put(fa_frames)
+        fa_results_df, fa_detailed_df, fa_usage_df = result_store.get(st.session_state.fa_results_key)
+        if fa_results_df.empty and fa_detailed_df.empty:
+             st.warning("Hesaplama yapıldı ancak 'Yakıt Analizi' için gösterilecek sonuç bulunamadı. Girdilerinizi kontrol edin.")
+
+    st.header("Dizel Elektrik ve Geleneksel Sistem Yakıt Tüketim Analizi")
+
+    if calculation_mode == "Optimum Boyutlandırma": _render_sizing_section()
+    if calculation_mode == "Katalogdan Aday Filo": _render_catalog_section()
+    _render_fuel_results_section()
+    _render_sfoc_curve_section()
+    _render_power_flow_section(
+        min(sea_power_range_input[0], maneuver_power_range_input[0]),
+        max(sea_power_range_input[1], maneuver_power_range_input[1]),
+        main_engine_mcr_input if load_dependent_eff_input else None
+    )
@@ -0,0 +1,157 @@
+# generator_sizing.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    ALL_SFOC_CURVES,
+    SIZING_MCR_STEP_KW,
+    SIZING_BRACKET_POINTS
+)
+from dispatch_map import get_dispatch_map
+
+def mcr_value(mcr):
+    # Tam sayı MCR'lar int (etiketler ve önbellek anahtarları ızgarayla aynı kalır), kesirli katalog MCR'ları kırpılmadan float
+    mcr = float(mcr)
+    return int(mcr) if mcr.is_integer() else mcr
+
+class SizingEvaluator:
+    """
+    Sabit bir sefer talebi (DE gücü, süre) için filo -> toplam sefer yakıtı (ton) amaç fonksiyonu.
+    Her filonun yakıtı dispatch haritası (get_dispatch_map önbelleği) üzerinden tek vektörel sorguyla
+    hesaplanır ve filo anahtarıyla saklanır; aynı filo ikinci kez değerlendirilmez.
+    Talebin bir kısmını karşılayamayan filolar için sonuç sonsuzdur (uygun değil).
+    """
+    def __init__(self, de_power_kw, duration_h, sfoc_curves=ALL_SFOC_CURVES):
+        de_power_kw = np.asarray(de_power_kw, dtype=float)
+        duration_h = np.broadcast_to(np.asarray(duration_h, dtype=float), de_power_kw.shape)
+        demand = np.isfinite(de_power_kw) & (de_power_kw > 0) & (duration_h > 0)
+        self.de_power_kw, self.duration_h = de_power_kw[demand], duration_h[demand]
+        self.peak_power_kw = float(self.de_power_kw.max()) if len(self.de_power_kw) else 0.0
+        self.sfoc_curves = sfoc_curves
+        self._fuel = {}
+
+    @property
+    def evaluations(self):
+        return len(self._fuel)
+
+    def __call__(self, main_mcr, main_qty, port_mcr, port_qty):
+        if port_qty <= 0: port_mcr = 0 # Liman jeneratörü yoksa MCR'ı filoyu değiştirmez
+        fleet = (mcr_value(main_mcr), int(main_qty), mcr_value(port_mcr), int(port_qty))
+        if fleet not in self._fuel:
+            dispatch_map = get_dispatch_map(*fleet, self.sfoc_curves)
+            rate = dispatch_map.fuel_rate(self.de_power_kw)
+            self._fuel[fleet] = float(np.sum(rate * self.duration_h)) if not np.isnan(rate).any() else math.inf
+        return self._fuel[fleet]
+
+def _golden_section_min(objective, lo, hi):
+    # Tamsayı indeks aralığında [lo, hi] altın oran araması; (en iyi indeks, değer). Aralık 3'e inince hepsi denenir.
+    inv_phi = (math.sqrt(5) - 1) / 2
+    a, b = lo, hi
+    while b - a > 3:
+        c, d = b - round((b - a) * inv_phi), a + round((b - a) * inv_phi)
+        if c >= d: d = c + 1
+        if objective(c) <= objective(d): b = d
+        else: a = c
+    return min(((i, objective(i)) for i in range(a, b + 1)), key=lambda item: item[1])
+
+def _bracketed_min(objective, grid, bracket_points=SIZING_BRACKET_POINTS):
+    # Kaba tarama ile en iyi noktanın komşuları arasını bul (çok tepeli amaçlarda yanlış vadiye inmemek için),
+    # sonra o aralıkta altın oran araması yap. Döndürür: (en iyi grid değeri, amaç değeri)
+    if len(grid) == 0: return None, math.inf
+    last = len(grid) - 1
+    probes = np.unique(np.linspace(0, last, min(bracket_points, len(grid))).round().astype(int))
+    best_probe = min(probes, key=lambda i: objective(grid[i]))
+    position = int(np.searchsorted(probes, best_probe))
+    lo = int(probes[position - 1]) if position > 0 else 0
+    hi = int(probes[position + 1]) if position + 1 < len(probes) else last
+    best_index, best_value = _golden_section_min(lambda i: objective(grid[i]), lo, hi)
+    return grid[best_index], best_value
+
+def _mcr_grid(mcr_range, step_kw, min_mcr=0.0):
+    # Aralıktaki MCR adayları; kapasite alt sınırının (min_mcr) altında kalanlar budanır.
+    start = max(mcr_range[0], math.ceil(min_mcr / step_kw) * step_kw)
+    return [int(v) for v in range(int(start), int(mcr_range[1]) + 1, int(step_kw))]
+
+def optimize_generator_sizing(de_power_kw, duration_h, main_mcr_range, port_mcr_range, max_main_qty, max_port_qty,
+                              mcr_step_kw=SIZING_MCR_STEP_KW, sfoc_curves=ALL_SFOC_CURVES):
+    """
+    Toplam sefer yakıtını en aza indiren filoyu (ana MCR, ana adet, liman MCR, liman adet) arar.
+
+    Adetler tamsayı olduğundan sayılarak taranır; en yüksek talebi kurulu güçle karşılayamayan adet
+    kombinasyonları budanır ve kalanlarda MCR arama aralığı kapasite alt sınırından başlatılır. Her
+    adet kombinasyonu için sürekli MCR'lar (mcr_step_kw ızgarasında) kaba tarama + altın oran aramasıyla
+    bulunur; liman jeneratörü varsa dış arama liman MCR'ı, iç arama o liman MCR'ı için en iyi ana MCR'dır.
+    Döndürür: (en iyi filo sözlüğü | None, adet kombinasyonu başına optimum tablosu, bilgi sözlüğü)
+    """
+    evaluator = SizingEvaluator(de_power_kw, duration_h, sfoc_curves)
+    peak = evaluator.peak_power_kw
+    port_qty_options = range(0, max_port_qty + 1) if port_mcr_range[1] > 0 else [0]
+    rows, pruned = [], 0
+
+    for main_qty in range(1, max_main_qty + 1):
+        for port_qty in port_qty_options:
+            if main_qty * main_mcr_range[1] + port_qty * port_mcr_range[1] < peak:
+                pruned += 1
+                continue
+            best_main_for_port = {}
+            def fuel_for_port(port_mcr, main_qty=main_qty, port_qty=port_qty):
+                # İç arama: verilen liman MCR'ı için en iyi ana MCR (kapasite alt sınırından başlayan ızgarada)
+                main_grid = _mcr_grid(main_mcr_range, mcr_step_kw, (peak - port_qty * port_mcr) / main_qty)
+                best_main_for_port[port_mcr], fuel = _bracketed_min(lambda m: evaluator(m, main_qty, port_mcr, port_qty), main_grid)
+                return fuel
+            if port_qty > 0:
+                port_mcr, fuel = _bracketed_min(fuel_for_port, _mcr_grid(port_mcr_range, mcr_step_kw))
+            else:
+                port_mcr, fuel = 0, fuel_for_port(0)
+            main_mcr = best_main_for_port.get(port_mcr)
+            if main_mcr is None or not np.isfinite(fuel): continue
+            rows.append({
+                "Ana Jen. MCR (kW)": main_mcr, "Ana Jen. Adedi": main_qty,
+                "Liman Jen. MCR (kW)": port_mcr, "Liman Jen. Adedi": port_qty,
+                "Kurulu Güç (kW)": main_qty * main_mcr + port_qty * port_mcr,
+                "Sefer Yakıtı (ton)": fuel
+            })
+
+    table = pd.DataFrame(rows)
+    if not table.empty: table = table.sort_values("Sefer Yakıtı (ton)", ignore_index=True)
+    main_grid_size = len(_mcr_grid(main_mcr_range, mcr_step_kw))
+    port_grid_size = len(_mcr_grid(port_mcr_range, mcr_step_kw)) if port_mcr_range[1] > 0 else 0
+    info = {
+        "evaluations": evaluator.evaluations,
+        "brute_force_evaluations": max_main_qty * main_grid_size * (1 + max_port_qty * port_grid_size if port_grid_size else 1),
+        "pruned_quantity_combinations": pruned,
+        "peak_de_power_kw": peak
+    }
+    best = table.iloc[0].to_dict() if not table.empty else None
+    return best, table, info
+
+def evaluate_catalog_fleets(de_power_kw, duration_h, catalog, fleets, sfoc_curves=ALL_SFOC_CURVES):
+    """
+    Katalogdan seçilen aday filoların (GensetCatalog.candidate_fleets) toplam sefer yakıtı; her model kendi SFOC
+    eğrisiyle dispatch haritasına girer. Talebi karşılayamayan filolar tabloya alınmaz.
+    Döndürür: sefer yakıtına göre artan tablo
+    """
+    evaluators, rows = {}, []
+    for main_index, main_qty, port_index, port_qty in fleets:
+        pair = (main_index, port_index)
+        if pair not in evaluators:
+            curves = {**sfoc_curves, "main_de_gen": catalog.curve(main_index)}
+            if port_index is not None: curves["port_gen"] = catalog.curve(port_index)
+            evaluators[pair] = SizingEvaluator(de_power_kw, duration_h, curves)
+        main_mcr = catalog.mcr_kw[main_index]
+        port_mcr = catalog.mcr_kw[port_index] if port_index is not None else 0.0
+        fuel = evaluators[pair](main_mcr, main_qty, port_mcr, port_qty)
+        if not np.isfinite(fuel): continue
+        rows.append({
+            "Ana Jen. Modeli": catalog.label(main_index), "Ana Jen. MCR (kW)": main_mcr, "Ana Jen. Adedi": main_qty,
+            "Liman Jen. Modeli": catalog.label(port_index) if port_index is not None else "-",
+            "Liman Jen. MCR (kW)": port_mcr, "Liman Jen. Adedi": port_qty,
+            "Kurulu Güç (kW)": main_qty * main_mcr + port_qty * port_mcr,
+            "Toplam Ağırlık (t)": main_qty * catalog.weight_t[main_index] + (port_qty * catalog.weight_t[port_index] if port_index is not None else 0.0),
+            "Sefer Yakıtı (ton)": fuel
+        })
+    table = pd.DataFrame(rows)
+    if not table.empty: table = table.sort_values("Sefer Yakıtı (ton)", ignore_index=True)
+    return table
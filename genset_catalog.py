@@ -0,0 +1,159 @@
+# genset_catalog.py
+import csv
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import (
+    GENSET_CATALOG_DIR,
+    GENSET_CATALOG_SFOC_LOADS,
+    GENSET_CATALOG_MAX_OVERSIZE,
+    GENSET_CATALOG_MAX_FLEETS
+)
+from core_calculations import CompiledSfocCurve
+
+# Katalog dosyalarındaki alanlar; CSV'de SFOC tablosu "sfoc_<yük>" sütunlarıyla verilir (örn. sfoc_25, sfoc_75)
+CATALOG_FIELDS = ("manufacturer", "model", "mcr_kw", "weight_t", "footprint_m2")
+CSV_SFOC_PREFIX = "sfoc_"
+
+def _record(raw, source):
+    # Ham kaydı doğrular: {"manufacturer", "model", "mcr_kw", "sfoc": {yük: g/kWh}, "weight_t", "footprint_m2"}
+    try:
+        mcr_kw = float(raw["mcr_kw"])
+        sfoc = {float(load): float(value) for load, value in raw["sfoc"].items() if value not in (None, "")}
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"{source}: geçersiz katalog kaydı ({e}): {raw}") from e
+    if mcr_kw <= 0 or len(sfoc) < 2: raise ValueError(f"{source}: MCR pozitif ve en az iki SFOC noktası olmalı: {raw}")
+    optional = lambda key: float(raw[key]) if raw.get(key) not in (None, "") else np.nan
+    return {"manufacturer": str(raw.get("manufacturer", "")), "model": str(raw.get("model", "")), "mcr_kw": mcr_kw,
+            "sfoc": sfoc, "weight_t": optional("weight_t"), "footprint_m2": optional("footprint_m2")}
+
+def read_catalog_records(name, data):
+    """
+    Tek bir katalog dosyasının (bayt içeriği) kayıtları. JSON: {"gensets": [kayıt, ...]} veya kayıt listesi;
+    CSV: CATALOG_FIELDS sütunları + "sfoc_<yük>" sütunları (boş hücreler atlanır).
+    """
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    if name.lower().endswith(".json"):
+        content = json.loads(text)
+        raws = content.get("gensets", []) if isinstance(content, dict) else content
+    elif name.lower().endswith(".csv"):
+        raws = []
+        for row in csv.DictReader(io.StringIO(text)):
+            raw = {key: row.get(key) for key in CATALOG_FIELDS}
+            raw["sfoc"] = {key[len(CSV_SFOC_PREFIX):]: value for key, value in row.items() if key and key.startswith(CSV_SFOC_PREFIX)}
+            raws.append(raw)
+    else:
+        raise ValueError(f"{name}: desteklenmeyen katalog dosyası (JSON veya CSV olmalı).")
+    return [_record(raw, name) for raw in raws]
+
+class GensetCatalog:
+    """
+    MCR'a göre sıralı dizilerle indekslenmiş jeneratör seti kataloğu.
+
+    Kayıtlar bir kez MCR'a göre sıralanır; SFOC tabloları standart yüklerde (GENSET_CATALOG_SFOC_LOADS)
+    önceden değerlendirilip (model, yük) matrisinde tutulur. MCR aralığı sorgusu sıralı dizide ikili arama
+    (searchsorted) ile bir dilime iner, SFOC / ağırlık / alan filtreleri sadece o dilim üzerinde vektöreldir.
+    Modellerin derlenmiş SFOC eğrileri ilk ihtiyaçta kurulur ve saklanır.
+    """
+    def __init__(self, records, sfoc_loads=GENSET_CATALOG_SFOC_LOADS):
+        records = sorted(records, key=lambda record: record["mcr_kw"])
+        self.records = records
+        self.sfoc_loads = tuple(float(load) for load in sfoc_loads)
+        self.mcr_kw = np.array([r["mcr_kw"] for r in records], dtype=float)
+        self.weight_t = np.array([r["weight_t"] for r in records], dtype=float)
+        self.footprint_m2 = np.array([r["footprint_m2"] for r in records], dtype=float)
+        self.manufacturer = np.array([r["manufacturer"] for r in records], dtype=object)
+        self.model = np.array([r["model"] for r in records], dtype=object)
+        self._curves, self._fingerprint = {}, None
+        loads = np.array(self.sfoc_loads)
+        self.sfoc_table = np.array([self.curve(i)(loads) for i in range(len(records))], dtype=float).reshape(len(records), len(loads))
+
+    def __len__(self):
+        return len(self.records)
+
+    def curve(self, index):
+        curve = self._curves.get(index)
+        if curve is None: curve = self._curves[index] = CompiledSfocCurve(self.records[index]["sfoc"])
+        return curve
+
+    def fingerprint(self):
+        # Önbellek anahtarı olarak kullanılabilecek içerik özeti (bir kez hesaplanır)
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for r in self.records: digest.update(repr((r["manufacturer"], r["model"], r["mcr_kw"], sorted(r["sfoc"].items()))).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def sfoc_at(self, indices, load_percent):
+        # Seçili modellerin verilen yükteki SFOC'u; standart yüklerden biriyse tablodan, değilse eğrilerden.
+        indices = np.asarray(indices, dtype=int)
+        if float(load_percent) in self.sfoc_loads: return self.sfoc_table[indices, self.sfoc_loads.index(float(load_percent))]
+        return np.array([float(self.curve(i)(load_percent)) for i in indices], dtype=float)
+
+    def query(self, mcr_range=None, max_sfoc=None, sfoc_load_percent=75, max_weight_t=None, max_footprint_m2=None, manufacturer=None):
+        """
+        Koşulları sağlayan modellerin indeksleri (MCR'a göre artan). Örn. 1800-2600 kW ve SFOC@%75 < 185:
+        query((1800, 2600), max_sfoc=185). Ağırlık / alan bilgisi olmayan modeller bu filtrelerde elenir.
+        """
+        lo, hi = 0, len(self.records)
+        if mcr_range is not None:
+            lo = int(np.searchsorted(self.mcr_kw, mcr_range[0], side="left"))
+            hi = int(np.searchsorted(self.mcr_kw, mcr_range[1], side="right"))
+        indices = np.arange(lo, hi)
+        mask = np.ones(len(indices), dtype=bool)
+        if max_sfoc is not None: mask &= self.sfoc_at(indices, sfoc_load_percent) < max_sfoc
+        if max_weight_t is not None: mask &= self.weight_t[lo:hi] <= max_weight_t
+        if max_footprint_m2 is not None: mask &= self.footprint_m2[lo:hi] <= max_footprint_m2
+        if manufacturer: mask &= self.manufacturer[lo:hi] == manufacturer
+        return indices[mask]
+
+    def frame(self, indices=None, sfoc_load_percent=75):
+        indices = np.arange(len(self.records)) if indices is None else np.asarray(indices, dtype=int)
+        return pd.DataFrame({
+            "Üretici": self.manufacturer[indices], "Model": self.model[indices], "MCR (kW)": self.mcr_kw[indices],
+            f"SFOC @%{sfoc_load_percent:g} (g/kWh)": self.sfoc_at(indices, sfoc_load_percent),
+            "Ağırlık (t)": self.weight_t[indices], "Taban Alanı (m²)": self.footprint_m2[indices]
+        })
+
+    def label(self, index):
+        return f"{self.manufacturer[index]} {self.model[index]}".strip() or f"{self.mcr_kw[index]:.0f} kW"
+
+    def candidate_fleets(self, main_indices, port_indices, peak_power_kw, max_main_qty, max_port_qty,
+                         max_oversize=GENSET_CATALOG_MAX_OVERSIZE, max_fleets=GENSET_CATALOG_MAX_FLEETS):
+        """
+        Sorgu sonuçlarından aday filolar: (ana model, ana adet, liman modeli | None, liman adet).
+        Dispatch en yüksek talebi ana jeneratörlerle karşıladığından (liman jeneratörü düşük yükte destek verir)
+        ana kurulu gücü en yüksek talebin altında kalan veya toplam kurulu gücü talebin `max_oversize` katını
+        aşan filolar budanır; kalanlar kurulu güce göre artan sırada, en fazla `max_fleets` tanesi döndürülür.
+        """
+        main_indices, port_indices = np.asarray(main_indices, dtype=int), np.asarray(port_indices, dtype=int)
+        port_options = [(None, 0)] + [(int(j), q) for j in port_indices for q in range(1, max_port_qty + 1)]
+        fleets = []
+        for main_qty in range(1, max_main_qty + 1):
+            main_capacity = main_qty * self.mcr_kw[main_indices]
+            for port_index, port_qty in port_options:
+                installed = main_capacity + (port_qty * self.mcr_kw[port_index] if port_index is not None else 0.0)
+                fits = (main_capacity >= peak_power_kw) & (installed <= peak_power_kw * max_oversize)
+                fleets.extend((float(kw), int(i), main_qty, port_index, port_qty) for i, kw in zip(main_indices[fits], installed[fits]))
+        fleets.sort(key=lambda fleet: fleet[0])
+        return [fleet[1:] for fleet in fleets[:max_fleets]]
+
+def catalog_sources_from_dir(directory=GENSET_CATALOG_DIR):
+    # Klasördeki JSON / CSV katalog dosyaları: ((ad, bayt içeriği), ...) — build_genset_catalog'un önbellek anahtarı
+    if not directory or not os.path.isdir(directory): return ()
+    sources = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith((".json", ".csv")):
+            with open(os.path.join(directory, name), "rb") as f: sources.append((name, f.read()))
+    return tuple(sources)
+
+@st.cache_resource(max_entries=4)
+def build_genset_catalog(sources):
+    # Aynı dosya içerikleri için katalog (sıralama, SFOC tablosu) süreç genelinde bir kez kurulur.
+    return GensetCatalog([record for name, data in sources for record in read_catalog_records(name, data)])
@@ -0,0 +1,33 @@
+# load_profiles.py
+import numpy as np
+import pandas as pd
+
+# Yük profili dosyalarındaki (CSV) sütun adları
+PROFILE_TIME_COLUMN = "time_s"            # Örnek zamanı (saniye), artan sırada
+PROFILE_POWER_COLUMN = "shaft_power_kw"   # Şaft gücü (kW)
+PROFILE_MODE_COLUMN = "mode"              # "Seyir" / "Manevra" (yoksa tüm profil Seyir kabul edilir)
+
+def read_load_profile(source, default_mode="Seyir"):
+    # CSV yük profilini okur; sütunları doğrular, zamana göre sıralar ve tekrarlanan zaman damgalarını atar.
+    profile = pd.read_csv(source)
+    missing = [c for c in (PROFILE_TIME_COLUMN, PROFILE_POWER_COLUMN) if c not in profile.columns]
+    if missing: raise ValueError(f"Yük profilinde eksik sütun(lar): {', '.join(missing)}")
+    if PROFILE_MODE_COLUMN not in profile.columns: profile[PROFILE_MODE_COLUMN] = default_mode
+    profile = profile[[PROFILE_TIME_COLUMN, PROFILE_POWER_COLUMN, PROFILE_MODE_COLUMN]].dropna(subset=[PROFILE_TIME_COLUMN, PROFILE_POWER_COLUMN])
+    profile = profile.sort_values(PROFILE_TIME_COLUMN).drop_duplicates(subset=PROFILE_TIME_COLUMN, keep="last").reset_index(drop=True)
+    profile[PROFILE_MODE_COLUMN] = profile[PROFILE_MODE_COLUMN].astype("category")
+    return profile
+
+def sample_durations_h(times_s):
+    # Her örneğin bir sonraki örneğe kadar geçerli olduğu süre (saat); son örnek için medyan adım kullanılır.
+    times_s = np.asarray(times_s, dtype=float)
+    if len(times_s) == 0: return np.zeros(0)
+    if len(times_s) == 1: return np.zeros(1)
+    dt = np.diff(times_s)
+    return np.append(dt, np.median(dt)) / 3600.0
+
+def run_starts(codes):
+    # Tamsayı kodlanmış durum dizisinde her sabit bloğun (run) başladığı indeksler.
+    codes = np.asarray(codes)
+    if len(codes) == 0: return np.zeros(0, dtype=int)
+    return np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
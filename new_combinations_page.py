@@ -5,255 +5,217 @@ import numpy as np
 import plotly.express as px
 
 # Proje içi modüllerden importlar
-# DEĞİŞİKLİK: İlgili SFOC verileri ve ALL_SFOC_CURVES import ediliyor
+# DEĞİŞİKLİK: SFOC eğrileri config yerine SFOC kütüphanesinden (sfoc_library) geliyor
 from config import (
     CONVENTIONAL_SHAFT_EFFICIENCY,
     PROPULSION_PATH_INV_EFFICIENCY,
-    SFOC_DATA_MAIN_ENGINE,
-    SFOC_DATA_AUX_DG,
-    ALL_SFOC_CURVES
+    ADAPTIVE_SWEEP_COARSE_STEP_KW,
+    ADAPTIVE_SWEEP_MIN_STEP_KW,
+    ADAPTIVE_SWEEP_SLOPE_TOLERANCE,
+    SIM_MIN_RUN_TIME_S,
+    SIM_START_FUEL_KG,
+    SIM_HYSTERESIS_FRACTION,
+    BATTERY_SOC_LIMITS,
+    NEW_COMBINATION_DEFAULTS
 )
 from core_calculations import (
-    calculate_fuel,
-    get_best_combination
+    get_best_combination,
+    adaptive_power_sweep,
+    required_de_power_for_mode,
+    total_electrical_efficiency,
+    electrical_efficiency_table
 )
+from dispatch_map import get_dispatch_map, STRATEGY_LABELS, DISPATCH_SFOC_KEYS
+from load_profiles import read_load_profile, sample_durations_h, PROFILE_TIME_COLUMN, PROFILE_POWER_COLUMN, PROFILE_MODE_COLUMN
+from voyage_simulator import simulate_voyage
+from voyage_metrics import LOAD_BAND_LABELS
+from energy_storage import optimize_storage_dispatch
+from economic_dispatch import LOAD_SHARING_LABELS
+from reference_engine import conventional_reference, REFERENCE_SFOC_KEYS
+from sfoc_library import SFOC_CACHE_HASH_FUNCS, current_sfoc_curves
+from plot_decimation import drilldown_frame, sweep_figure, line_figure
+from session_store import get_result_store
+import telemetry
 
-def render_page():
-    """ "Yeni Jeneratör Kombinasyonları" sayfasının içeriğini ve mantığını render eder. """
-    st.header("Yeni Jeneratör Kombinasyonları Analizi")
+# calculate_all_results_for_new_combinations'ın kullandığı SFOC eğrileri (referans + DE jeneratörleri)
+NEW_COMBINATION_SFOC_KEYS = REFERENCE_SFOC_KEYS + DISPATCH_SFOC_KEYS
 
-    st.sidebar.header("Yeni Kombinasyon Girdi Ayarları")
-    # Widget'lar orijinal haliyle korunuyor
-    main_gen_mcr_new = st.sidebar.number_input("Ana Jeneratör MCR (kW)", min_value=100, value=2400, step=100, key="nc_main_gen_mcr")
-    main_gen_qty_new = st.sidebar.number_input("Ana Jeneratör Adedi", min_value=1, value=3, step=1, key="nc_main_gen_qty")
-    port_gen_mcr_new = st.sidebar.number_input("Liman Jeneratörü MCR (kW)", min_value=50, value=1000, step=50, key="nc_port_gen_mcr")
-    port_gen_qty_new = st.sidebar.number_input("Liman Jeneratörü Adedi", min_value=0, value=1, step=1, key="nc_port_gen_qty")
-
-    sea_power_range_new = st.sidebar.slider("Seyir Şaft Güç Aralığı (kW)", 2500, 5500, (3000, 4400), step=100, key="nc_sea_power_range")
-    maneuver_power_range_new = st.sidebar.slider("Manevra Şaft Güç Aralığı (kW)", 1500, 3500, (1600, 2700), step=100, key="nc_maneuver_power_range")
-    sea_duration_new = st.sidebar.number_input("Seyir Süresi (saat)", min_value=1.0, value=48.0, step=1.0, key="nc_sea_duration")
-    maneuver_duration_new = st.sidebar.number_input("Manevra Süresi (saat)", min_value=1.0, value=4.0, step=1.0, key="nc_maneuver_duration")
-    main_engine_mcr_ref_new = st.sidebar.number_input("Ana Makine MCR (kW) (Referans İçin)", min_value=1000, value=7200, step=100, key="nc_main_engine_mcr_ref")
-    nc_conv_aux_dg_mcr_input = st.sidebar.number_input(
-        "Yardımcı DG MCR Değeri (kW) (Ref. Manevra İçin)",
-        min_value=100, value=800, step=50, key="nc_conv_aux_dg_mcr"
-    )
-    nc_aux_power_demand_input = st.sidebar.number_input(
-        "Yardımcı Güç İhtiyacı (kW) (Seyir/Manevra)",
-        min_value=0, value=300, step=50, key="nc_aux_power"
-    )
+def _new_combination_mode_unit(mode_label, power_range, duration, gen_config_label,
+                               p_main_gen_mcr, p_main_gen_qty, p_port_gen_mcr, p_port_gen_qty,
+                               p_total_elec_eff_factor_arg, p_conventional_shaft_eff_arg,
+                               p_current_aux_power_demand_kw, p_adaptive_min_step, p_load_sharing, p_sfoc_curves,
+                               p_rated_shaft_power_kw=None):
+    # Tek bir mod (Seyir/Manevra) için DE jeneratör taraması; modlar birbirinden bağımsızdır.
+    # Döndürür: (mod toplam yakıtı, detay satırları, kullanım satırları)
+    detailed_data_list = []
+    generator_usage_data_list = []
 
-    st.sidebar.subheader("Sistem Verimlilikleri (%) (Yeni Kombinasyon İçin)")
-    motor_eff_new_perc = st.sidebar.slider("Yeni - Elektrik Motoru Verimliliği (%)", 90.0, 99.9, 97.0, step=0.1, key="nc_motor_eff_slider")
-    converter_eff_new_perc = st.sidebar.slider("Yeni - Frekans Dönüştürücü Verimliliği (%)", 90.0, 99.9, 98.5, step=0.1, key="nc_converter_eff_slider")
-    switchboard_eff_new_perc = st.sidebar.slider("Yeni - Main Switchboard Verimliliği (%)", 90.0, 99.9, 99.5, step=0.1, key="nc_switchboard_eff_slider")
-    generator_elec_eff_new_perc = st.sidebar.slider("Yeni - Alternatör Verimliliği (%)", 90.0, 99.9, 98.0, step=0.1, key="nc_generator_elec_eff_slider")
+    def evaluate_shaft_power_point(shaft_power_loop_input):
+        current_P_pervane_hedef = max(0, shaft_power_loop_input)
+        total_de_power_for_get_best_combination = float(required_de_power_for_mode(
+            current_P_pervane_hedef, mode_label, p_total_elec_eff_factor_arg, p_conventional_shaft_eff_arg,
+            PROPULSION_PATH_INV_EFFICIENCY, p_current_aux_power_demand_kw,
+            electrical_efficiency_table(), p_rated_shaft_power_kw
+        ))
+        
+        if total_de_power_for_get_best_combination <= 0 or not np.isfinite(total_de_power_for_get_best_combination):
+            return 0.0, None, [], (None, None, False), current_P_pervane_hedef, total_de_power_for_get_best_combination
 
-    total_elec_eff_new_factor = (motor_eff_new_perc / 100.0) * (converter_eff_new_perc / 100.0) * (switchboard_eff_new_perc / 100.0) * (generator_elec_eff_new_perc / 100.0)
+        # DEĞİŞİKLİK: get_best_combination'a kütüphanenin eğri kümesi veriliyor.
+        return get_best_combination(
+            total_de_power_for_get_best_combination,
+            p_main_gen_mcr, p_main_gen_qty, p_port_gen_mcr, p_port_gen_qty,
+            p_sfoc_curves,
+            duration,
+            p_load_sharing
+        ) + (current_P_pervane_hedef, total_de_power_for_get_best_combination)
 
-    if total_elec_eff_new_factor <= 1e-6:
-        st.warning("Yeni Kombinasyon için toplam sistem verimliliği (motor*conv*pano*alt) sıfıra çok yakın veya sıfır. Lütfen verimlilikleri kontrol edin.")
+    if p_adaptive_min_step:
+        # Uyarlamalı tarama: kaba adımla başla, sadece kombinasyon/eğim değişen yerlerde incelt.
+        evaluated_points = adaptive_power_sweep(
+            evaluate_shaft_power_point, power_range[0], power_range[1],
+            ADAPTIVE_SWEEP_COARSE_STEP_KW, p_adaptive_min_step, ADAPTIVE_SWEEP_SLOPE_TOLERANCE
+        )
+    else:
+        evaluated_points = [(p, evaluate_shaft_power_point(p)) for p in range(power_range[0], power_range[1] + 100, 100)]
 
-    if "nc_results_df" not in st.session_state: st.session_state.nc_results_df = pd.DataFrame()
-    if "nc_detailed_df" not in st.session_state: st.session_state.nc_detailed_df = pd.DataFrame()
-    if "nc_usage_df" not in st.session_state: st.session_state.nc_usage_df = pd.DataFrame()
-    if "nc_show_results" not in st.session_state: st.session_state.nc_show_results = False
+    mode_total_fuel_gens = 0
+    for _, point_result in evaluated_points:
+        fuel_total, combo_label_used, loads_info_list, original_main_details, current_P_pervane_hedef, total_de_power_for_get_best_combination = point_result
 
-    @st.cache_data
-    def calculate_all_results_for_new_combinations(
-        p_main_gen_mcr, p_main_gen_qty, p_port_gen_mcr, p_port_gen_qty,
-        p_sea_power_range, p_maneuver_power_range,
-        p_sea_duration, p_maneuver_duration,
-        p_main_engine_mcr_ref,
-        p_total_elec_eff_factor_arg,
-        p_conventional_shaft_eff_arg,
-        # DEĞİŞİKLİK: p_sfoc_data argümanı kaldırıldı, artık kullanılmıyor.
-        p_current_aux_power_demand_kw,
-        p_current_conv_aux_dg_mcr_kw
-    ):
-        results_summary_list = []
-        detailed_data_list = []
-        generator_usage_data_list = []
-
-        # --- 1. Ana Makine Referans Tüketimini Hesapla ---
-        total_sea_fuel_main_engine_ref = 0
-        for shaft_power in range(p_sea_power_range[0], p_sea_power_range[1] + 100, 100):
-            if shaft_power <= 0 or p_main_engine_mcr_ref <= 0: continue
-            load = (shaft_power / p_main_engine_mcr_ref) * 100
-            if load > 0:
-                # DEĞİŞİKLİK: Geleneksel ana makine için doğru SFOC verisi kullanılıyor.
-                fuel = calculate_fuel(shaft_power, load, p_sea_duration, SFOC_DATA_MAIN_ENGINE)
-                if fuel > 0:
-                    total_sea_fuel_main_engine_ref += fuel
-                    # Orijinal koddaki gibi listeye ekleme
-                    detailed_data_list.append({
-                        "Combo": "Ana Makine Referans", "SpecificComboUsed": "Ana Makine Referans", "Mode": "Seyir",
-                        "Shaft Power (kW)": shaft_power, "Required DE Power (kW)": np.nan,
-                        "Fuel (ton)": round(fuel, 3), "System Type": "Ana Makine",
-                        "Load (%)": round(load, 2), "Gen Type": "Ana Makine", "N_running_combo": 1,
-                        "OriginalMainOnlyFuel (ton)": np.nan, "OriginalMainOnlyLabel": np.nan, "IsAssisted": False
-                    })
-        
-        total_maneuver_fuel_main_engine_ref = 0
-        SABIT_YARDIMCI_DG_SAYISI_MANEVRA_REF = 2
-        for shaft_power_maneuver_ref in range(p_maneuver_power_range[0], p_maneuver_power_range[1] + 100, 100):
-            current_shaft_power_man_ref = max(0, shaft_power_maneuver_ref)
-            me_propulsion_fuel_maneuver_ref = 0
-            main_engine_load_maneuver_ref = 0
-            if p_main_engine_mcr_ref > 0:
-                 main_engine_load_maneuver_ref = (current_shaft_power_man_ref / p_main_engine_mcr_ref) * 100
-                 # DEĞİŞİKLİK: Geleneksel ana makine için doğru SFOC verisi kullanılıyor.
-                 me_propulsion_fuel_maneuver_ref = calculate_fuel(current_shaft_power_man_ref, main_engine_load_maneuver_ref, p_maneuver_duration, SFOC_DATA_MAIN_ENGINE)
-                 me_propulsion_fuel_maneuver_ref = me_propulsion_fuel_maneuver_ref if me_propulsion_fuel_maneuver_ref > 0 else 0
+        # Kodun geri kalanı orijinal haliyle korunuyor...
+        if fuel_total > 0 and loads_info_list:
+            mode_total_fuel_gens += fuel_total
             
-            total_aux_dg_fuel_maneuver_ref = 0
-            if p_current_aux_power_demand_kw > 0 and p_current_conv_aux_dg_mcr_kw > 0 and SABIT_YARDIMCI_DG_SAYISI_MANEVRA_REF > 0:
-                power_per_aux_dg_ref = p_current_aux_power_demand_kw / SABIT_YARDIMCI_DG_SAYISI_MANEVRA_REF
-                if power_per_aux_dg_ref <= p_current_conv_aux_dg_mcr_kw:
-                    load_per_aux_dg_percent_ref = (power_per_aux_dg_ref / p_current_conv_aux_dg_mcr_kw) * 100
-                    if load_per_aux_dg_percent_ref >=0:
-                        # DEĞİŞİKLİK: Geleneksel yardımcı jeneratör için doğru SFOC verisi kullanılıyor.
-                        fuel_one_dg_ref = calculate_fuel(power_per_aux_dg_ref, load_per_aux_dg_percent_ref, p_maneuver_duration, SFOC_DATA_AUX_DG)
-                        if fuel_one_dg_ref > 0:
-                            total_aux_dg_fuel_maneuver_ref = fuel_one_dg_ref * SABIT_YARDIMCI_DG_SAYISI_MANEVRA_REF
-            
-            total_conventional_maneuver_fuel_point_ref = me_propulsion_fuel_maneuver_ref + total_aux_dg_fuel_maneuver_ref
-            if total_conventional_maneuver_fuel_point_ref > 0:
-                total_maneuver_fuel_main_engine_ref += total_conventional_maneuver_fuel_point_ref
-                # Orijinal koddaki gibi listeye ekleme
-                detailed_data_list.append({
-                    "Combo": "Ana Makine Referans", "SpecificComboUsed": "Ana Makine Referans", "Mode": "Manevra",
-                    "Shaft Power (kW)": current_shaft_power_man_ref, "Required DE Power (kW)": np.nan,
-                    "Fuel (ton)": round(total_conventional_maneuver_fuel_point_ref, 3), "System Type": "Ana Makine",
-                    "Load (%)": round(main_engine_load_maneuver_ref, 2), "Gen Type": "Ana Makine", "N_running_combo": 1,
-                    "OriginalMainOnlyFuel (ton)": np.nan, "OriginalMainOnlyLabel": np.nan, "IsAssisted": False
+            original_fuel_val, original_label_val, is_assisted_val = np.nan, np.nan, False
+            if original_main_details and original_main_details[0] is not None:
+                original_fuel_val = round(original_main_details[0], 3)
+                original_label_val = original_main_details[1]
+                is_assisted_val = original_main_details[2]
+
+            detailed_data_list.append({
+                "Combo": gen_config_label, "SpecificComboUsed": combo_label_used, "Mode": mode_label,
+                "Shaft Power (kW)": current_P_pervane_hedef,
+                "Required DE Power (kW)": round(total_de_power_for_get_best_combination),
+                "Fuel (ton)": round(fuel_total, 3), "System Type": "Jeneratör",
+                "Load (%)": np.nan, "Gen Type": combo_label_used,
+                "N_running_combo": len(loads_info_list),
+                "OriginalMainOnlyFuel (ton)": original_fuel_val,
+                "OriginalMainOnlyLabel": original_label_val, "IsAssisted": is_assisted_val
+            })
+            for gen_mcr_running, load_percent_running, gen_kind_running in loads_info_list:
+                generator_usage_data_list.append({
+                    "Combo": gen_config_label, "Mode": mode_label,
+                    "Shaft Power (kW)": current_P_pervane_hedef,
+                    "Required DE Power (kW)": round(total_de_power_for_get_best_combination),
+                    "Gen MCR": gen_mcr_running, "Gen Kind": gen_kind_running,
+                    "Gen Type": f"{gen_mcr_running} kW {gen_kind_running} Jen",
+                    "Load Percent": round(load_percent_running, 2),
+                    "N_running_combo": len(loads_info_list)
                 })
 
-        # --- 2. Yeni Jeneratör Konfigürasyonu için Tüketimi Hesapla ---
-        # Bu bölümdeki mantık orijinal haliyle korunuyor
-        current_combo_total_sea_fuel_gens = 0
-        current_combo_total_maneuver_fuel_gens = 0
-        gen_config_label = f"{p_main_gen_qty}x{p_main_gen_mcr}kW Ana"
-        if p_port_gen_qty > 0 and p_port_gen_mcr > 0:
-            gen_config_label += f" + {p_port_gen_qty}x{p_port_gen_mcr}kW Liman"
-        
-        for mode_params in [(p_sea_power_range, p_sea_duration, "Seyir"), (p_maneuver_power_range, p_maneuver_duration, "Manevra")]:
-            power_range, duration, mode_label = mode_params
-            for shaft_power_loop_input in range(power_range[0], power_range[1] + 100, 100):
-                # Orijinal koddaki güç hesaplama mantığı korunuyor
-                current_P_pervane_hedef = max(0, shaft_power_loop_input)
-                required_de_power_for_prop = 0.0
-                de_power_for_auxiliary = 0.0
-                total_de_power_for_get_best_combination = 0.0
-
-                if mode_label == "Seyir":
-                    power_basis_for_de_prop_sea = current_P_pervane_hedef * p_conventional_shaft_eff_arg 
-                    if p_total_elec_eff_factor_arg > 1e-9:
-                        required_de_power_for_prop = power_basis_for_de_prop_sea / p_total_elec_eff_factor_arg
-                    elif power_basis_for_de_prop_sea > 0:
-                        required_de_power_for_prop = float('inf')
-                    de_power_for_auxiliary = p_current_aux_power_demand_kw if p_current_aux_power_demand_kw > 0 else 0.0
-                    total_de_power_for_get_best_combination = required_de_power_for_prop 
-
-                elif mode_label == "Manevra":
-                    required_de_power_for_prop = current_P_pervane_hedef * PROPULSION_PATH_INV_EFFICIENCY
-                    de_power_for_auxiliary = p_current_aux_power_demand_kw if p_current_aux_power_demand_kw > 0 else 0.0
-                    total_de_power_for_get_best_combination = required_de_power_for_prop + de_power_for_auxiliary
-                
-                if total_de_power_for_get_best_combination <= 0 or not np.isfinite(total_de_power_for_get_best_combination):
-                    continue
-
-                # DEĞİŞİKLİK: get_best_combination'a ALL_SFOC_CURVES sözlüğü veriliyor.
-                fuel_total, combo_label_used, loads_info_list, original_main_details = get_best_combination(
-                    total_de_power_for_get_best_combination,
-                    p_main_gen_mcr, p_main_gen_qty, p_port_gen_mcr, p_port_gen_qty,
-                    ALL_SFOC_CURVES,
-                    duration
-                )
+    if p_adaptive_min_step and evaluated_points:
+        # Toplamlar referansla karşılaştırılabilir kalsın diye uyarlamalı noktalar 100 kW ızgarasına
+        # doğrusal olarak yeniden örneklenir (kombinasyon geçişleri zaten min. adıma kadar inceltildi).
+        sweep_powers = [p for p, _ in evaluated_points]
+        sweep_fuels = [r[0] if r[0] > 0 and r[2] else 0.0 for _, r in evaluated_points]
+        grid_powers = np.arange(power_range[0], power_range[1] + 100, 100)
+        mode_total_fuel_gens = float(np.interp(grid_powers, sweep_powers, sweep_fuels).sum())
 
-                # Kodun geri kalanı orijinal haliyle korunuyor...
-                if fuel_total > 0 and loads_info_list:
-                    if mode_label == "Seyir": current_combo_total_sea_fuel_gens += fuel_total
-                    else: current_combo_total_maneuver_fuel_gens += fuel_total
-                    
-                    original_fuel_val, original_label_val, is_assisted_val = np.nan, np.nan, False
-                    if original_main_details and original_main_details[0] is not None:
-                        original_fuel_val = round(original_main_details[0], 3)
-                        original_label_val = original_main_details[1]
-                        is_assisted_val = original_main_details[2]
-
-                    detailed_data_list.append({
-                        "Combo": gen_config_label, "SpecificComboUsed": combo_label_used, "Mode": mode_label,
-                        "Shaft Power (kW)": current_P_pervane_hedef,
-                        "Required DE Power (kW)": round(total_de_power_for_get_best_combination),
-                        "Fuel (ton)": round(fuel_total, 3), "System Type": "Jeneratör",
-                        "Load (%)": np.nan, "Gen Type": combo_label_used,
-                        "N_running_combo": len(loads_info_list),
-                        "OriginalMainOnlyFuel (ton)": original_fuel_val,
-                        "OriginalMainOnlyLabel": original_label_val, "IsAssisted": is_assisted_val
-                    })
-                    for gen_mcr_running, load_percent_running, gen_kind_running in loads_info_list:
-                        generator_usage_data_list.append({
-                            "Combo": gen_config_label, "Mode": mode_label,
-                            "Shaft Power (kW)": current_P_pervane_hedef,
-                            "Required DE Power (kW)": round(total_de_power_for_get_best_combination),
-                            "Gen MCR": gen_mcr_running, "Gen Kind": gen_kind_running,
-                            "Gen Type": f"{gen_mcr_running} kW {gen_kind_running} Jen",
-                            "Load Percent": round(load_percent_running, 2),
-                            "N_running_combo": len(loads_info_list)
-                        })
-        
-        # Orijinal kodun sonundaki özetleme mantığı korunuyor
-        if current_combo_total_sea_fuel_gens > 0 or current_combo_total_maneuver_fuel_gens > 0:
-            sea_diff = total_sea_fuel_main_engine_ref - current_combo_total_sea_fuel_gens
-            maneuver_diff = total_maneuver_fuel_main_engine_ref - current_combo_total_maneuver_fuel_gens
-            results_summary_list.append({
-                "Jeneratör Konfigürasyonu": gen_config_label,
-                "Toplam Seyir Yakıtı (Jeneratörler) (ton)": round(current_combo_total_sea_fuel_gens, 2),
-                "Toplam Manevra Yakıtı (Jeneratörler) (ton)": round(current_combo_total_maneuver_fuel_gens, 2),
-                "Seyir Yakıt Farkı (Ana M. Ref. - Jen) (ton)": round(sea_diff, 2),
-                "Manevra Yakıt Farkı (Ana M. Ref. - Jen) (ton)": round(maneuver_diff, 2)
-            })
-        elif not results_summary_list and (total_sea_fuel_main_engine_ref > 0 or total_maneuver_fuel_main_engine_ref > 0):
-             results_summary_list.append({
-                "Jeneratör Konfigürasyonu": gen_config_label + " (Jeneratörler Çalıştırılamadı/Verimsiz)",
-                "Toplam Seyir Yakıtı (Jeneratörler) (ton)": 0, "Toplam Manevra Yakıtı (Jeneratörler) (ton)": 0,
-                "Seyir Yakıt Farkı (Ana M. Ref. - Jen) (ton)": round(total_sea_fuel_main_engine_ref, 2),
-                "Manevra Yakıt Farkı (Ana M. Ref. - Jen) (ton)": round(total_maneuver_fuel_main_engine_ref, 2)
+    return mode_total_fuel_gens, detailed_data_list, generator_usage_data_list
+
+@st.cache_data(hash_funcs=SFOC_CACHE_HASH_FUNCS)
+def calculate_all_results_for_new_combinations(
+    p_main_gen_mcr, p_main_gen_qty, p_port_gen_mcr, p_port_gen_qty,
+    p_sea_power_range, p_maneuver_power_range,
+    p_sea_duration, p_maneuver_duration,
+    p_main_engine_mcr_ref,
+    p_total_elec_eff_factor_arg,
+    p_conventional_shaft_eff_arg,
+    # DEĞİŞİKLİK: p_sfoc_data argümanı kaldırıldı, artık kullanılmıyor.
+    p_current_aux_power_demand_kw,
+    p_current_conv_aux_dg_mcr_kw,
+    p_sfoc_curves, # NEW_COMBINATION_SFOC_KEYS eğrileri (SfocCurveSet); önbellek anahtarına içeriğiyle girer
+    p_adaptive_min_step=None, # None: sabit 100 kW adım, sayı: uyarlamalı taramanın en küçük adımı (kW)
+    p_load_sharing="proportional", # Çalışan jeneratörler arası yük paylaşımı (LOAD_SHARING_LABELS anahtarı)
+    p_load_dependent_eff=False # True: tahrik yolu verimi şaft yüküne bağlı (anma gücü referans ana makine MCR'ı)
+):
+    telemetry.cache_miss("calculate_all_results_for_new_combinations")
+    results_summary_list = []
+    detailed_data_list = []
+    generator_usage_data_list = []
+
+    # --- 1. Ana Makine Referans Tüketimi ---
+    # Jeneratör konfigürasyonundan bağımsız; tüm konfigürasyonlar paylaşılan önbellekteki referansı kullanır.
+    reference = conventional_reference(
+        p_sea_power_range, p_maneuver_power_range, p_sea_duration, p_maneuver_duration,
+        p_main_engine_mcr_ref, p_current_conv_aux_dg_mcr_kw, p_current_aux_power_demand_kw, p_sfoc_curves.subset(REFERENCE_SFOC_KEYS)
+    )
+    for mode_label, mode_reference in reference.items():
+        for shaft_power_ref, fuel_ref, load_ref in zip(mode_reference["shaft_power_kw"].tolist(), mode_reference["fuel_t"].tolist(), mode_reference["load_percent"].tolist()):
+            detailed_data_list.append({
+                "Combo": "Ana Makine Referans", "SpecificComboUsed": "Ana Makine Referans", "Mode": mode_label,
+                "Shaft Power (kW)": shaft_power_ref, "Required DE Power (kW)": np.nan,
+                "Fuel (ton)": round(fuel_ref, 3), "System Type": "Ana Makine",
+                "Load (%)": round(load_ref, 2), "Gen Type": "Ana Makine", "N_running_combo": 1,
+                "OriginalMainOnlyFuel (ton)": np.nan, "OriginalMainOnlyLabel": np.nan, "IsAssisted": False
             })
-        return pd.DataFrame(results_summary_list), pd.DataFrame(detailed_data_list), pd.DataFrame(generator_usage_data_list)
+    total_sea_fuel_main_engine_ref = reference["Seyir"]["total_fuel_t"]
+    total_maneuver_fuel_main_engine_ref = reference["Manevra"]["total_fuel_t"]
 
-    # "HESAPLA" butonu fonksiyon çağrısı güncelleniyor
-    if st.sidebar.button("Yeni Kombinasyon HESAPLA", key="nc_calculate_button"):
-        if total_elec_eff_new_factor < 1e-9 and sea_power_range_new[1] > sea_power_range_new[0]:
-             st.error("Hesaplama yapılamadı: Seyir modu için toplam elektriksel verimlilik faktörü çok düşük.")
-             st.session_state.nc_show_results = False
-             st.session_state.nc_results_df = pd.DataFrame(); st.session_state.nc_detailed_df = pd.DataFrame(); st.session_state.nc_usage_df = pd.DataFrame()
-        elif nc_aux_power_demand_input > 0 and nc_conv_aux_dg_mcr_input <= 0 :
-            st.error("Manevra için yardımcı güç ihtiyacı girilmiş ancak Referans Yardımcı DG MCR değeri pozitif değil.")
-            st.session_state.nc_show_results = False
-            st.session_state.nc_results_df = pd.DataFrame(); st.session_state.nc_detailed_df = pd.DataFrame(); st.session_state.nc_usage_df = pd.DataFrame()
-        else:
-            # DEĞİŞİKLİK: Fonksiyon çağrısından p_sfoc_data argümanı kaldırılıyor.
-            st.session_state.nc_results_df, st.session_state.nc_detailed_df, st.session_state.nc_usage_df = \
-                calculate_all_results_for_new_combinations(
-                    main_gen_mcr_new, main_gen_qty_new, port_gen_mcr_new, port_gen_qty_new,
-                    sea_power_range_new, maneuver_power_range_new,
-                    sea_duration_new, maneuver_duration_new,
-                    main_engine_mcr_ref_new,
-                    total_elec_eff_new_factor,
-                    CONVENTIONAL_SHAFT_EFFICIENCY,
-                    nc_aux_power_demand_input,
-                    nc_conv_aux_dg_mcr_input
-                )
-            st.session_state.nc_show_results = True
-            if st.session_state.nc_results_df.empty and st.session_state.nc_detailed_df.empty:
-                st.warning("Hesaplama yapıldı ancak 'Yeni Kombinasyonlar' için gösterilecek sonuç bulunamadı.")
-                
-    # --- Sonuçları Göster (Bu kısım öncekiyle aynı kalabilir) ---
-    if st.session_state.nc_show_results and not st.session_state.nc_results_df.empty:
+    # --- 2. Yeni Jeneratör Konfigürasyonu için Tüketimi Hesapla ---
+    # Bu bölümdeki mantık orijinal haliyle korunuyor
+    current_combo_total_sea_fuel_gens = 0
+    current_combo_total_maneuver_fuel_gens = 0
+    gen_config_label = f"{p_main_gen_qty}x{p_main_gen_mcr}kW Ana"
+    if p_port_gen_qty > 0 and p_port_gen_mcr > 0:
+        gen_config_label += f" + {p_port_gen_qty}x{p_port_gen_mcr}kW Liman"
+    
+    # Seyir ve Manevra taramaları doğrudan, sırayla çalışır (dispatch tablosu okumaları kısa; havuz yükü kazançtan büyük).
+    for power_range, duration, mode_label in [(p_sea_power_range, p_sea_duration, "Seyir"), (p_maneuver_power_range, p_maneuver_duration, "Manevra")]:
+        mode_total_fuel_gens, mode_detailed_rows, mode_usage_rows = _new_combination_mode_unit(
+            mode_label, power_range, duration, gen_config_label,
+            p_main_gen_mcr, p_main_gen_qty, p_port_gen_mcr, p_port_gen_qty,
+            p_total_elec_eff_factor_arg, p_conventional_shaft_eff_arg,
+            p_current_aux_power_demand_kw, p_adaptive_min_step, p_load_sharing, p_sfoc_curves.subset(DISPATCH_SFOC_KEYS),
+            p_main_engine_mcr_ref if p_load_dependent_eff else None)
+        detailed_data_list.extend(mode_detailed_rows)
+        generator_usage_data_list.extend(mode_usage_rows)
+        if mode_label == "Seyir": current_combo_total_sea_fuel_gens += mode_total_fuel_gens
+        else: current_combo_total_maneuver_fuel_gens += mode_total_fuel_gens
+    
+    # Orijinal kodun sonundaki özetleme mantığı korunuyor
+    if current_combo_total_sea_fuel_gens > 0 or current_combo_total_maneuver_fuel_gens > 0:
+        sea_diff = total_sea_fuel_main_engine_ref - current_combo_total_sea_fuel_gens
+        maneuver_diff = total_maneuver_fuel_main_engine_ref - current_combo_total_maneuver_fuel_gens
+        results_summary_list.append({
+            "Jeneratör Konfigürasyonu": gen_config_label,
+            "Toplam Seyir Yakıtı (Jeneratörler) (ton)": round(current_combo_total_sea_fuel_gens, 2),
+            "Toplam Manevra Yakıtı (Jeneratörler) (ton)": round(current_combo_total_maneuver_fuel_gens, 2),
+            "Seyir Yakıt Farkı (Ana M. Ref. - Jen) (ton)": round(sea_diff, 2),
+            "Manevra Yakıt Farkı (Ana M. Ref. - Jen) (ton)": round(maneuver_diff, 2)
+        })
+    elif not results_summary_list and (total_sea_fuel_main_engine_ref > 0 or total_maneuver_fuel_main_engine_ref > 0):
+         results_summary_list.append({
+            "Jeneratör Konfigürasyonu": gen_config_label + " (Jeneratörler Çalıştırılamadı/Verimsiz)",
+            "Toplam Seyir Yakıtı (Jeneratörler) (ton)": 0, "Toplam Manevra Yakıtı (Jeneratörler) (ton)": 0,
+            "Seyir Yakıt Farkı (Ana M. Ref. - Jen) (ton)": round(total_sea_fuel_main_engine_ref, 2),
+            "Manevra Yakıt Farkı (Ana M. Ref. - Jen) (ton)": round(total_maneuver_fuel_main_engine_ref, 2)
+        })
+    return pd.DataFrame(results_summary_list), pd.DataFrame(detailed_data_list), pd.DataFrame(generator_usage_data_list)
+
+# Sonuç bölümü fragment olarak çizilir: grafik modu seçimi sadece bu bölümü yeniden çalıştırır,
+# kenar çubuğu ve hesaplama girdileri yeniden değerlendirilmez.
+@st.fragment
+@telemetry.timed_section("Yeni Kombinasyon / Sonuçlar")
+def _render_new_combination_results_section():
+    laps = telemetry.Laps("Sonuçlar")
+    nc_results_df, nc_detailed_df, nc_usage_df = get_result_store().get(st.session_state.nc_results_key)
+    laps.lap("sonuç deposu")
+    telemetry.record_frames("Yeni Kombinasyon sonuçları", nc_results_df, nc_detailed_df, nc_usage_df)
+    if st.session_state.nc_show_results and not nc_results_df.empty:
         st.subheader("Özet Sonuçlar (Yeni Kombinasyon)")
-        st.dataframe(st.session_state.nc_results_df.style.format({
+        st.dataframe(nc_results_df.style.format({
             "Seyirde Yakılan Yakıt (DE) (ton)": "{:.2f}",
             "Manevrada Yakılan Yakıt (DE) (ton)": "{:.2f}",
             "Seyir Yakıt Farkı (ton)": "{:.2f}",
@@ -263,9 +225,9 @@ def render_page():
         st.markdown("---")
         st.subheader("Detaylı Grafiksel Analiz (Yeni Kombinasyon)")
 
-        plot_data_source_nc = st.session_state.nc_detailed_df[
-            (st.session_state.nc_detailed_df["Fuel (ton)"].notna()) &
-            (st.session_state.nc_detailed_df["Fuel (ton)"] > 0)
+        plot_data_source_nc = nc_detailed_df[
+            (nc_detailed_df["Fuel (ton)"].notna()) &
+            (nc_detailed_df["Fuel (ton)"] > 0)
         ].copy()
 
         if not plot_data_source_nc.empty:
@@ -298,27 +260,34 @@ def render_page():
                             })
             
             transformed_plot_df_nc = pd.DataFrame(plot_df_transformed_list_nc)
+            laps.lap("filtreleme / dönüşüm")
             
             if not transformed_plot_df_nc.empty:
                 transformed_plot_df_nc['DisplayCombo'] = transformed_plot_df_nc['DisplayCombo'].astype('category')
                 transformed_plot_df_nc = transformed_plot_df_nc.sort_values(by=["Shaft Power (kW)", "DisplayCombo"])
-                fig_fuel_comp_nc = px.bar(
+                transformed_plot_df_nc = drilldown_frame(
+                    transformed_plot_df_nc, "Shaft Power (kW)", "Fuel (ton)", "DisplayCombo",
+                    key="nc_fuel_plot_range", label="Yakıt Grafiği Şaft Gücü Aralığı (kW)"
+                )
+                fig_fuel_comp_nc = sweep_figure(
                     transformed_plot_df_nc, x="Shaft Power (kW)", y="Fuel (ton)", color="DisplayCombo",
                     barmode="group",
                     title=f"Yakıt Tüketimi Karşılaştırması ({plot_mode_nc} Modu - Yeni Kombinasyon)",
                     labels={"Fuel (ton)": "Yakıt (ton)", "Shaft Power (kW)": "Şaft Gücü (kW)", "DisplayCombo": "Sistem / Kombinasyon"}
                 )
                 fig_fuel_comp_nc.update_layout(bargap=0.1, bargroupgap=0.05)
+                laps.lap("grafik oluşturma")
                 st.plotly_chart(fig_fuel_comp_nc, use_container_width=True)
+                laps.lap("grafik gösterimi")
             else:
                 st.warning(f"{plot_mode_nc} modu için gösterilecek karşılaştırmalı yakıt verisi bulunamadı (dönüşüm sonrası).")
         else:
             st.warning("Yeni jeneratör kombinasyonu veya Ana Makine Referansına ait gösterilecek yakıt verisi bulunamadı (kaynak veri boş).")
 
         # --- Jeneratör Kullanım Grafiği (Yeni Kombinasyon) ---
-        usage_plot_data_raw_nc = st.session_state.nc_usage_df[
-            (st.session_state.nc_usage_df["Mode"] == plot_mode_nc) &
-            (st.session_state.nc_usage_df["Load Percent"].notna())
+        usage_plot_data_raw_nc = nc_usage_df[
+            (nc_usage_df["Mode"] == plot_mode_nc) &
+            (nc_usage_df["Load Percent"].notna())
         ].copy()
 
         if not usage_plot_data_raw_nc.empty:
@@ -326,10 +295,10 @@ def render_page():
                 usage_summary_list_nc = []
                 for de_power_val, group in usage_plot_data_raw_nc.groupby("Required DE Power (kW)"):
                     if not group.empty:
-                        detail_match = st.session_state.nc_detailed_df[
-                            (st.session_state.nc_detailed_df["Mode"] == plot_mode_nc) &
-                            (st.session_state.nc_detailed_df["Required DE Power (kW)"] == de_power_val) &
-                            (st.session_state.nc_detailed_df["System Type"] == "Jeneratör")
+                        detail_match = nc_detailed_df[
+                            (nc_detailed_df["Mode"] == plot_mode_nc) &
+                            (nc_detailed_df["Required DE Power (kW)"] == de_power_val) &
+                            (nc_detailed_df["System Type"] == "Jeneratör")
                         ]
                         running_config_label = "N/A"; num_total_gens = 0; avg_load_primary = 0
                         if not detail_match.empty:
@@ -351,35 +320,284 @@ def render_page():
                         })
                 
                 usage_plot_df_nc = pd.DataFrame(usage_summary_list_nc).drop_duplicates().sort_values(by="Required DE Power (kW)")
+                laps.lap("groupby / özet")
                 if not usage_plot_df_nc.empty:
-                    fig_usage_nc_seyir = px.bar(
+                    usage_plot_df_nc = drilldown_frame(
+                        usage_plot_df_nc, "Required DE Power (kW)", "Representative Load (%)",
+                        key="nc_usage_plot_range", label="Yük Grafiği DE Gücü Aralığı (kW)"
+                    )
+                    fig_usage_nc_seyir = sweep_figure(
                         usage_plot_df_nc, x="Required DE Power (kW)", y="Representative Load (%)",
                         text="Representative Load (%)", hover_data=["Running Config", "Number of Generators"],
                         title=f"Jeneratör Yükleri ({plot_mode_nc} Modu - Yeni Kombinasyon)",
                         labels={"Representative Load (%)": "Temsili Jeneratör Yükü (%)", "Required DE Power (kW)": "Gerekli DE Gücü (kW)"}
                     )
-                    fig_usage_nc_seyir.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+                    fig_usage_nc_seyir.update_traces(texttemplate='%{text:.1f}%', textposition='outside', selector=dict(type="bar"))
                     fig_usage_nc_seyir.update_yaxes(range=[0, 110])
+                    laps.lap("grafik oluşturma")
                     st.plotly_chart(fig_usage_nc_seyir, use_container_width=True)
+                    laps.lap("grafik gösterimi")
                 else: st.warning(f"{plot_mode_nc} modu için özetlenmiş jeneratör kullanım verisi bulunamadı.")
             else: # Manevra modu
                 usage_plot_df_nc = usage_plot_data_raw_nc.sort_values(by=["Required DE Power (kW)", "Gen Type"])
+                laps.lap("filtreleme / dönüşüm")
                 if not usage_plot_df_nc.empty:
-                    fig_usage_nc_manevra = px.bar(
+                    usage_plot_df_nc = drilldown_frame(
+                        usage_plot_df_nc, "Required DE Power (kW)", "Load Percent", "Gen Type",
+                        key="nc_manevra_plot_range", label="Yük Dağılımı Grafiği DE Gücü Aralığı (kW)"
+                    )
+                    fig_usage_nc_manevra = sweep_figure(
                         usage_plot_df_nc, x="Required DE Power (kW)", y="Load Percent", color="Gen Type",
                         barmode="group", text_auto=".1f",
                         title=f"Jeneratör Yük Dağılımı ({plot_mode_nc} Modu - Yeni Kombinasyon)",
                         labels={"Load Percent": "Yük Yüzdesi (%)", "Required DE Power (kW)": "Gerekli DE Gücü (kW)", "Gen Type": "Jeneratör Tipi"}
                     )
-                    fig_usage_nc_manevra.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
+                    fig_usage_nc_manevra.update_traces(texttemplate='%{y:.1f}%', textposition='outside', selector=dict(type="bar"))
                     fig_usage_nc_manevra.update_yaxes(range=[0, 110])
                     fig_usage_nc_manevra.update_layout(bargroupgap=0.05)
+                    laps.lap("grafik oluşturma")
                     st.plotly_chart(fig_usage_nc_manevra, use_container_width=True)
+                    laps.lap("grafik gösterimi")
                 else: st.warning(f"{plot_mode_nc} modu için jeneratör kullanım verisi bulunamadı.")
         else:
             st.warning(f"{plot_mode_nc} modu için jeneratör kullanım verisi bulunamadı (işlenmemiş veri boş).")
 
-    elif st.session_state.nc_show_results and st.session_state.nc_results_df.empty:
+    elif st.session_state.nc_show_results and nc_results_df.empty:
         st.warning("Yeni kombinasyon için hesaplama yapıldı ancak özetlenecek sonuç bulunamadı...")
-        if st.session_state.nc_detailed_df.empty:
-            st.error("Detaylı sonuçlar da boş (Yeni Kombinasyon). Girdi değerlerinizi, SFOC verilerini ve jeneratör konfigürasyonunu tekrar kontrol edin.")
\ No newline at end of file
+        if nc_detailed_df.empty:
+            st.error("Detaylı sonuçlar da boş (Yeni Kombinasyon). Girdi değerlerinizi, SFOC verilerini ve jeneratör konfigürasyonunu tekrar kontrol edin.")
+
+def render_page():
+    """ "Yeni Jeneratör Kombinasyonları" sayfasının içeriğini ve mantığını render eder. """
+    st.header("Yeni Jeneratör Kombinasyonları Analizi")
+
+    st.sidebar.header("Yeni Kombinasyon Girdi Ayarları")
+    sfoc_curves_new = current_sfoc_curves()
+    # Widget'lar orijinal haliyle korunuyor
+    main_gen_mcr_new = st.sidebar.number_input("Ana Jeneratör MCR (kW)", min_value=100, value=NEW_COMBINATION_DEFAULTS["main_gen_mcr"], step=100, key="nc_main_gen_mcr")
+    main_gen_qty_new = st.sidebar.number_input("Ana Jeneratör Adedi", min_value=1, value=NEW_COMBINATION_DEFAULTS["main_gen_qty"], step=1, key="nc_main_gen_qty")
+    port_gen_mcr_new = st.sidebar.number_input("Liman Jeneratörü MCR (kW)", min_value=50, value=NEW_COMBINATION_DEFAULTS["port_gen_mcr"], step=50, key="nc_port_gen_mcr")
+    port_gen_qty_new = st.sidebar.number_input("Liman Jeneratörü Adedi", min_value=0, value=NEW_COMBINATION_DEFAULTS["port_gen_qty"], step=1, key="nc_port_gen_qty")
+
+    sea_power_range_new = st.sidebar.slider("Seyir Şaft Güç Aralığı (kW)", 2500, 5500, NEW_COMBINATION_DEFAULTS["sea_power_range"], step=100, key="nc_sea_power_range")
+    maneuver_power_range_new = st.sidebar.slider("Manevra Şaft Güç Aralığı (kW)", 1500, 3500, NEW_COMBINATION_DEFAULTS["maneuver_power_range"], step=100, key="nc_maneuver_power_range")
+    sea_duration_new = st.sidebar.number_input("Seyir Süresi (saat)", min_value=1.0, value=NEW_COMBINATION_DEFAULTS["sea_duration"], step=1.0, key="nc_sea_duration")
+    maneuver_duration_new = st.sidebar.number_input("Manevra Süresi (saat)", min_value=1.0, value=NEW_COMBINATION_DEFAULTS["maneuver_duration"], step=1.0, key="nc_maneuver_duration")
+    main_engine_mcr_ref_new = st.sidebar.number_input("Ana Makine MCR (kW) (Referans İçin)", min_value=1000, value=NEW_COMBINATION_DEFAULTS["main_engine_mcr_ref"], step=100, key="nc_main_engine_mcr_ref")
+    nc_conv_aux_dg_mcr_input = st.sidebar.number_input(
+        "Yardımcı DG MCR Değeri (kW) (Ref. Manevra İçin)",
+        min_value=100, value=NEW_COMBINATION_DEFAULTS["conv_aux_dg_mcr"], step=50, key="nc_conv_aux_dg_mcr"
+    )
+    nc_aux_power_demand_input = st.sidebar.number_input(
+        "Yardımcı Güç İhtiyacı (kW) (Seyir/Manevra)",
+        min_value=0, value=NEW_COMBINATION_DEFAULTS["aux_power_kw"], step=50, key="nc_aux_power"
+    )
+
+    st.sidebar.subheader("Güç Tarama Adımı")
+    power_step_mode_new = st.sidebar.radio(
+        "Tarama Modu", ["Sabit (100 kW)", "Uyarlamalı"], horizontal=True, key="nc_power_step_mode",
+        help="Uyarlamalı modda tarama kaba adımla başlar ve sadece seçilen kombinasyonun veya yakıt eğiminin değiştiği bölgelerde inceltilir."
+    )
+    adaptive_min_step_new = float(ADAPTIVE_SWEEP_MIN_STEP_KW)
+    if power_step_mode_new == "Uyarlamalı":
+        adaptive_min_step_new = st.sidebar.number_input(
+            "En Küçük Tarama Adımı (kW)", min_value=1.0, max_value=100.0,
+            value=float(ADAPTIVE_SWEEP_MIN_STEP_KW), step=1.0, key="nc_adaptive_min_step"
+        )
+
+    load_sharing_new = st.sidebar.selectbox(
+        "Yük Paylaşımı", list(LOAD_SHARING_LABELS), index=list(LOAD_SHARING_LABELS).index(NEW_COMBINATION_DEFAULTS["load_sharing"]),
+        format_func=LOAD_SHARING_LABELS.get, key="nc_load_sharing",
+        help="Ekonomik dispatch, farklı tipteki çalışan jeneratörlerin (Ana + Liman) yükünü eşit artımsal maliyetle paylaştırır."
+    )
+
+    st.sidebar.subheader("Sistem Verimlilikleri (%) (Yeni Kombinasyon İçin)")
+    motor_eff_new_perc = st.sidebar.slider("Yeni - Elektrik Motoru Verimliliği (%)", 90.0, 99.9, NEW_COMBINATION_DEFAULTS["motor_eff"], step=0.1, key="nc_motor_eff_slider")
+    converter_eff_new_perc = st.sidebar.slider("Yeni - Frekans Dönüştürücü Verimliliği (%)", 90.0, 99.9, NEW_COMBINATION_DEFAULTS["converter_eff"], step=0.1, key="nc_converter_eff_slider")
+    switchboard_eff_new_perc = st.sidebar.slider("Yeni - Main Switchboard Verimliliği (%)", 90.0, 99.9, NEW_COMBINATION_DEFAULTS["switchboard_eff"], step=0.1, key="nc_switchboard_eff_slider")
+    generator_elec_eff_new_perc = st.sidebar.slider("Yeni - Alternatör Verimliliği (%)", 90.0, 99.9, NEW_COMBINATION_DEFAULTS["generator_elec_eff"], step=0.1, key="nc_generator_elec_eff_slider")
+
+    load_dependent_eff_new = st.sidebar.checkbox(
+        "Yüke Bağlı Elektriksel Verim", value=NEW_COMBINATION_DEFAULTS["load_dependent_eff"], key="nc_load_dependent_eff",
+        help="Yukarıdaki verimler anma verimidir; kısmi yükte düşer (anma gücü: Referans Ana Makine MCR)."
+    )
+    rated_shaft_power_new = main_engine_mcr_ref_new if load_dependent_eff_new else None
+
+    total_elec_eff_new_factor = total_electrical_efficiency(motor_eff_new_perc, converter_eff_new_perc, switchboard_eff_new_perc, generator_elec_eff_new_perc)
+
+    if total_elec_eff_new_factor <= 1e-6:
+        st.warning("Yeni Kombinasyon için toplam sistem verimliliği (motor*conv*pano*alt) sıfıra çok yakın veya sıfır. Lütfen verimlilikleri kontrol edin.")
+
+    # Sonuç tabloları oturumlar arası paylaşılan depoda; session_state sadece içerik anahtarını tutar.
+    if "nc_results_key" not in st.session_state: st.session_state.nc_results_key = None
+    result_store = get_result_store()
+    if "nc_show_results" not in st.session_state: st.session_state.nc_show_results = False
+
+    # "HESAPLA" butonu fonksiyon çağrısı güncelleniyor
+    if st.sidebar.button("Yeni Kombinasyon HESAPLA", key="nc_calculate_button"):
+        if total_elec_eff_new_factor < 1e-9 and sea_power_range_new[1] > sea_power_range_new[0]:
+             st.error("Hesaplama yapılamadı: Seyir modu için toplam elektriksel verimlilik faktörü çok düşük.")
+             st.session_state.nc_show_results = False
+             st.session_state.nc_results_key = None
+        elif nc_aux_power_demand_input > 0 and nc_conv_aux_dg_mcr_input <= 0 :
+            st.error("Manevra için yardımcı güç ihtiyacı girilmiş ancak Referans Yardımcı DG MCR değeri pozitif değil.")
+            st.session_state.nc_show_results = False
+            st.session_state.nc_results_key = None
+        else:
+            # DEĞİŞİKLİK: Fonksiyon çağrısından p_sfoc_data argümanı kaldırılıyor.
+            with telemetry.stage("Hesaplama", cache="calculate_all_results_for_new_combinations"):
+                nc_frames = calculate_all_results_for_new_combinations(
+                    main_gen_mcr_new, main_gen_qty_new, port_gen_mcr_new, port_gen_qty_new,
+                    sea_power_range_new, maneuver_power_range_new,
+                    sea_duration_new, maneuver_duration_new,
+                    main_engine_mcr_ref_new,
+                    total_elec_eff_new_factor,
+                    CONVENTIONAL_SHAFT_EFFICIENCY,
+                    nc_aux_power_demand_input,
+                    nc_conv_aux_dg_mcr_input,
+                    sfoc_curves_new.subset(NEW_COMBINATION_SFOC_KEYS),
+                    adaptive_min_step_new if power_step_mode_new == "Uyarlamalı" else None,
+                    load_sharing_new,
+                    load_dependent_eff_new
+                )
+            with telemetry.stage("Sonuç deposu (kayıt)"):
+                st.session_state.nc_results_key = result_store.put(nc_frames)
+            nc_results_df, nc_detailed_df, nc_usage_df = result_store.get(st.session_state.nc_results_key)
+            st.session_state.nc_show_results = True
+            if nc_results_df.empty and nc_detailed_df.empty:
+                st.warning("Hesaplama yapıldı ancak 'Yeni Kombinasyonlar' için gösterilecek sonuç bulunamadı.")
+                
+    # --- Sonuçları Göster ---
+    _render_new_combination_results_section()
+
+    # --- Çalışma Zarfı (Dispatch Kırılma Noktaları) ---
+    st.markdown("---")
+    with st.expander("Çalışma Zarfı (Dispatch Kırılma Noktaları)"), telemetry.stage("Çalışma zarfı"):
+        dispatch_map_nc = get_dispatch_map(main_gen_mcr_new, main_gen_qty_new, port_gen_mcr_new, port_gen_qty_new, sfoc_curves_new)
+        st.caption(
+            f"Seçilen filo için {dispatch_map_nc.n_segments} segment bulundu "
+            f"(sınır hassasiyeti {dispatch_map_nc.tolerance_kw} kW, {dispatch_map_nc.evaluations} değerlendirme)."
+        )
+        st.dataframe(dispatch_map_nc.envelope_frame(), use_container_width=True)
+
+        envelope_powers_nc = np.linspace(0, dispatch_map_nc.breakpoints[-1], 600)[1:]
+        envelope_plot_df_nc = pd.DataFrame({
+            "Required DE Power (kW)": envelope_powers_nc,
+            "Fuel Rate (ton/h)": dispatch_map_nc.fuel_rate(envelope_powers_nc),
+            "Strategy": [STRATEGY_LABELS.get(k, k) for k in dispatch_map_nc.segment_keys[np.maximum(dispatch_map_nc.segment_index(envelope_powers_nc), 0)]]
+        }).dropna(subset=["Fuel Rate (ton/h)"])
+        if not envelope_plot_df_nc.empty:
+            fig_envelope_nc = px.scatter(
+                envelope_plot_df_nc, x="Required DE Power (kW)", y="Fuel Rate (ton/h)", color="Strategy",
+                title="Çalışma Zarfı - Yakıt Debisi ve Seçilen Strateji",
+                labels={"Required DE Power (kW)": "Gerekli DE Gücü (kW)", "Fuel Rate (ton/h)": "Yakıt Debisi (ton/saat)", "Strategy": "Strateji"}
+            )
+            fig_envelope_nc.update_traces(marker=dict(size=4))
+            for breakpoint_nc in dispatch_map_nc.breakpoints[1:-1]:
+                fig_envelope_nc.add_vline(x=breakpoint_nc, line_width=1, line_dash="dot", line_color="grey")
+            st.plotly_chart(fig_envelope_nc, use_container_width=True)
+
+    # --- Zaman Alanı Sefer Simülasyonu (Devreye Alma / Çıkarma Histerezisli) ---
+    with st.expander("Zaman Alanı Sefer Simülasyonu (Jeneratör Devreye Alma/Çıkarma)"):
+        st.caption(
+            f"CSV yük profili: '{PROFILE_TIME_COLUMN}' (s), '{PROFILE_POWER_COLUMN}' (kW) ve isteğe bağlı "
+            f"'{PROFILE_MODE_COLUMN}' (Seyir/Manevra) sütunları. Şaft gücü yukarıdaki verimliliklerle DE gücüne çevrilir."
+        )
+        profile_file_nc = st.file_uploader("Yük Profili (CSV)", type=["csv"], key="nc_sim_profile_file")
+        sim_col1_nc, sim_col2_nc, sim_col3_nc, sim_col4_nc = st.columns(4)
+        sim_min_run_min_nc = sim_col1_nc.number_input("Min. Çalışma Süresi (dk)", min_value=0.0, value=SIM_MIN_RUN_TIME_S / 60.0, step=5.0, key="nc_sim_min_run")
+        sim_hysteresis_perc_nc = sim_col2_nc.number_input("Histerezis Bandı (%)", min_value=0.0, max_value=50.0, value=SIM_HYSTERESIS_FRACTION * 100, step=1.0, key="nc_sim_hysteresis")
+        sim_start_fuel_main_nc = sim_col3_nc.number_input("Ana Jen. Devreye Alma Yakıtı (kg)", min_value=0.0, value=SIM_START_FUEL_KG["Ana"], step=1.0, key="nc_sim_start_fuel_main")
+        sim_start_fuel_port_nc = sim_col4_nc.number_input("Liman Jen. Devreye Alma Yakıtı (kg)", min_value=0.0, value=SIM_START_FUEL_KG["Liman"], step=1.0, key="nc_sim_start_fuel_port")
+
+        if profile_file_nc is not None and st.button("Simülasyonu Çalıştır", key="nc_sim_run_button"):
+            try:
+                profile_nc = read_load_profile(profile_file_nc)
+            except ValueError as e:
+                st.error(f"Yük profili okunamadı: {e}")
+            else:
+                de_profile_nc = required_de_power_for_mode(
+                    profile_nc[PROFILE_POWER_COLUMN].to_numpy(), profile_nc[PROFILE_MODE_COLUMN].astype(str).to_numpy(),
+                    total_elec_eff_new_factor, CONVENTIONAL_SHAFT_EFFICIENCY, PROPULSION_PATH_INV_EFFICIENCY, nc_aux_power_demand_input,
+                    electrical_efficiency_table(), rated_shaft_power_new
+                )
+                sim_result_nc = simulate_voyage(
+                    profile_nc[PROFILE_TIME_COLUMN].to_numpy(), de_profile_nc,
+                    get_dispatch_map(main_gen_mcr_new, main_gen_qty_new, port_gen_mcr_new, port_gen_qty_new, sfoc_curves_new),
+                    min_run_time_s=sim_min_run_min_nc * 60.0,
+                    start_fuel_kg={"Ana": sim_start_fuel_main_nc, "Liman": sim_start_fuel_port_nc},
+                    hysteresis_fraction=sim_hysteresis_perc_nc / 100.0
+                )
+                met_col1_nc, met_col2_nc, met_col3_nc = st.columns(3)
+                met_col1_nc.metric("Toplam Yakıt (ton)", f"{sim_result_nc['total_fuel_t']:.2f}",
+                                   delta=f"{sim_result_nc['total_fuel_t'] - sim_result_nc['memoryless_fuel_t']:+.2f} (anlık optimuma göre)", delta_color="inverse")
+                met_col2_nc.metric("Devreye Alma Yakıtı (ton)", f"{sim_result_nc['startup_fuel_t']:.3f}")
+                met_col3_nc.metric("Devreye Alma Sayısı (Ana / Liman)", f"{sim_result_nc['starts']['Ana']} / {sim_result_nc['starts']['Liman']}")
+                st.caption(f"{len(profile_nc)} örnek, {sim_result_nc['blocks_processed']} durum bloğu işlendi; "
+                           f"CO2: {sim_result_nc['co2_t']:.2f} ton.")
+                st.dataframe(pd.DataFrame(
+                    {"Çalışma (birim-saat)": sim_result_nc["running_hours"],
+                     **{f"{label} Yük (birim-saat)": {gen_kind: hours[i] for gen_kind, hours in sim_result_nc["load_band_hours"].items()}
+                        for i, label in enumerate(LOAD_BAND_LABELS)}}
+                ).rename_axis("Jeneratör").round(2), use_container_width=True)
+                st.dataframe(sim_result_nc["events"], use_container_width=True)
+
+    # --- Enerji Depolama (Batarya) ile Tepe Tıraşlama / Düşük Yük Desteği ---
+    with st.expander("Enerji Depolama (Batarya) Dispatch Optimizasyonu"):
+        st.caption(
+            "Batarya, yük profili boyunca şarj/deşarj planı dinamik programlama ile optimize edilerek seçilen filoya eklenir. "
+            f"Profil biçimi yukarıdaki simülasyonla aynıdır; SOC {BATTERY_SOC_LIMITS[0]*100:.0f}-{BATTERY_SOC_LIMITS[1]*100:.0f}% aralığında tutulur."
+        )
+        bess_profile_file_nc = st.file_uploader("Yük Profili (CSV)", type=["csv"], key="nc_bess_profile_file")
+        bess_col1_nc, bess_col2_nc, bess_col3_nc, bess_col4_nc = st.columns(4)
+        bess_capacity_nc = bess_col1_nc.number_input("Batarya Kapasitesi (kWh)", min_value=10.0, value=1000.0, step=50.0, key="nc_bess_capacity")
+        bess_c_rate_nc = bess_col2_nc.number_input("C-Oranı (1/saat)", min_value=0.1, max_value=5.0, value=1.0, step=0.1, key="nc_bess_c_rate")
+        bess_rte_nc = bess_col3_nc.number_input("Tur Verimliliği (%)", min_value=50.0, max_value=100.0, value=90.0, step=0.5, key="nc_bess_rte")
+        bess_initial_soc_nc = bess_col4_nc.number_input("Başlangıç SOC (%)", min_value=BATTERY_SOC_LIMITS[0] * 100, max_value=BATTERY_SOC_LIMITS[1] * 100, value=50.0, step=5.0, key="nc_bess_initial_soc")
+
+        if bess_profile_file_nc is not None and st.button("Batarya Dispatch'ini Optimize Et", key="nc_bess_run_button"):
+            try:
+                bess_profile_nc = read_load_profile(bess_profile_file_nc)
+            except ValueError as e:
+                st.error(f"Yük profili okunamadı: {e}")
+            else:
+                bess_times_s_nc = bess_profile_nc[PROFILE_TIME_COLUMN].to_numpy(dtype=float)
+                bess_de_profile_nc = required_de_power_for_mode(
+                    bess_profile_nc[PROFILE_POWER_COLUMN].to_numpy(), bess_profile_nc[PROFILE_MODE_COLUMN].astype(str).to_numpy(),
+                    total_elec_eff_new_factor, CONVENTIONAL_SHAFT_EFFICIENCY, PROPULSION_PATH_INV_EFFICIENCY, nc_aux_power_demand_input,
+                    electrical_efficiency_table(), rated_shaft_power_new
+                )
+                try:
+                    bess_result_nc = optimize_storage_dispatch(
+                        bess_de_profile_nc, sample_durations_h(bess_times_s_nc),
+                        get_dispatch_map(main_gen_mcr_new, main_gen_qty_new, port_gen_mcr_new, port_gen_qty_new, sfoc_curves_new),
+                        bess_capacity_nc, bess_c_rate_nc, bess_rte_nc / 100.0, initial_soc=bess_initial_soc_nc / 100.0
+                    )
+                except ValueError as e:
+                    st.error(f"Batarya dispatch'i çözülemedi: {e}")
+                else:
+                    bess_met1_nc, bess_met2_nc, bess_met3_nc = st.columns(3)
+                    bess_met1_nc.metric("Bataryalı Yakıt (ton)", f"{bess_result_nc['total_fuel_t']:.3f}",
+                                        delta=f"{-bess_result_nc['fuel_saving_t']:+.3f} (sadece dizele göre)", delta_color="inverse")
+                    bess_met2_nc.metric("Deşarj Edilen Enerji (kWh)", f"{bess_result_nc['discharged_kwh']:.0f}")
+                    bess_met3_nc.metric("Karşılanamayan Enerji (kWh)", f"{bess_result_nc['unserved_kwh']:.1f}",
+                                        delta=f"{bess_result_nc['unserved_kwh'] - bess_result_nc['diesel_only_unserved_kwh']:+.1f} (sadece dizele göre)", delta_color="inverse")
+                    bess_timeline_nc = bess_result_nc["timeline"]
+                    bess_timeline_nc["Time (h)"] = (bess_times_s_nc - bess_times_s_nc[0]) / 3600.0
+                    bess_plot_df_nc = bess_timeline_nc.melt(
+                        id_vars="Time (h)", value_vars=["Demand (kW)", "Diesel Power (kW)", "Battery Power (kW)"],
+                        var_name="Series", value_name="Power (kW)"
+                    )
+                    bess_plot_df_nc = drilldown_frame(bess_plot_df_nc, "Time (h)", "Power (kW)", "Series",
+                                                      key="nc_bess_plot_range", label="Güç Grafiği Zaman Aralığı (saat)")
+                    st.plotly_chart(line_figure(
+                        bess_plot_df_nc, x="Time (h)", y="Power (kW)", color="Series",
+                        title="Güç Dağılımı (Batarya +: Deşarj, -: Şarj)",
+                        labels={"Time (h)": "Zaman (saat)", "Power (kW)": "Güç (kW)", "Series": "Seri"}
+                    ), use_container_width=True)
+                    st.plotly_chart(line_figure(
+                        drilldown_frame(bess_timeline_nc, "Time (h)", "SOC End (%)", key="nc_soc_plot_range", label="SOC Grafiği Zaman Aralığı (saat)"),
+                        x="Time (h)", y="SOC End (%)", title="Batarya Şarj Durumu (SOC)",
+                        labels={"Time (h)": "Zaman (saat)", "SOC End (%)": "SOC (%)"}
+                    ), use_container_width=True)
+                    st.caption(f"{len(bess_profile_nc)} örnek, {bess_result_nc['decision_steps']} karar adımında, {bess_result_nc['soc_points']} SOC durumu üzerinde çözüldü.")
@@ -0,0 +1,61 @@
+# plot_decimation.py
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from config import PLOT_MAX_POINTS_PER_CHART, PLOT_MAX_BAR_GROUPS, PLOT_WEBGL_MIN_POINTS
+
+def decimate_frame(df, x, y, color=None, max_points=PLOT_MAX_POINTS_PER_CHART, x_range=None):
+    """
+    Grafiğe gönderilecek satırlar. `x_range` verilirse tablo önce bu aralığa süzülür (yakınlaştırılan aralık).
+    Kalan satır sayısı `max_points`'i aşıyorsa her seri (`color`) x ekseninde eşit genişlikte kovalara bölünür ve
+    her kovadan en küçük ve en büyük y değerli satırlar tutulur (min/maks seyreltme: tepe ve çukurlar kaybolmaz).
+    Satırlar olduğu gibi seçildiğinden hover / text sütunları korunur; sıra değişmez.
+    """
+    if x_range is not None: df = df[(df[x] >= x_range[0]) & (df[x] <= x_range[1])]
+    if len(df) <= max_points: return df
+    series = pd.factorize(df[color])[0] if color else np.zeros(len(df), dtype=int)
+    n_buckets = max(max_points // (2 * max(series.max() + 1, 1)), 1)
+    xs = df[x].to_numpy(dtype=float)
+    ys = df[y].to_numpy(dtype=float)
+    valid = np.isfinite(xs) & np.isfinite(ys)
+    if not valid.any(): return df.iloc[:0]
+    positions = np.flatnonzero(valid)
+    xs, ys = xs[positions], ys[positions]
+    lo, hi = xs.min(), xs.max()
+    bucket = np.minimum(((xs - lo) / (hi - lo) * n_buckets).astype(int), n_buckets - 1) if hi > lo else np.zeros(len(xs), dtype=int)
+    group = series[positions] * n_buckets + bucket
+    # Grup içinde y'ye göre sıralı konumlar: her grubun ilk ve son elemanı min ve maks
+    order = np.lexsort((ys, group))
+    group_sorted = group[order]
+    first = np.r_[True, group_sorted[1:] != group_sorted[:-1]]
+    last = np.r_[group_sorted[1:] != group_sorted[:-1], True]
+    keep = np.unique(positions[order[first | last]])
+    return df.iloc[keep]
+
+def drilldown_frame(df, x, y, color=None, key=None, label="Yakınlaştırma Aralığı"):
+    """
+    Grafik için tablo: satır sayısı grafik sınırını aşarsa x ekseni için aralık kaydırıcısı gösterilir; tam aralıkta
+    seyreltilmiş genel görünüm, daraltılmış aralıkta o aralığın satırları (gerekmedikçe seyreltmeden) çizilir.
+    """
+    if len(df) <= PLOT_MAX_POINTS_PER_CHART: return df
+    lo, hi = float(df[x].min()), float(df[x].max())
+    x_range = st.slider(label, lo, hi, (lo, hi), key=key) if hi > lo else (lo, hi)
+    plot_df = decimate_frame(df, x, y, color, x_range=None if tuple(x_range) == (lo, hi) else x_range)
+    st.caption(f"{len(df)} satırdan {len(plot_df)} nokta çiziliyor; tam çözünürlük için aralığı daraltın.")
+    return plot_df
+
+def sweep_figure(df, x, y, color=None, **px_kwargs):
+    """
+    Tarama sonucu grafiği: x değeri az ise px.bar, çok ise (çubuklar okunamaz hale gelir) WebGL çizgi + işaretçi.
+    Çubuklara özgü güncellemeler `fig.update_traces(..., selector=dict(type="bar"))` ile yapılmalı.
+    """
+    if df[x].nunique() <= PLOT_MAX_BAR_GROUPS:
+        return px.bar(df, x=x, y=y, color=color, **px_kwargs)
+    for bar_only in ("barmode", "text_auto", "text"): px_kwargs.pop(bar_only, None)
+    return px.line(df.sort_values(x), x=x, y=y, color=color, markers=True, render_mode="webgl", **px_kwargs)
+
+def line_figure(df, x, y, color=None, **px_kwargs):
+    # Nokta sayısı yüksekse WebGL (scattergl) izleriyle px.line
+    return px.line(df, x=x, y=y, color=color, render_mode="webgl" if len(df) > PLOT_WEBGL_MIN_POINTS else "auto", **px_kwargs)
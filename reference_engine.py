@@ -0,0 +1,71 @@
+# reference_engine.py
+import numpy as np
+import streamlit as st
+
+from core_calculations import CompiledSfocCurve
+from sfoc_library import SFOC_CACHE_HASH_FUNCS
+
+# Geleneksel sistemde manevrada çalışan sabit yardımcı DG sayısı (sayfalardaki SABIT_YARDIMCI_DG_SAYISI_MANEVRA)
+CONVENTIONAL_AUX_DG_COUNT_MANEUVER = 2
+# conventional_reference'ın kullandığı eğriler (çağıranlar SfocCurveSet.subset ile sadece bunları verir)
+REFERENCE_SFOC_KEYS = ("main_engine", "aux_dg")
+
+def _vector_fuel(power_kw, load_percent, duration_h, sfoc_curve):
+    # calculate_fuel'in vektörel karşılığı: güç/süre <= 0 veya SFOC < 50 ise 0 ton.
+    power_kw = np.asarray(power_kw, dtype=float)
+    duration_h = np.asarray(duration_h, dtype=float)
+    sfoc = sfoc_curve(load_percent)
+    valid = (power_kw > 0) & (duration_h > 0) & np.isfinite(sfoc) & (sfoc >= 50)
+    return np.where(valid, power_kw * duration_h * np.where(valid, sfoc, 0.0) / 1_000_000, 0.0)
+
+def conventional_reference_fuel(shaft_power_kw, mode_label, duration_h, main_engine_mcr, aux_dg_mcr, aux_power_demand_kw,
+                                sfoc_main_engine, sfoc_aux_dg, aux_dg_count=CONVENTIONAL_AUX_DG_COUNT_MANEUVER):
+    """
+    Geleneksel sistemin (ana makine + manevrada yardımcı DG'ler) nokta bazında yakıtı (ton), vektörel.
+    Seyir: sadece ana makine. Manevra: ana makine + `aux_dg_count` yardımcı DG yardımcı güç ihtiyacını eşit paylaşır.
+    Döndürür: (toplam yakıt, ana makine yükü %) dizileri.
+    """
+    sfoc_main_engine = sfoc_main_engine if isinstance(sfoc_main_engine, CompiledSfocCurve) else CompiledSfocCurve(sfoc_main_engine)
+    sfoc_aux_dg = sfoc_aux_dg if isinstance(sfoc_aux_dg, CompiledSfocCurve) else CompiledSfocCurve(sfoc_aux_dg)
+    shaft_power_kw = np.maximum(np.asarray(shaft_power_kw, dtype=float), 0.0)
+    mode_label = np.broadcast_to(np.asarray(mode_label), shaft_power_kw.shape)
+    duration_h = np.broadcast_to(np.asarray(duration_h, dtype=float), shaft_power_kw.shape)
+
+    if main_engine_mcr <= 0:
+        return np.zeros_like(shaft_power_kw), np.zeros_like(shaft_power_kw)
+    main_engine_load = shaft_power_kw / main_engine_mcr * 100
+    main_engine_fuel = _vector_fuel(shaft_power_kw, main_engine_load, duration_h, sfoc_main_engine)
+
+    aux_dg_fuel = np.zeros_like(shaft_power_kw)
+    if aux_power_demand_kw > 0 and aux_dg_mcr > 0 and aux_dg_count > 0:
+        power_per_aux_dg = aux_power_demand_kw / aux_dg_count
+        if power_per_aux_dg <= aux_dg_mcr:
+            load_per_aux_dg = power_per_aux_dg / aux_dg_mcr * 100
+            aux_dg_fuel = _vector_fuel(np.full_like(shaft_power_kw, power_per_aux_dg), load_per_aux_dg, duration_h, sfoc_aux_dg) * aux_dg_count
+
+    total_fuel = np.where(mode_label == "Manevra", main_engine_fuel + aux_dg_fuel, np.where(mode_label == "Seyir", main_engine_fuel, 0.0))
+    return total_fuel, main_engine_load
+
+@st.cache_data(hash_funcs=SFOC_CACHE_HASH_FUNCS)
+def conventional_reference(sea_power_range, maneuver_power_range, sea_duration, maneuver_duration,
+                           main_engine_mcr, aux_dg_mcr, aux_power_demand_kw, sfoc_curves):
+    """
+    Sayfaların "Ana Makine Referans" taraması (100 kW adım): denenen jeneratör konfigürasyonundan bağımsızdır,
+    bu yüzden bir kez hesaplanıp sayfalar ve karşılaştırmalar arasında paylaşılır. `sfoc_curves`: REFERENCE_SFOC_KEYS eğrileri.
+    Döndürür: {"Seyir": ..., "Manevra": ...}; her mod için yakıtı pozitif noktaların "shaft_power_kw", "fuel_t",
+    "load_percent" dizileri ve "total_fuel_t" (sayfalardaki döngülerle aynı sırada toplanır).
+    """
+    reference = {}
+    for mode_label, power_range, duration in [("Seyir", sea_power_range, sea_duration), ("Manevra", maneuver_power_range, maneuver_duration)]:
+        shaft_power = np.arange(power_range[0], power_range[1] + 100, 100, dtype=float)
+        shaft_power = shaft_power[shaft_power > 0] if mode_label == "Seyir" else np.maximum(shaft_power, 0.0)
+        fuel, load = conventional_reference_fuel(
+            shaft_power, mode_label, duration, main_engine_mcr, aux_dg_mcr, aux_power_demand_kw,
+            sfoc_curves["main_engine"], sfoc_curves["aux_dg"]
+        )
+        positive = fuel > 0
+        reference[mode_label] = {
+            "shaft_power_kw": shaft_power[positive], "fuel_t": fuel[positive], "load_percent": load[positive],
+            "total_fuel_t": float(sum(fuel[positive].tolist()))
+        }
+    return reference
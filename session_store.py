@@ -0,0 +1,155 @@
+# session_store.py
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import SESSION_RESULT_SPILL_DIR, SESSION_RESULT_SPILL_IDLE_S, SESSION_RESULT_EXPIRE_S
+
+# float32'ye çevrilen sütunlar için geri dönüşte uygulanacak en fazla ondalık basamak
+_FLOAT32_MAX_DECIMALS = 6
+# Bakım (diske taşıma / silme) taramasının en sık çalışma aralığı (s)
+_HOUSEKEEPING_INTERVAL_S = 60
+
+def _float_decimals(values):
+    # float32'ye çevrilip geri yuvarlandığında değerleri birebir geri veren en küçük ondalık sayısı; yoksa None.
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0: return 0
+    if np.max(np.abs(finite)) >= 1e6: return None
+    restored = finite.astype(np.float32).astype(np.float64)
+    for decimals in range(_FLOAT32_MAX_DECIMALS + 1):
+        if np.array_equal(np.round(finite, decimals), finite) and np.array_equal(np.round(restored, decimals), finite):
+            return decimals
+    return None
+
+def compact_frame(df):
+    """
+    DataFrame'i bellekte sıkıştırılmış biçime çevirir: tekrar eden metinler kategorik, kayıpsız geri
+    döndürülebilen ondalıklı sütunlar float32, tamsayılar en küçük uygun tipe. Döndürür: (sıkıştırılmış
+    tablo, geri dönüş bilgisi); expand_frame aynı tabloyu orijinal tipleriyle geri verir.
+    """
+    compact = df.copy()
+    restore = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_string_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            if series.map(type).eq(str).all() and series.nunique() <= max(len(series) // 2, 1):
+                compact[column] = series.astype("category")
+                restore[column] = (series.dtype, None)
+        elif series.dtype == np.float64:
+            decimals = _float_decimals(series.to_numpy())
+            if decimals is not None:
+                compact[column] = series.astype(np.float32)
+                restore[column] = (np.float64, decimals)
+        elif pd.api.types.is_integer_dtype(series.dtype) and len(series):
+            downcast = pd.to_numeric(series, downcast="integer")
+            if downcast.dtype != series.dtype:
+                compact[column] = downcast
+                restore[column] = (series.dtype, None)
+    return compact, restore
+
+def expand_frame(compact, restore):
+    df = compact.copy()
+    for column, (dtype, decimals) in restore.items():
+        if decimals is not None:
+            df[column] = df[column].astype(np.float64).round(decimals)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+def _content_hash(frames):
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(repr((list(frame.columns), [str(t) for t in frame.dtypes], frame.shape)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+class ResultStore:
+    """
+    Oturumlar arasında paylaşılan sonuç tablosu deposu. Oturumlar tabloların kendisini değil, içerik
+    özetini (anahtar) session_state'te tutar; aynı girdilerle üretilen sonuçlar tek kopya saklanır.
+    Tablolar sıkıştırılmış tiplerle tutulur, `spill_idle_s` boyunca erişilmeyenler diske yazılıp
+    bellekten atılır ve ilk erişimde yeniden yüklenir; `expire_s` boyunca erişilmeyenler silinir.
+    Diske yazma süreç başına özel (mkdtemp, 0700) bir klasöre, tablo başına parquet dosyası olarak yapılır
+    (çalıştırılabilir içerik taşımaz); geri dönüş bilgisi bellekte kalır, klasör süreç çıkışında silinir.
+    """
+    def __init__(self, spill_dir=SESSION_RESULT_SPILL_DIR, spill_idle_s=SESSION_RESULT_SPILL_IDLE_S,
+                 expire_s=SESSION_RESULT_EXPIRE_S):
+        self.spill_dir = spill_dir
+        self._private_dir = None
+        self.spill_idle_s = spill_idle_s
+        self.expire_s = expire_s
+        self._entries = {} # anahtar -> {"frames": [sıkıştırılmış] | None, "restore": [geri dönüş], "paths": [str] | None, "last_access": t}
+        self._lock = threading.Lock()
+        self._last_housekeeping = 0.0
+
+    def put(self, frames):
+        # Sonuç tablolarını (demet) depoya koyar ve içerik anahtarını döndürür; aynı içerik zaten varsa onu paylaşır.
+        compacted = [compact_frame(frame) for frame in frames]
+        key = _content_hash([compact for compact, _ in compacted])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = {"frames": [compact for compact, _ in compacted], "restore": [restore for _, restore in compacted],
+                                      "paths": None, "last_access": time.time()}
+            else:
+                entry["last_access"] = time.time()
+        self._housekeeping()
+        return key
+
+    def get(self, key, count=3):
+        # Anahtarın tablolarını orijinal tipleriyle döndürür; anahtar yoksa/süresi dolmuşsa `count` adet boş tablo.
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None:
+                if entry["frames"] is None: entry["frames"] = [pd.read_parquet(path) for path in entry["paths"]]
+                entry["last_access"] = time.time()
+                compacted = list(zip(entry["frames"], entry["restore"]))
+        self._housekeeping()
+        if entry is None: return tuple(pd.DataFrame() for _ in range(count))
+        return tuple(expand_frame(compact, restore) for compact, restore in compacted)
+
+    def memory_usage(self):
+        # Bellekte tutulan (diske taşınmamış) tabloların toplam boyutu (bayt) ve kayıt sayıları
+        with self._lock:
+            resident = [e for e in self._entries.values() if e["frames"] is not None]
+            nbytes = sum(int(compact.memory_usage(deep=True).sum()) for e in resident for compact in e["frames"])
+            return {"entries": len(self._entries), "resident": len(resident), "bytes": nbytes}
+
+    def _spill_paths(self, key, count):
+        # Özel klasör ilk taşımada oluşturulur: adı tahmin edilemez ve sadece sunucu kullanıcısına açıktır
+        if self._private_dir is None:
+            if self.spill_dir: os.makedirs(self.spill_dir, mode=0o700, exist_ok=True)
+            self._private_dir = tempfile.mkdtemp(prefix="de_propulsion_results_", dir=self.spill_dir or None)
+            atexit.register(shutil.rmtree, self._private_dir, ignore_errors=True)
+        return [os.path.join(self._private_dir, f"{key}_{i}.parquet") for i in range(count)]
+
+    def _housekeeping(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            if now - self._last_housekeeping < _HOUSEKEEPING_INTERVAL_S: return
+            self._last_housekeeping = now
+            for key, entry in list(self._entries.items()):
+                idle = now - entry["last_access"]
+                if idle >= self.expire_s:
+                    for path in entry["paths"] or []:
+                        if os.path.exists(path): os.remove(path)
+                    del self._entries[key]
+                elif idle >= self.spill_idle_s and entry["frames"] is not None:
+                    if entry["paths"] is None:
+                        paths = self._spill_paths(key, len(entry["frames"]))
+                        for compact, path in zip(entry["frames"], paths): compact.to_parquet(path)
+                        entry["paths"] = paths
+                    entry["frames"] = None
+
+@st.cache_resource
+def get_result_store():
+    # Sunucu süreci başına tek depo; tüm oturumlar paylaşır.
+    return ResultStore()
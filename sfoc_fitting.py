@@ -0,0 +1,115 @@
+# sfoc_fitting.py
+import json
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    SFOC_FIT_DEGREE,
+    SFOC_FIT_CHUNK_ROWS,
+    SFOC_FIT_MAX_PASSES,
+    SFOC_FIT_HUBER_K,
+    SFOC_FIT_VALID_LOAD_RANGE,
+    SFOC_FIT_VALID_SFOC_RANGE
+)
+from core_calculations import CompiledSfocCurve
+
+# Log dosyalarındaki (CSV) varsayılan sütun adları
+LOG_LOAD_COLUMN = "load_pct"       # Motor yükü (%)
+LOG_POWER_COLUMN = "power_kw"      # Motor çıkış gücü (kW); yoksa yük ve MCR'dan hesaplanır
+LOG_FUEL_COLUMN = "fuel_kg_h"      # Yakıt debisi (kg/saat)
+
+# Robust ölçek (MAD) tahmini için artık histogramı: sabit bellekle akan veri üzerinde medyan
+_RESIDUAL_HIST_EDGES = np.linspace(0.0, 100.0, 4001) # g/kWh
+
+def _iter_log_chunks(log_paths, engine_mcr_kw, chunk_rows, load_column, power_column, fuel_column):
+    # Logları parça parça okur; her parça için (yük/100, SFOC g/kWh) dizileri üretir. Bellek parça boyutuyla sınırlı.
+    for path in log_paths:
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in (load_column, power_column, fuel_column) if c in header]
+        if load_column not in usecols or fuel_column not in usecols:
+            raise ValueError(f"{path}: '{load_column}' ve '{fuel_column}' sütunları gerekli.")
+        if power_column not in usecols and not engine_mcr_kw:
+            raise ValueError(f"{path}: '{power_column}' sütunu yoksa engine_mcr_kw verilmelidir.")
+        for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows, dtype=np.float64):
+            load = chunk[load_column].to_numpy()
+            power = chunk[power_column].to_numpy() if power_column in chunk else load * engine_mcr_kw / 100.0
+            fuel = chunk[fuel_column].to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sfoc = fuel * 1000.0 / power
+            valid = (np.isfinite(load) & np.isfinite(sfoc) & (power > 0) & (fuel > 0) &
+                     (load >= SFOC_FIT_VALID_LOAD_RANGE[0]) & (load <= SFOC_FIT_VALID_LOAD_RANGE[1]) &
+                     (sfoc >= SFOC_FIT_VALID_SFOC_RANGE[0]) & (sfoc <= SFOC_FIT_VALID_SFOC_RANGE[1]))
+            if valid.any(): yield load[valid] / 100.0, sfoc[valid]
+
+def _median_from_hist(counts):
+    cumulative = np.cumsum(counts)
+    if cumulative[-1] == 0: return None
+    i = int(np.searchsorted(cumulative, cumulative[-1] / 2.0))
+    return (_RESIDUAL_HIST_EDGES[i] + _RESIDUAL_HIST_EDGES[i + 1]) / 2.0
+
+def fit_sfoc_curve_from_logs(log_paths, engine_mcr_kw=None, degree=SFOC_FIT_DEGREE, chunk_rows=SFOC_FIT_CHUNK_ROWS,
+                             max_passes=SFOC_FIT_MAX_PASSES, huber_k=SFOC_FIT_HUBER_K,
+                             load_column=LOG_LOAD_COLUMN, power_column=LOG_POWER_COLUMN, fuel_column=LOG_FUEL_COLUMN):
+    """
+    Tezgah testi / gemi üstü debimetre loglarından SFOC(yük) polinomu uydurur.
+
+    Her geçişte loglar parça parça okunur ve ağırlıklı normal denklemler (XᵀWX, XᵀWy) vektörel
+    olarak biriktirilir; bellek kullanımı log boyutundan bağımsızdır. İlk geçiş sıradan en küçük
+    kareler, sonrakiler Huber ağırlıklı (IRLS) geçişlerdir; ölçek, artıkların sabit boyutlu
+    histogramından MAD ile tahmin edilir. Katsayılar değişmeyi bırakınca durur.
+    Döndürür: (CompiledSfocCurve, bilgi sözlüğü)
+    """
+    log_paths = [log_paths] if isinstance(log_paths, str) else list(log_paths)
+    n_coef = degree + 1
+    coefficients, scale = None, None
+    passes_done, n_samples = 0, 0
+
+    for pass_no in range(max_passes):
+        xtwx = np.zeros((n_coef, n_coef)); xtwy = np.zeros(n_coef)
+        residual_hist = np.zeros(len(_RESIDUAL_HIST_EDGES) - 1, dtype=np.int64)
+        sum_sq_residual, n_samples = 0.0, 0
+        for x, y in _iter_log_chunks(log_paths, engine_mcr_kw, chunk_rows, load_column, power_column, fuel_column):
+            design = np.vander(x, n_coef)
+            weights = np.ones_like(y)
+            if coefficients is not None:
+                abs_residual = np.abs(y - design @ coefficients)
+                residual_hist += np.histogram(np.minimum(abs_residual, _RESIDUAL_HIST_EDGES[-1] - 1e-9), bins=_RESIDUAL_HIST_EDGES)[0]
+                sum_sq_residual += float(np.sum(abs_residual ** 2))
+                if scale is None: scale = max(float(np.median(abs_residual)) / 0.6745, 1e-6) # İlk parçadan başlangıç ölçeği
+                threshold = huber_k * scale
+                weights = np.where(abs_residual <= threshold, 1.0, threshold / np.maximum(abs_residual, 1e-12))
+            weighted_design = design * weights[:, None]
+            xtwx += weighted_design.T @ design
+            xtwy += weighted_design.T @ y
+            n_samples += len(y)
+        if n_samples <= n_coef: raise ValueError("Uydurma için yeterli geçerli log örneği bulunamadı.")
+
+        new_coefficients = np.linalg.solve(xtwx, xtwy)
+        passes_done = pass_no + 1
+        median_abs_residual = _median_from_hist(residual_hist)
+        if median_abs_residual is not None: scale = max(median_abs_residual / 0.6745, 1e-6)
+        converged = coefficients is not None and np.max(np.abs(new_coefficients - coefficients)) <= 1e-4 * max(np.max(np.abs(coefficients)), 1.0)
+        coefficients = new_coefficients
+        if converged: break
+
+    info = {
+        "samples": n_samples, "passes": passes_done, "robust_scale_g_kwh": float(scale) if scale is not None else None,
+        "rmse_g_kwh": float(np.sqrt(sum_sq_residual / n_samples)) if passes_done > 1 else None
+    }
+    return CompiledSfocCurve.from_polynomial(coefficients), info
+
+def save_fitted_curve(curve, path, name=None, source=None):
+    # Uydurulan eğriyi JSON olarak kaydeder (katsayılar + gösterim için örnek noktalar).
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "name": name, "source": source, "kind": "polynomial",
+            "coefficients": list(curve.coefficients), "points": {str(k): v for k, v in curve.items()}
+        }, f, ensure_ascii=False, indent=2)
+
+def load_fitted_curve(path):
+    # save_fitted_curve ile kaydedilen eğriyi ALL_SFOC_CURVES'e konabilecek CompiledSfocCurve olarak yükler.
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    sample_loads = tuple(int(float(k)) if float(k).is_integer() else float(k) for k in data.get("points", {}))
+    return CompiledSfocCurve.from_polynomial(data["coefficients"], sample_loads=sample_loads or (25, 50, 75, 85, 100))
@@ -0,0 +1,125 @@
+# sfoc_library.py
+import hashlib
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+from config import ALL_SFOC_CURVES, SFOC_LIBRARY_DIR, SFOC_LIBRARY_POLL_S
+from core_calculations import CompiledSfocCurve, compile_sfoc_curves, sfoc_curves_fingerprint
+from dispatch_map import discard_dispatch_maps
+
+class SfocCurveSet(dict):
+    """
+    Kütüphanenin belirli bir andaki derlenmiş eğrileri (anahtar -> CompiledSfocCurve); değiştirilmez.
+    Önbellekli fonksiyonlara parametre olarak verilir ve SFOC_CACHE_HASH_FUNCS ile eğri içeriğinden
+    anahtarlanır. Fonksiyonlara sadece kullandıkları eğriler (subset) verilir; böylece bir eğrinin
+    değişmesi yalnızca ona bağlı sonuçları geçersiz kılar, başka bir eğriye erişim KeyError verir.
+    """
+    def __init__(self, curves, versions=None):
+        super().__init__(curves)
+        self.versions = dict(versions or {})
+
+    def subset(self, keys):
+        return SfocCurveSet({key: self[key] for key in keys}, {key: self.versions.get(key) for key in keys})
+
+# st.cache_data(hash_funcs=...) için: eğri kümesi içerik parmak iziyle hash'lenir
+SFOC_CACHE_HASH_FUNCS = {SfocCurveSet: sfoc_curves_fingerprint}
+
+def _curve_from_file_data(data):
+    # Kütüphane dosyası: {"key", "version", "name", "kind": "points" | "polynomial", "points", "coefficients"}
+    # (sfoc_fitting.save_fitted_curve çıktısı da okunur)
+    points = {int(float(k)) if float(k).is_integer() else float(k): float(v) for k, v in data.get("points", {}).items()}
+    if data.get("kind") == "polynomial":
+        return CompiledSfocCurve.from_polynomial(data["coefficients"], sample_loads=tuple(points) or (25, 50, 75, 85, 100))
+    curve = CompiledSfocCurve(points)
+    if not curve.is_valid: raise ValueError("en az iki SFOC noktası gerekli")
+    return curve
+
+class SfocLibrary:
+    """
+    Sürümlü SFOC eğri dosyalarının (klasördeki <anahtar>.json) izleyicisi.
+
+    refresh() her dosyanın (mtime, boyut) bilgisine bakar; değişmişse içeriğin SHA-1 özetini hesaplar ve
+    sadece içeriği gerçekten değişen eğrileri yeniden derler. Dosyası olmayan (veya silinen) eğriler
+    config.py'deki varsayılanlara döner. Değişen eğrilerle kurulmuş dispatch haritaları önbellekten atılır;
+    st.cache_data sonuçları eğri içeriğiyle anahtarlandığından değişen eğriye bağlı sonuçlar yeniden hesaplanır.
+    Okunamayan / hatalı dosyada önceki eğri korunur ve hata `errors` içinde raporlanır.
+    """
+    def __init__(self, directory=SFOC_LIBRARY_DIR, defaults=ALL_SFOC_CURVES):
+        self.directory = directory
+        self.defaults = compile_sfoc_curves(defaults)
+        self._files = {}   # dosya yolu -> {"stat", "digest", "key", "version", "curve"}
+        self._curves = SfocCurveSet(self.defaults, {key: "config" for key in self.defaults})
+        self.errors = {}   # dosya yolu -> hata mesajı
+        self.last_refresh = 0.0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _paths(self):
+        if not self.directory or not os.path.isdir(self.directory): return []
+        return [os.path.join(self.directory, name) for name in sorted(os.listdir(self.directory)) if name.lower().endswith(".json")]
+
+    def _load(self, path, previous):
+        # Dosya değişmediyse (mtime/boyut veya içerik özeti aynı) önceki derlenmiş eğri kullanılır.
+        stat = os.stat(path)
+        stat = (stat.st_mtime_ns, stat.st_size)
+        if previous is not None and previous["stat"] == stat: return previous
+        with open(path, "rb") as f: raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        if previous is not None and previous["digest"] == digest: return {**previous, "stat": stat}
+        data = json.loads(raw.decode("utf-8"))
+        return {"stat": stat, "digest": digest, "key": data.get("key") or os.path.splitext(os.path.basename(path))[0],
+                "version": data.get("version"), "curve": _curve_from_file_data(data)}
+
+    def refresh(self):
+        # Döndürür: içeriği değişen eğri anahtarları
+        with self._lock:
+            files = {}
+            for path in self._paths():
+                previous = self._files.get(path)
+                try:
+                    files[path] = self._load(path, previous)
+                    self.errors.pop(path, None)
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    self.errors[path] = str(e)
+                    if previous is not None: files[path] = previous
+            self._files = files
+            curves, versions = dict(self.defaults), {key: "config" for key in self.defaults}
+            for entry in files.values():
+                curves[entry["key"]], versions[entry["key"]] = entry["curve"], entry["version"]
+            old = self._curves
+            changed = {key for key in set(old) | set(curves)
+                       if key not in old or key not in curves or old[key].fingerprint() != curves[key].fingerprint()}
+            stale = {key: old[key].fingerprint() for key in changed if key in old}
+            if changed or versions != old.versions: self._curves = SfocCurveSet(curves, versions)
+            self.last_refresh = time.monotonic()
+        if stale: discard_dispatch_maps(stale)
+        return changed
+
+    def poll(self, interval_s=SFOC_LIBRARY_POLL_S):
+        # Son kontrolden bu yana `interval_s` geçtiyse dosyaları yeniden kontrol eder.
+        if time.monotonic() - self.last_refresh >= interval_s: self.refresh()
+        return self._curves
+
+    @property
+    def curves(self):
+        return self._curves
+
+    def sources(self):
+        # Eğri başına kaynak bilgisi (arayüzde gösterim için)
+        with self._lock:
+            by_key = {entry["key"]: (path, entry) for path, entry in self._files.items()}
+            return {key: {"source": by_key[key][0] if key in by_key else "config.py", "version": self._curves.versions.get(key),
+                          "digest": by_key[key][1]["digest"][:10] if key in by_key else None}
+                    for key in self._curves}
+
+@st.cache_resource
+def get_sfoc_library():
+    return SfocLibrary()
+
+def current_sfoc_curves():
+    # Sayfaların, servisin ve önbellek ısıtmanın kullandığı güncel eğri kümesi (değişen dosyalar burada fark edilir).
+    return get_sfoc_library().poll()
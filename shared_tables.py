@@ -0,0 +1,136 @@
+# shared_tables.py
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from config import SHARED_TABLES_DIR
+from core_calculations import CompiledSfocCurve, compile_sfoc_curves
+from dispatch_map import DispatchMap
+
+# Dizilerin dosya içindeki hizalaması (bayt)
+_ALIGNMENT = 64
+# DispatchMap'in sorgularda kullandığı segment dizileri
+_DISPATCH_ARRAYS = ("breakpoints", "segment_keys", "segment_n_main", "segment_n_port", "segment_port_fixed_load")
+
+# Süreç başına açılmış eşlemeler: dosya yolu -> np.memmap (aynı dosya ikinci kez eşlenmez)
+_ATTACHED = {}
+_ATTACHED_LOCK = threading.Lock()
+
+# Bu sürecin tablo klasörü (ilk yayımlamada kurulur)
+_TABLES_DIR = None
+
+def _remove_tables_dir(path, owner_pid):
+    # Sadece klasörü kuran süreç siler (fork ile kopyalanan işçiler değil)
+    if os.getpid() == owner_pid: shutil.rmtree(path, ignore_errors=True)
+
+def _tables_dir():
+    # Süreç başına özel klasör (mkdtemp: tahmin edilemez ad, 0700); başka kullanıcı dosya yerleştiremez, çıkışta silinir.
+    global _TABLES_DIR
+    with _ATTACHED_LOCK:
+        if _TABLES_DIR is None:
+            if SHARED_TABLES_DIR: os.makedirs(SHARED_TABLES_DIR, mode=0o700, exist_ok=True)
+            _TABLES_DIR = tempfile.mkdtemp(prefix="de_propulsion_tables_", dir=SHARED_TABLES_DIR or None)
+            atexit.register(_remove_tables_dir, _TABLES_DIR, os.getpid())
+        return _TABLES_DIR
+
+def publish_arrays(arrays):
+    """
+    Dizileri tek bir dosyaya hizalı olarak yazar ve yerleşim bilgisini döndürür (küçük, pickle edilebilir).
+    Dosya adı içerikten türetilir: bu süreçte aynı tablolar yeniden yazılmaz, mevcut dosya kullanılır.
+    """
+    digest = hashlib.sha1()
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        layout[name] = (offset, array.dtype.str, array.shape)
+        digest.update(repr((name, array.dtype.str, array.shape)).encode()); digest.update(array.tobytes())
+        offset += array.nbytes
+    path = os.path.join(_tables_dir(), f"{digest.hexdigest()}.bin")
+    if not os.path.exists(path):
+        buffer = np.zeros(max(offset, 1), dtype=np.uint8)
+        for name, array in arrays.items():
+            raw = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+            buffer[layout[name][0]:layout[name][0] + raw.nbytes] = raw
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        buffer.tofile(temp_path)
+        os.replace(temp_path, path) # Yarım yazılmış dosyaya başka süreç bağlanmasın
+    return {"path": path, "size": max(offset, 1), "arrays": layout}
+
+def attach_arrays(published):
+    # publish_arrays çıktısındaki dizileri salt okunur, kopyasız görünümler olarak açar (bellek sayfaları süreçler arası ortak).
+    with _ATTACHED_LOCK:
+        mapping = _ATTACHED.get(published["path"])
+        if mapping is None:
+            # Eksik / kısalmış dosya yanlış tablo veya çökme yerine açık bir hata verir
+            if os.path.getsize(published["path"]) != published["size"]:
+                raise ValueError(f"Paylaşılan tablo dosyası beklenen boyutta değil: {published['path']}")
+            mapping = _ATTACHED[published["path"]] = np.memmap(published["path"], dtype=np.uint8, mode="r")
+    return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=mapping, offset=offset)
+            for name, (offset, dtype, shape) in published["arrays"].items()}
+
+def publish_sfoc_curves(sfoc_curves):
+    # Nokta tabanlı eğrilerin spline tabloları dosyaya yazılır; polinom / geçersiz eğriler zaten küçük tanımlarıyla aktarılır.
+    compiled = compile_sfoc_curves(sfoc_curves)
+    arrays, manifest = {}, {}
+    for key, curve in compiled.items():
+        tables = curve.spline_tables()
+        if tables is not None:
+            arrays[f"{key}/knots"], arrays[f"{key}/coefficients"] = tables[0], tables[1]
+            manifest[key] = {"kind": "spline", "points": dict(curve), "degree": tables[2]}
+        elif curve.coefficients is not None:
+            manifest[key] = {"kind": "polynomial", "coefficients": curve.coefficients, "points": tuple(curve.keys())}
+        else:
+            manifest[key] = {"kind": "points", "points": dict(curve)}
+    return {"curves": manifest, "tables": publish_arrays(arrays) if arrays else None}
+
+def attach_sfoc_curves(published):
+    arrays = attach_arrays(published["tables"]) if published["tables"] else {}
+    curves = {}
+    for key, spec in published["curves"].items():
+        if spec["kind"] == "spline":
+            curves[key] = CompiledSfocCurve.from_spline(spec["points"], arrays[f"{key}/knots"], arrays[f"{key}/coefficients"], spec["degree"])
+        elif spec["kind"] == "polynomial":
+            curves[key] = CompiledSfocCurve.from_polynomial(spec["coefficients"], spec["points"])
+        else:
+            curves[key] = CompiledSfocCurve(spec["points"])
+    return curves
+
+def publish_dispatch_map(dispatch_map):
+    arrays = {name: getattr(dispatch_map, name) for name in _DISPATCH_ARRAYS}
+    arrays["segment_keys"] = np.asarray(arrays["segment_keys"], dtype=str) # object -> sabit genişlikli metin (eşlenebilir)
+    return {
+        "fleet": (dispatch_map.main_mcr, dispatch_map.main_qty, dispatch_map.port_mcr, dispatch_map.port_qty),
+        "tolerance_kw": dispatch_map.tolerance_kw, "evaluations": dispatch_map.evaluations,
+        "sfoc_curves": publish_sfoc_curves(dispatch_map.sfoc_curves),
+        "tables": publish_arrays(arrays)
+    }
+
+def attach_dispatch_map(published):
+    arrays = attach_arrays(published["tables"])
+    return DispatchMap.from_tables(
+        *published["fleet"], attach_sfoc_curves(published["sfoc_curves"]), published["tolerance_kw"], published["evaluations"],
+        *(arrays[name] for name in _DISPATCH_ARRAYS)
+    )
+
+def publish_fleet_tables(tables):
+    """
+    build_fleet_tables çıktısını ({"sfoc_curves": ..., "dispatch_maps": {filo: DispatchMap}}) bellek eşlemeli
+    dosyalara yayımlar. Dönen bildirim küçüktür; işçilere bu aktarılır, tablolar attach_fleet_tables ile
+    kopyalanmadan ve pickle edilmeden açılır. İşçi sayısı arttıkça tablo belleği artmaz.
+    """
+    return {
+        "sfoc_curves": publish_sfoc_curves(tables["sfoc_curves"]),
+        "dispatch_maps": {key: publish_dispatch_map(dispatch_map) for key, dispatch_map in tables["dispatch_maps"].items()}
+    }
+
+def attach_fleet_tables(published):
+    return {
+        "sfoc_curves": attach_sfoc_curves(published["sfoc_curves"]),
+        "dispatch_maps": {key: attach_dispatch_map(spec) for key, spec in published["dispatch_maps"].items()}
+    }
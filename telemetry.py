@@ -0,0 +1,192 @@
+# telemetry.py
+import functools
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from config import TELEMETRY_ENABLED, TELEMETRY_HISTORY_RUNS
+
+# Paneli açan kenar çubuğu onay kutusunun session_state anahtarı
+TELEMETRY_TOGGLE_KEY = "telemetry_enabled"
+
+# Betik iş parçacığındaki etkin çalıştırma kaydı (arka plan ısıtma / havuz iş parçacıklarında yok -> kayıt yapılmaz)
+_LOCAL = threading.local()
+
+class TelemetryRun:
+    # Bir yeniden çalıştırmanın (veya tek başına çalışan bir fragment'in) aşama süreleri, önbellek ve tablo boyutları
+    def __init__(self, name, session):
+        self.name, self.session = name, session
+        self.started_at = time.time()
+        self.total_ms = None
+        self.stages = {}   # aşama -> ms (aynı ad tekrar ederse toplanır)
+        self.cache = {}    # fonksiyon -> [hit, miss]
+        self.frames = {}   # ad -> (satır, bayt)
+
+    def add_stage(self, name, elapsed_ms):
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def misses(self, function_name):
+        return self.cache.get(function_name, [0, 0])[1]
+
+    def count_hit(self, function_name, misses_before):
+        # Aşama boyunca önbellekli fonksiyonun gövdesi çalışmadıysa (cache_miss çağrılmadıysa) sonuç önbellekten geldi
+        if self.misses(function_name) == misses_before: self.cache.setdefault(function_name, [0, 0])[0] += 1
+
+class TelemetryHistory:
+    # Süreç genelinde (tüm oturumlar) son çalıştırmalar; gerilemeler yeniden çalıştırmalar ve oturumlar arasında görünür
+    def __init__(self, max_runs=TELEMETRY_HISTORY_RUNS):
+        self._runs = deque(maxlen=max_runs)
+        self._lock = threading.Lock()
+
+    def append(self, run):
+        with self._lock: self._runs.append(run)
+
+    def snapshot(self):
+        with self._lock: return list(self._runs)
+
+@st.cache_resource
+def get_telemetry_history():
+    return TelemetryHistory()
+
+def enabled():
+    try:
+        return bool(st.session_state.get(TELEMETRY_TOGGLE_KEY, TELEMETRY_ENABLED))
+    except Exception: # Betik bağlamı dışında (örn. arka plan iş parçacığı)
+        return False
+
+def _session_label():
+    if "telemetry_session_id" not in st.session_state: st.session_state.telemetry_session_id = uuid.uuid4().hex[:6]
+    return st.session_state.telemetry_session_id
+
+def _current():
+    return getattr(_LOCAL, "run", None)
+
+@contextmanager
+def run(name):
+    """
+    Bir yeniden çalıştırmayı kaydeder. İç içe çağrılırsa (örn. tam çalıştırma içindeki fragment) sadece bir aşama
+    olarak sayılır; fragment tek başına yeniden çalıştığında kendi kaydını oluşturur. Kapalıyken hiçbir şey yapmaz.
+    """
+    if _current() is not None:
+        with stage(name): yield
+        return
+    if not enabled():
+        yield
+        return
+    record = TelemetryRun(name, _session_label())
+    _LOCAL.run = record
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.total_ms = (time.perf_counter() - started) * 1000
+        _LOCAL.run = None
+        get_telemetry_history().append(record)
+
+def timed_section(name):
+    # Sayfa bölümü (fragment) fonksiyonları için run() dekoratörü; @st.fragment'in altına yazılır.
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with run(name): return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def stage(name, cache=None):
+    # Bir aşamanın süresi; `cache` önbellekli fonksiyonun adıysa aşama içindeki çağrının hit/miss durumu da sayılır.
+    record = _current()
+    if record is None:
+        yield
+        return
+    misses_before = record.misses(cache) if cache else None
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.add_stage(name, (time.perf_counter() - started) * 1000)
+        if cache: record.count_hit(cache, misses_before)
+
+class Laps:
+    # Uzun bir bloğu girintisini değiştirmeden aşamalara böler: lap(ad) son lap'ten bu yana geçen süreyi kaydeder.
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._last = time.perf_counter()
+        record = _current()
+        self._misses = {function_name: counts[1] for function_name, counts in record.cache.items()} if record else {}
+
+    def lap(self, name, cache=None):
+        now = time.perf_counter()
+        record = _current()
+        if record is not None:
+            record.add_stage(f"{self.prefix}: {name}", (now - self._last) * 1000)
+            if cache: record.count_hit(cache, self._misses.get(cache, 0))
+            self._misses = {function_name: counts[1] for function_name, counts in record.cache.items()}
+        self._last = now
+
+def cache_miss(function_name):
+    # Önbellekli fonksiyonların gövdesinin başında çağrılır (gövde sadece önbellek ıskasında çalışır).
+    record = _current()
+    if record is not None: record.cache.setdefault(function_name, [0, 0])[1] += 1
+
+def record_frames(name, *frames):
+    # Sonuç tablolarının toplam satır sayısı ve bellek kullanımı (derin, metin sütunları dahil)
+    record = _current()
+    if record is None: return
+    frames = [df for df in frames if isinstance(df, pd.DataFrame)]
+    record.frames[name] = (sum(len(df) for df in frames), int(sum(df.memory_usage(deep=True).sum() for df in frames)))
+
+def render_telemetry_panel():
+    """ Etkinse sayfanın altında geliştirici gecikme panelini gösterir (bu oturumun son çalıştırması + geçmiş). """
+    if not enabled(): return
+    runs = get_telemetry_history().snapshot()
+    with st.expander("Gecikme Telemetrisi (Geliştirici)", expanded=True):
+        if not runs:
+            st.info("Henüz kayıtlı çalıştırma yok; bir sonraki etkileşimden itibaren aşamalar ölçülür.")
+            return
+        session = _session_label()
+        session_runs = [r for r in runs if r.session == session] or runs
+        last = session_runs[-1]
+        st.caption(f"Son çalıştırma: {last.name} — toplam {last.total_ms:.0f} ms (oturum {last.session})")
+
+        stage_col, cache_col = st.columns(2)
+        stages_df = pd.DataFrame({"Aşama": list(last.stages), "Süre (ms)": list(last.stages.values())})
+        if not stages_df.empty:
+            stages_df["Pay (%)"] = stages_df["Süre (ms)"] / last.total_ms * 100
+        stage_col.dataframe(stages_df.round(1), use_container_width=True, hide_index=True)
+        cache_col.dataframe(pd.DataFrame(
+            [{"Fonksiyon": name, "Hit": hits, "Miss": misses} for name, (hits, misses) in last.cache.items()],
+            columns=["Fonksiyon", "Hit", "Miss"]
+        ), use_container_width=True, hide_index=True)
+        cache_col.dataframe(pd.DataFrame(
+            [{"Tablo": name, "Satır": rows, "Bellek (KB)": round(size / 1024, 1)} for name, (rows, size) in last.frames.items()],
+            columns=["Tablo", "Satır", "Bellek (KB)"]
+        ), use_container_width=True, hide_index=True)
+
+        history_df = pd.DataFrame({
+            "Zaman": pd.to_datetime([r.started_at for r in runs], unit="s"),
+            "Çalıştırma": [r.name for r in runs], "Oturum": [r.session for r in runs],
+            "Toplam (ms)": [r.total_ms for r in runs]
+        })
+        st.plotly_chart(px.line(
+            history_df, x="Zaman", y="Toplam (ms)", color="Çalıştırma", markers=True, hover_data=["Oturum"],
+            title=f"Çalıştırma Süreleri (son {len(runs)} kayıt, tüm oturumlar)"
+        ), use_container_width=True)
+
+        # Aşama bazında geçmiş istatistikleri: son değerin p90'ın üzerinde olması gerilemeye işaret eder
+        stage_rows = [(name, elapsed) for r in runs if r.name == last.name for name, elapsed in r.stages.items()]
+        if stage_rows:
+            stage_history = pd.DataFrame(stage_rows, columns=["Aşama", "Süre (ms)"]).groupby("Aşama", sort=False)["Süre (ms)"]
+            summary_df = pd.DataFrame({
+                "Kayıt": stage_history.count(), "p50 (ms)": stage_history.median(),
+                "p90 (ms)": stage_history.quantile(0.9), "En Fazla (ms)": stage_history.max()
+            })
+            summary_df["Son (ms)"] = pd.Series(last.stages)
+            summary_df["Son > p90"] = summary_df["Son (ms)"] > summary_df["p90 (ms)"]
+            st.dataframe(summary_df.round(1), use_container_width=True)
@@ -0,0 +1,246 @@
+# ui_benchmark.py
+"""
+Sayfaların uçtan uca (başsız) arayüz gecikme ölçümü. Streamlit'in AppTest test düzeneğiyle
+fuel_analysis_page ve new_combinations_page render_page() çağrıları, gerçekçi etkileşim dizileriyle
+(buton tıklamaları, radyo / seçim kutusu değişiklikleri, session_state gidiş-dönüşleri) birkaç sonuç
+boyutunda çalıştırılır. Her etkileşim için duvar saati süresi ve tepe bellek (tracemalloc) kaydedilir ve
+saklı taban değerlerle (UI_BENCHMARK_BASELINE_FILE) karşılaştırılır.
+
+Her senaryo boş önbellekle (st.cache_data / st.cache_resource temizlenerek) başlar; senaryo içindeki
+sonraki etkileşimler önbelleği kullanıcının gördüğü gibi kullanır. Süre `--repeat` tekrarın en küçüğüdür;
+bellek ayrı bir tracemalloc geçişinde ölçülür (tracemalloc süreyi bozduğundan).
+
+Taban değerler makineye özgüdür ve depoya eklenmez (.gitignore); her makinede `--update-baseline` ile oluşturulur.
+Taban değerler farklı bir ortamda (Python / Streamlit sürümü, makine) ölçülmüşse karşılaştırma atlanır.
+
+Sınırlama: AppTest her etkileşimde betiğin tamamını yeniden çalıştırır; st.fragment bölümleri içindeki etkileşimler
+(mod_*, kombinasyon_sec) tarayıcıda sadece o bölümü yeniden çalıştırırken burada tam sayfa süresi ölçülür. Bu adımlar
+bölüm içi gecikmenin üst sınırıdır; fragment kapsamının kaybolması (bölüm dışı hesapların tekrar yapılması) görünmez.
+
+Kullanım: python ui_benchmark.py [--scenarios fa_orta nc_buyuk] [--repeat 3] [--update-baseline]
+Gerileme bulunursa (veya bir etkileşim hata verirse) çıkış kodu 1'dir.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+UI_BENCHMARK_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui_benchmark_baseline.json")
+APP_TIMEOUT_S = 900
+
+# Gerileme eşikleri: ölçüm hem oranı hem mutlak payı aşarsa gerileme sayılır (küçük değerlerdeki gürültü için)
+TIME_REGRESSION_RATIO = 1.5
+TIME_REGRESSION_SLACK_S = 0.1
+MEMORY_REGRESSION_RATIO = 1.3
+MEMORY_REGRESSION_SLACK_MB = 2.0
+
+PAGE_SCRIPTS = {
+    "fuel_analysis": "import fuel_analysis_page\nfuel_analysis_page.render_page()",
+    "new_combinations": "import new_combinations_page\nnew_combinations_page.render_page()"
+}
+
+# Sonuç boyutları: tarama aralıkları (ve adedi / adımı) büyüdükçe sonuç tabloları büyür
+FUEL_ANALYSIS_SIZES = {
+    "kucuk": {"fa_gen_power_range": (2000, 2400), "fa_gen_qty_range": (3, 3), "fa_sea_power_range": (3000, 3400), "fa_maneuver_power_range": (1600, 2000)},
+    "orta": {},
+    "buyuk": {"fa_gen_power_range": (1800, 3600), "fa_gen_qty_range": (2, 6), "fa_sea_power_range": (2500, 5500), "fa_maneuver_power_range": (1500, 3500)}
+}
+NEW_COMBINATION_SIZES = {
+    "kucuk": {"nc_sea_power_range": (3000, 3400), "nc_maneuver_power_range": (1600, 2000)},
+    "orta": {},
+    "buyuk": {"nc_sea_power_range": (2500, 5500), "nc_maneuver_power_range": (1500, 3500), "nc_power_step_mode": "Uyarlamalı"}
+}
+
+# --- Etkileşimler: (ad, AppTest'i değiştiren fonksiyon); süre bir sonraki at.run() için ölçülür ---
+WIDGET_KINDS = ("slider", "radio", "selectbox", "number_input", "checkbox")
+
+def _widget(at, key):
+    # Anahtarı verilen widget (tipi bilinmeden; AppTest tip başına erişim sunar)
+    for kind in WIDGET_KINDS:
+        widget = next((w for w in getattr(at, kind) if w.key == key), None)
+        if widget is not None: return widget
+    raise KeyError(f"widget bulunamadı: {key}")
+
+def _set(key, value):
+    return lambda at: _widget(at, key).set_value(value)
+
+def _click(key):
+    return lambda at: at.button(key=key).click()
+
+def _set_many(values):
+    def action(at):
+        for key, value in values.items(): _set(key, value)(at)
+    return action
+
+def _first_other_option(key):
+    # Seçim kutusunda mevcut seçimden farklı ilk seçenek (örn. başka bir jeneratör kombinasyonu)
+    def action(at):
+        box = at.selectbox(key=key)
+        box.set_value(next((option for option in box.options if option != box.value), box.value))
+    return action
+
+def fuel_analysis_steps(size_values):
+    return [
+        ("ilk_render", lambda at: None),
+        ("girdiler", _set_many(size_values)),
+        ("hesapla", _click("fa_calculate_button")),
+        ("mod_manevra", _set("fa_plot_mode_radio", "Manevra")),
+        ("kombinasyon_sec", _first_other_option("fa_select_gen_combo_plot")),
+        ("mod_seyir", _set("fa_plot_mode_radio", "Seyir")),
+        ("yeniden_hesapla", _click("fa_calculate_button")),
+        ("boyutlandirma_modu", _set("fa_calculation_mode", "Optimum Boyutlandırma")),
+        ("tarama_modu", _set("fa_calculation_mode", "Birim Güç Taraması"))
+    ]
+
+def new_combination_steps(size_values):
+    return [
+        ("ilk_render", lambda at: None),
+        ("girdiler", _set_many(size_values)),
+        ("hesapla", _click("nc_calculate_button")),
+        ("mod_manevra", _set("nc_plot_mode_radio", "Manevra")),
+        ("mod_seyir", _set("nc_plot_mode_radio", "Seyir")),
+        ("ekonomik_paylasim", _set("nc_load_sharing", "economic")),
+        ("hesapla_ekonomik", _click("nc_calculate_button")),
+        ("orantili_paylasim", _set("nc_load_sharing", "proportional")),
+        ("hesapla_orantili", _click("nc_calculate_button"))
+    ]
+
+SCENARIOS = {
+    **{f"fa_{size}": ("fuel_analysis", fuel_analysis_steps(values)) for size, values in FUEL_ANALYSIS_SIZES.items()},
+    **{f"nc_{size}": ("new_combinations", new_combination_steps(values)) for size, values in NEW_COMBINATION_SIZES.items()}
+}
+
+# --- Ölçüm ---
+def _clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    gc.collect()
+
+def run_scenario(name, trace_memory=False):
+    """
+    Senaryoyu boş önbellekle baştan sona çalıştırır.
+    Döndürür: [{"step", "time_s", "peak_mb" (trace_memory ise), "error"}]; ilk hatada durur.
+    peak_mb, etkileşim sırasında ayrılan belleğin etkileşim öncesine göre tepe artışıdır.
+    """
+    page, steps = SCENARIOS[name]
+    _clear_caches()
+    at = AppTest.from_string(PAGE_SCRIPTS[page], default_timeout=APP_TIMEOUT_S)
+    results = []
+    for step, action in steps:
+        record = {"step": step, "error": None}
+        try:
+            action(at)
+            if trace_memory:
+                tracemalloc.reset_peak()
+                traced_before = tracemalloc.get_traced_memory()[0]
+            started = time.perf_counter()
+            at.run()
+            record["time_s"] = time.perf_counter() - started
+            if trace_memory: record["peak_mb"] = (tracemalloc.get_traced_memory()[1] - traced_before) / 2**20
+            if at.exception: record["error"] = "; ".join(str(e.value) for e in at.exception)
+        except Exception as e:   # Widget bulunamadı, zaman aşımı vb.: senaryonun kalanı anlamsız
+            record["error"] = f"{type(e).__name__}: {e}"
+        results.append(record)
+        if record["error"]: break
+    return results
+
+def _warm_up(pages):
+    # Modül importları ve Streamlit'in ilk çalıştırma maliyeti ölçüme girmesin (senaryo sırasından bağımsız sonuç)
+    for page in pages: AppTest.from_string(PAGE_SCRIPTS[page], default_timeout=APP_TIMEOUT_S).run()
+
+def measure(scenario_names, repeat=3, memory=True):
+    # {senaryo/adım: {"time_s", "peak_mb"}} ve hatalar; süre tekrarların en küçüğü
+    measurements, errors = {}, []
+    _warm_up(sorted({SCENARIOS[name][0] for name in scenario_names}))
+    for name in scenario_names:
+        runs = [run_scenario(name) for _ in range(max(repeat, 1))]
+        if memory:
+            tracemalloc.start()
+            try: runs.append(run_scenario(name, trace_memory=True))
+            finally: tracemalloc.stop()
+        for run in runs:
+            for record in run:
+                key = f"{name}/{record['step']}"
+                if record["error"]:
+                    errors.append(f"{key}: {record['error']}")
+                    continue
+                entry = measurements.setdefault(key, {})
+                if "peak_mb" in record: entry["peak_mb"] = record["peak_mb"]
+                else: entry["time_s"] = min(entry.get("time_s", float("inf")), record["time_s"])
+    return measurements, sorted(set(errors))
+
+def find_regressions(measurements, baseline):
+    # Taban değerde olmayan ölçümler (yeni adımlar) gerileme sayılmaz.
+    regressions = []
+    for key, entry in measurements.items():
+        base = baseline.get(key, {})
+        checks = (("time_s", TIME_REGRESSION_RATIO, TIME_REGRESSION_SLACK_S, "s"), ("peak_mb", MEMORY_REGRESSION_RATIO, MEMORY_REGRESSION_SLACK_MB, "MB"))
+        for field, ratio, slack, unit in checks:
+            if field in entry and field in base and entry[field] > max(base[field] * ratio, base[field] + slack):
+                regressions.append(f"{key} {field}: {entry[field]:.3f} {unit} > taban {base[field]:.3f} {unit}")
+    return regressions
+
+def _environment():
+    return {"python": platform.python_version(), "streamlit": st.__version__, "machine": platform.machine(), "node": platform.node()}
+
+def load_baseline(path=UI_BENCHMARK_BASELINE_FILE):
+    if not os.path.exists(path): return None
+    with open(path, encoding="utf-8") as f: return json.load(f)
+
+def save_baseline(measurements, path=UI_BENCHMARK_BASELINE_FILE):
+    # Sadece ölçülen senaryolar güncellenir; diğer senaryoların taban değerleri korunur.
+    data = load_baseline(path) or {"environment": {}, "measurements": {}}
+    data["environment"] = _environment()
+    data["measurements"].update({key: {field: round(value, 4) for field, value in entry.items()} for key, entry in measurements.items()})
+    with open(path, "w", encoding="utf-8") as f: json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sayfalar için başsız uçtan uca arayüz gecikme ölçümü (AppTest).")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3, help="Süre ölçümü tekrar sayısı (en küçüğü alınır)")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc bellek geçişini atla")
+    parser.add_argument("--baseline", default=UI_BENCHMARK_BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true", help="Ölçümleri taban değer olarak kaydet")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    measurements, errors = measure(args.scenarios, args.repeat, memory=not args.no_memory)
+    baseline = load_baseline(args.baseline)
+    base_measurements = (baseline or {}).get("measurements", {})
+    for key, entry in measurements.items():
+        base = base_measurements.get(key, {})
+        line = f"{key:<36} süre: {entry.get('time_s', float('nan')):>8.3f} s"
+        if "time_s" in base: line += f" (taban {base['time_s']:.3f})"
+        if "peak_mb" in entry: line += f"  tepe bellek: {entry['peak_mb']:>8.1f} MB"
+        if "peak_mb" in base: line += f" (taban {base['peak_mb']:.1f})"
+        print(line)
+    for error in errors: print("HATA:", error)
+    print(f"Süre: {time.perf_counter() - started:.1f} s")
+
+    if args.update_baseline:
+        if errors:
+            print("Hatalı etkileşimler varken taban değerler güncellenmedi.")
+            return 1
+        save_baseline(measurements, args.baseline)
+        print(f"Taban değerler kaydedildi: {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"Taban değer dosyası yok ({args.baseline}); --update-baseline ile oluşturun.")
+        return 1 if errors else 0
+    if baseline.get("environment") != _environment():
+        # Başka makinenin süreleriyle karşılaştırma anlamsız: gerileme kontrolü yapılmaz (hatalar yine başarısız sayılır)
+        print(f"Taban değerler farklı bir ortamda ölçülmüş ({baseline.get('environment')}); karşılaştırma atlandı.")
+        return 1 if errors else 0
+    regressions = find_regressions(measurements, base_measurements)
+    for regression in regressions: print("GERİLEME:", regression)
+    return 1 if errors or regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# voyage_metrics.py
+import numpy as np
+
+from config import CO2_EMISSION_FACTOR, METRIC_LOAD_BAND
+
+# Yük bandı sayaçlarının sırası (METRIC_LOAD_BAND sınırları bandın içindedir)
+LOAD_BAND_LABELS = (f"<%{METRIC_LOAD_BAND[0]:g}", f"%{METRIC_LOAD_BAND[0]:g}-{METRIC_LOAD_BAND[1]:g}", f">%{METRIC_LOAD_BAND[1]:g}")
+
+def accumulate_unit_metrics(durations_h, units, groups=None, n_groups=1, load_band=METRIC_LOAD_BAND, co2_factor=CO2_EMISSION_FACTOR):
+    """
+    Dispatch sonuçlarından birim tipi başına yakıt, CO2, çalışma saati ve yük bandı saatlerini tek vektörel geçişte
+    biriktirir; ara tablo (nokta x birim satırları) oluşturulmaz, çıktı sadece sayaçlardır.
+
+    `units`: {birim tipi: (çalışan adet, birim başı yük %, nokta yakıtı ton)}. Diziler son eksende N noktadır;
+    öndeki eksenler (örn. tarama kombinasyonları) sayaçlarda korunur. `groups` (N,) 0..n_groups-1 kodlarıysa
+    (örn. Seyir / Manevra) sayaçlar gruba göre de ayrılır. Saatler birim-saattir (2 jeneratör x 3 saat = 6).
+    Döndürür: {birim tipi: {"fuel_t", "co2_t", "running_h": (..., G), "band_h": (..., G, 3)}}
+    """
+    durations_h = np.asarray(durations_h, dtype=float)
+    n_points = durations_h.shape[-1] if durations_h.ndim else 1
+    groups = np.zeros(n_points, dtype=int) if groups is None else np.asarray(groups, dtype=int)
+    metrics = {}
+    for kind, (count, load_percent, fuel_t) in units.items():
+        count, load_percent, fuel_t, duration = np.broadcast_arrays(
+            np.asarray(count, dtype=float), np.asarray(load_percent, dtype=float), np.asarray(fuel_t, dtype=float), durations_h
+        )
+        lead_shape = count.shape[:-1]
+        rows = int(np.prod(lead_shape, dtype=int))
+        # Satır x grup x bant indeksi; yakıt ve birim-saat ağırlıkları bincount ile tek seferde toplanır
+        cell = (np.arange(rows)[:, None] * n_groups + groups[None, :]).ravel()
+        load = np.nan_to_num(load_percent.reshape(rows, -1)).ravel()
+        band = (load >= load_band[0]).astype(int) + (load > load_band[1])
+        unit_hours = np.where(count > 0, count * duration, 0.0).reshape(rows, -1).ravel()
+        band_h = np.bincount(cell * 3 + band, weights=unit_hours, minlength=rows * n_groups * 3).reshape(lead_shape + (n_groups, 3))
+        fuel = np.bincount(cell, weights=np.nan_to_num(fuel_t).reshape(rows, -1).ravel(), minlength=rows * n_groups).reshape(lead_shape + (n_groups,))
+        metrics[kind] = {"fuel_t": fuel, "co2_t": fuel * co2_factor, "running_h": band_h.sum(axis=-1), "band_h": band_h}
+    return metrics
+
+def total_metrics(metrics):
+    # Birim tiplerinin toplamı (aynı şekilli sayaçlar)
+    kinds = list(metrics.values())
+    return {name: sum(kind[name] for kind in kinds) for name in ("fuel_t", "co2_t", "running_h", "band_h")}
+
+def metric_columns(counters, prefix):
+    # Tek satırlık sayaçlardan (skaler / (3,) bant) özet tablosu sütunları
+    band_h = np.asarray(counters["band_h"], dtype=float).reshape(-1, 3).sum(axis=0)
+    return {
+        f"{prefix} Çalışma Saati (birim-saat)": float(np.sum(counters["running_h"])),
+        **{f"{prefix} {label} Yük (birim-saat)": float(hours) for label, hours in zip(LOAD_BAND_LABELS, band_h)}
+    }
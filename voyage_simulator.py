@@ -0,0 +1,136 @@
+# voyage_simulator.py
+import numpy as np
+import pandas as pd
+
+from config import SIM_MIN_RUN_TIME_S, SIM_START_FUEL_KG, SIM_HYSTERESIS_FRACTION, CO2_EMISSION_FACTOR
+from load_profiles import sample_durations_h, run_starts
+from voyage_metrics import accumulate_unit_metrics
+
+def _target_counts(dispatch_map, powers):
+    # Her güç için dispatch haritasının istediği (ana, liman) çalışan jeneratör sayıları.
+    # Kapasite üstü / uygun kombinasyon yok -> tüm jeneratörler; yük yok -> hiçbiri.
+    idx = dispatch_map.segment_index(powers)
+    safe_idx = np.maximum(idx, 0)
+    no_combination = (idx < 0) | (dispatch_map.segment_keys[safe_idx] == "none")
+    n_main = np.where(no_combination, dispatch_map.main_qty, dispatch_map.segment_n_main[safe_idx])
+    n_port = np.where(no_combination, dispatch_map.port_qty, dispatch_map.segment_n_port[safe_idx])
+    no_load = powers <= 0
+    return np.where(no_load, 0, n_main).astype(int), np.where(no_load, 0, n_port).astype(int)
+
+def _proportional_unit_rates(dispatch_map, powers, n_main, n_port):
+    # Çalışan jeneratörler arasında MCR orantılı paylaşım (evaluate_combination ile aynı):
+    # birim tipi başına (çalışan adet, birim başı yük %, yakıt debisi ton/saat)
+    main_capacity = n_main * dispatch_map.main_mcr
+    port_capacity = n_port * dispatch_map.port_mcr
+    total_capacity = main_capacity + port_capacity
+    with np.errstate(divide='ignore', invalid='ignore'):
+        load_fraction = np.where(total_capacity > 0, powers / total_capacity, np.nan)
+    load_percent = load_fraction * 100
+    fuel_main = np.where(main_capacity > 0, load_fraction * main_capacity * dispatch_map.sfoc_curves["main_de_gen"](load_percent), 0.0)
+    fuel_port = np.where(port_capacity > 0, load_fraction * port_capacity * dispatch_map.sfoc_curves["port_gen"](load_percent), 0.0)
+    return {"Ana": (n_main, load_percent, np.where(powers > 0, fuel_main / 1_000_000, 0.0)),
+            "Liman": (n_port, load_percent, np.where(powers > 0, fuel_port / 1_000_000, 0.0))}
+
+def simulate_voyage(times_s, de_powers_kw, dispatch_map,
+                    min_run_time_s=SIM_MIN_RUN_TIME_S, start_fuel_kg=SIM_START_FUEL_KG,
+                    hysteresis_fraction=SIM_HYSTERESIS_FRACTION):
+    """
+    Yük profili boyunca jeneratörlerin devreye girme/çıkma durumunu izleyen zaman alanı simülasyonu.
+
+    - Dispatch haritası daha fazla jeneratör isterse eksik jeneratörler hemen devreye alınır
+      (her devreye alma `start_fuel_kg` kadar ek yakıt yakar).
+    - Bir jeneratör ancak yük `hysteresis_fraction` kadar artsa bile gerekmeyecekse ve en az
+      `min_run_time_s` çalışmışsa devreden çıkarılır.
+
+    Döngü her örnek yerine sadece hedef kombinasyonun değiştiği bloklar ve bekleyen durdurmalar
+    üzerinde döner; yakıt, oluşan durum dizisi üzerinden tek seferde vektörel hesaplanır.
+    """
+    times_s = np.asarray(times_s, dtype=float)
+    powers = np.asarray(de_powers_kw, dtype=float)
+    if len(times_s) == 0:
+        return {"total_fuel_t": 0.0, "running_fuel_t": 0.0, "startup_fuel_t": 0.0, "memoryless_fuel_t": 0.0,
+                "co2_t": 0.0, "starts": {"Ana": 0, "Liman": 0}, "running_hours": {"Ana": 0.0, "Liman": 0.0},
+                "load_band_hours": {"Ana": [0.0, 0.0, 0.0], "Liman": [0.0, 0.0, 0.0]},
+                "events": pd.DataFrame(columns=["Time (s)", "Gen Kind", "Action", "N Main Online", "N Port Online"]),
+                "blocks_processed": 0}
+    durations_h = sample_durations_h(times_s)
+    end_time_s = times_s[-1] + durations_h[-1] * 3600
+
+    up_main, up_port = _target_counts(dispatch_map, powers)
+    down_main, down_port = _target_counts(dispatch_map, powers * (1 + hysteresis_fraction))
+    width = max(dispatch_map.main_qty, dispatch_map.port_qty, 1) + 1
+    block_codes = ((up_main * width + up_port) * width + down_main) * width + down_port
+    block_starts = run_starts(block_codes)
+
+    # İlk örnekteki hedef kombinasyon zaten çalışıyor kabul edilir (devreye alma cezası yok).
+    online = {"Ana": [times_s[0]] * int(up_main[0]), "Liman": [times_s[0]] * int(up_port[0])}
+    change_times, change_main, change_port = [times_s[0]], [len(online["Ana"])], [len(online["Liman"])]
+    events = []
+    starts = {"Ana": 0, "Liman": 0}
+
+    def record(time_s, gen_kind, action):
+        events.append((time_s, gen_kind, action, len(online["Ana"]), len(online["Liman"])))
+        if change_times[-1] == time_s:
+            change_main[-1], change_port[-1] = len(online["Ana"]), len(online["Liman"])
+        else:
+            change_times.append(time_s); change_main.append(len(online["Ana"])); change_port.append(len(online["Liman"]))
+
+    for block_no, i0 in enumerate(block_starts):
+        block_start_s = times_s[i0]
+        block_end_s = times_s[block_starts[block_no + 1]] if block_no + 1 < len(block_starts) else end_time_s
+        wanted = {"Ana": int(up_main[i0]), "Liman": int(up_port[i0])}
+        keep = {"Ana": max(wanted["Ana"], int(down_main[i0])), "Liman": max(wanted["Liman"], int(down_port[i0]))}
+
+        for gen_kind in ("Ana", "Liman"):
+            while len(online[gen_kind]) < wanted[gen_kind]:
+                online[gen_kind].append(block_start_s); starts[gen_kind] += 1
+                record(block_start_s, gen_kind, "Devreye Alındı")
+
+        # Fazla jeneratörler: en uzun çalışandan başlayarak, minimum çalışma süresi dolunca durdur.
+        pending_stops = []
+        for gen_kind in ("Ana", "Liman"):
+            surplus = len(online[gen_kind]) - keep[gen_kind]
+            if surplus <= 0: continue
+            online[gen_kind].sort()
+            for unit_start_s in online[gen_kind][:surplus]:
+                stop_time_s = max(block_start_s, unit_start_s + min_run_time_s)
+                if stop_time_s < block_end_s: pending_stops.append((stop_time_s, gen_kind, unit_start_s))
+        for stop_time_s, gen_kind, unit_start_s in sorted(pending_stops):
+            online[gen_kind].remove(unit_start_s)
+            record(stop_time_s, gen_kind, "Devreden Çıkarıldı")
+
+    # Her örneğin durumu: son değişim anından itibaren geçerli jeneratör sayıları
+    state_idx = np.searchsorted(np.array(change_times), times_s, side='right') - 1
+    online_main = np.array(change_main)[state_idx]
+    online_port = np.array(change_port)[state_idx]
+
+    # Dispatch haritasının yapısıyla aynı çalışan set varsa haritanın (destekli mod dahil) birim yükleri ve yakıtı,
+    # yoksa orantılı paylaşım; yakıt, CO2, çalışma ve yük bandı saatleri birim tipi başına tek geçişte biriktirilir.
+    map_units, map_served = dispatch_map.unit_fuel_rates(powers)
+    map_served &= powers > 0
+    proportional_units = _proportional_unit_rates(dispatch_map, powers, online_main, online_port)
+    idx = dispatch_map.segment_index(powers)
+    safe_idx = np.maximum(idx, 0)
+    matches_map = (idx >= 0) & (online_main == dispatch_map.segment_n_main[safe_idx]) & (online_port == dispatch_map.segment_n_port[safe_idx])
+    online = {"Ana": online_main, "Liman": online_port}
+    units = {}
+    for gen_kind, (_, map_load, map_rate) in map_units.items():
+        _, proportional_load, proportional_rate = proportional_units[gen_kind]
+        rate = np.where(matches_map, np.nan_to_num(map_rate), proportional_rate)
+        units[gen_kind] = (online[gen_kind], np.where(matches_map, map_load, proportional_load), np.nan_to_num(rate) * durations_h)
+    metrics = accumulate_unit_metrics(durations_h, units)
+    running_fuel_t = float(sum(metrics[gen_kind]["fuel_t"][0] for gen_kind in metrics))
+    startup_fuel_t = sum(starts[k] * start_fuel_kg.get(k, 0.0) for k in starts) / 1000.0
+
+    return {
+        "total_fuel_t": running_fuel_t + startup_fuel_t,
+        "running_fuel_t": running_fuel_t,
+        "startup_fuel_t": startup_fuel_t,
+        "memoryless_fuel_t": float(sum(np.sum(np.where(map_served, rate, 0.0) * durations_h) for _, _, rate in map_units.values())),
+        "co2_t": (running_fuel_t + startup_fuel_t) * CO2_EMISSION_FACTOR,
+        "starts": starts,
+        "running_hours": {gen_kind: float(metrics[gen_kind]["running_h"][0]) for gen_kind in metrics},
+        "load_band_hours": {gen_kind: metrics[gen_kind]["band_h"][0].tolist() for gen_kind in metrics},
+        "events": pd.DataFrame(events, columns=["Time (s)", "Gen Kind", "Action", "N Main Online", "N Port Online"]),
+        "blocks_processed": len(block_starts)
+    }